@@ -1,15 +1,18 @@
 from dataclasses import dataclass
+from typing import Optional
 import math
 
 import customtkinter as ctk
 import numpy as np
 
 from dirigo import units
-from dirigo.components.hardware import Hardware
 from dirigo.plugins.acquisitions import (
-    FrameAcquisitionSpec, FrameAcquisition, StackAcquisitionSpec
+    FrameAcquisitionSpec, FrameAcquisition
 )
-from dirigo_gui.components.common import LabeledEntry
+from dirigo_gui.components.common import LabeledEntry, LabeledDisplay
+from dirigo_gui.hardware.state_mirror import HardwareMirror
+from dirigo_gui.routines.mosaic import MosaicAcquisitionSpec, serpentine_tiles
+from dirigo_gui.routines.zstack import RepeatedStackAcquisitionSpec, stack_times
 
 
 
@@ -26,6 +29,9 @@ class AcquisitionControl(ctk.CTkFrame):
         self._preview_running = False
         self._series_running = False
         self._stack_running = False
+        self._mosaic_running = False
+        self._timelapse_running = False
+        self._unavailable: set[str] = set() # buttons kept disabled, see set_unavailable()
 
         title = ctk.CTkLabel(self, text="Capture", font=ctk.CTkFont(size=16, weight='bold'))
         title.grid(row=0, columnspan=2, padx=5, sticky="w")
@@ -70,6 +76,43 @@ class AcquisitionControl(ctk.CTkFrame):
         )
         self.calibrate_button.grid(row=2, column=1, padx=5, pady=5)
 
+        self.mosaic_button = ctk.CTkButton(
+            self, 
+            text="MOSAIC",
+            font=ctk.CTkFont(size=self.BUTTON_FONT_SIZE, weight="bold"),
+            width=self.BUTTON_WIDTH,
+            height=self.BUTTON_HEIGHT,
+            command=lambda: self.start('mosaic')
+        ) # shown by enable_stage_routines() when a stage is available
+
+        self.timelapse_button = ctk.CTkButton(
+            self, 
+            text="T-LAPSE",
+            font=ctk.CTkFont(size=self.BUTTON_FONT_SIZE, weight="bold"),
+            width=self.BUTTON_WIDTH,
+            height=self.BUTTON_HEIGHT,
+            command=lambda: self.start('timelapse')
+        ) # also needs a stage
+
+    def set_ready(self, ready: bool):
+        """Disable starting acquisitions until the hardware has initialized."""
+        for button in (self.preview_button, self.series_button, self.stack_button,
+                       self.calibrate_button, self.mosaic_button, self.timelapse_button):
+            button.configure(state=ctk.NORMAL if ready else ctk.DISABLED)
+        self._disable_unavailable()
+
+    def set_unavailable(self, *names: str):
+        """Keep the buttons of acquisitions the controller cannot run (e.g. 'stack') disabled."""
+        self._unavailable.update(names)
+        self._disable_unavailable()
+
+    def _disable_unavailable(self):
+        for name in self._unavailable:
+            getattr(self, f"{name}_button").configure(state=ctk.DISABLED)
+
+    def enable_stage_routines(self):
+        self.mosaic_button.grid(row=3, column=0, padx=5, pady=5)
+        self.timelapse_button.grid(row=3, column=1, padx=5, pady=5)
 
     def start(self, type: str):
         if type == 'preview':
@@ -82,6 +125,12 @@ class AcquisitionControl(ctk.CTkFrame):
             self.stack_button.configure(
                 state=ctk.DISABLED if self._preview_running else ctk.NORMAL
             )
+            self.mosaic_button.configure(
+                state=ctk.DISABLED if self._preview_running else ctk.NORMAL
+            )
+            self.timelapse_button.configure(
+                state=ctk.DISABLED if self._preview_running else ctk.NORMAL
+            )
 
             if self._preview_running:
                 self.preview_button.configure(text="STOP")
@@ -99,6 +148,12 @@ class AcquisitionControl(ctk.CTkFrame):
             self.stack_button.configure(
                 state=ctk.DISABLED if self._series_running else ctk.NORMAL
             )
+            self.mosaic_button.configure(
+                state=ctk.DISABLED if self._series_running else ctk.NORMAL
+            )
+            self.timelapse_button.configure(
+                state=ctk.DISABLED if self._series_running else ctk.NORMAL
+            )
 
             if self._series_running:
                 self.series_button.configure(text="ABORT")
@@ -116,6 +171,12 @@ class AcquisitionControl(ctk.CTkFrame):
             self.series_button.configure(
                 state=ctk.DISABLED if self._stack_running else ctk.NORMAL
             )
+            self.mosaic_button.configure(
+                state=ctk.DISABLED if self._stack_running else ctk.NORMAL
+            )
+            self.timelapse_button.configure(
+                state=ctk.DISABLED if self._stack_running else ctk.NORMAL
+            )
 
             if self._stack_running:
                 self.stack_button.configure(text="ABORT")
@@ -123,29 +184,80 @@ class AcquisitionControl(ctk.CTkFrame):
             else:
                 self._stop_callback()
 
+        elif type == 'mosaic':
+            self._mosaic_running = not self._mosaic_running
+
+            # enable/disable preview, capture, stack
+            for button in (self.preview_button, self.series_button, self.stack_button,
+                           self.timelapse_button):
+                button.configure(
+                    state=ctk.DISABLED if self._mosaic_running else ctk.NORMAL
+                )
+
+            if self._mosaic_running:
+                self.mosaic_button.configure(text="ABORT")
+                self._start_callback(acq_name="raster_mosaic", log_frames=True)
+            else:
+                self._stop_callback()
+
+        elif type == 'timelapse':
+            self._timelapse_running = not self._timelapse_running
+
+            # enable/disable preview, capture, stack, mosaic
+            for button in (self.preview_button, self.series_button, self.stack_button,
+                           self.mosaic_button):
+                button.configure(
+                    state=ctk.DISABLED if self._timelapse_running else ctk.NORMAL
+                )
+
+            if self._timelapse_running:
+                self.timelapse_button.configure(text="ABORT")
+                self._start_callback(acq_name="timelapse", log_frames=True)
+            else:
+                self._stop_callback()
+
+        self._disable_unavailable()
+
     def stopped(self):
         """Reset internal flags and button states"""
         self._preview_running = False
         self._series_running = False
         self._stack_running = False
+        self._mosaic_running = False
+        self._timelapse_running = False
 
         self.preview_button.configure(state=ctk.NORMAL, text="PREVIEW")
         self.series_button.configure(state=ctk.NORMAL, text="SERIES")
         self.stack_button.configure(state=ctk.NORMAL, text="STACK")
+        self.mosaic_button.configure(state=ctk.NORMAL, text="MOSAIC")
+        self.timelapse_button.configure(state=ctk.NORMAL, text="T-LAPSE")
+        self._disable_unavailable()
 
     @property  
     def acquisition_running(self) -> bool:
-        if self._preview_running or self._series_running or self._stack_running:
+        if (self._preview_running or self._series_running or self._stack_running
+            or self._mosaic_running or self._timelapse_running):
             return True 
         else:
             return False
 
+    @property
+    def stage_busy(self) -> bool:
+        """Whether an acquisition moves the stage or records its position (not preview)."""
+        return (self._series_running or self._stack_running
+                or self._mosaic_running or self._timelapse_running)
+
 
 class FrameSpecificationControl(ctk.CTkFrame):
-    def __init__(self, parent, timing_indicator: 'TimingIndicator', spec_name = "default"):
+    def __init__(self,
+                 parent,
+                 timing_indicator: 'TimingIndicator',
+                 spec_name = "default",
+                 spec: Optional[FrameAcquisitionSpec] = None):
         super().__init__(parent)
 
-        spec: FrameAcquisitionSpec = FrameAcquisition.get_specification(spec_name) # TODO, load from previous session
+        if spec is None:
+            spec = FrameAcquisition.get_specification(spec_name) # TODO, load from previous session
 
         self._pixel_time = spec.pixel_time if hasattr(spec, 'pixel_time') else None # aka dwell time
         self._frame_width = spec.line_width
@@ -522,6 +634,60 @@ class StackSpecificationControl(ctk.CTkFrame):
             widget.grid(row=row+1, column=col, padx=4, pady=3, sticky="e")
             self._widgets[attr] = widget
 
+        # Z motion: step-and-settle at each depth, or sweep at constant velocity
+        self.mode_var = ctk.StringVar(value="Step")
+        self.mode = ctk.CTkSegmentedButton(
+            self,
+            values=["Step", "Sweep"],
+            variable=self.mode_var,
+            command=lambda e: self._update_timing()
+        )
+        self.mode.grid(row=3, columnspan=4, padx=4, pady=3)
+
+        # Repeated volumes, optionally alternating direction to skip the return move
+        self._volumes = 1
+        self.volumes_entry = LabeledEntry(
+            self, "Volumes:", default="1", on_validate=self._on_volumes_change
+        )
+        self.volumes_entry.grid(row=4, column=0, padx=4, pady=3, sticky="e")
+        self.alternate_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            self, text="Alternate", variable=self.alternate_var,
+            width=10, height=10,
+        ).grid(row=4, column=1, padx=4, pady=3, sticky="w")
+
+        # Timing indicator shows the stack duration for the current settings
+        self._timing_indicator = frame_spec_control._timing_indicator
+        self._timing_indicator.stack_control = self
+        self._update_timing()
+
+    @property
+    def continuous(self) -> bool:
+        """True if the stack is to be acquired as a continuous sweep."""
+        return self.mode_var.get() == "Sweep"
+
+    @property
+    def acquisition_name(self) -> str:
+        if self.continuous:
+            return "continuous_stack"
+        if self._volumes > 1 or self.alternate_var.get():
+            return "repeated_stack"
+        return "raster_stack"
+
+    def _on_volumes_change(self, raw: str) -> None:
+        try:
+            value = int(raw)
+            if value < 1:
+                raise ValueError
+            self._volumes = value
+            self.volumes_entry.set_text_normal()
+            self._update_timing()
+        except ValueError:
+            self.volumes_entry.set_text_red()
+
+    def _update_timing(self) -> None:
+        self._timing_indicator.update(self._frame_spec_control.generate_spec())
+
     def _on_field_change(self, field: str, raw: str) -> None:
         """
         Parse & validate `raw`, update the model, and refresh any dependent
@@ -546,6 +712,7 @@ class StackSpecificationControl(ctk.CTkFrame):
 
             widget.set_text_normal()
             self._sync()                             # push model to GUI
+            self._update_timing()
         except Exception:
             widget.set_text_red()       # set to red for failure
 
@@ -560,10 +727,10 @@ class StackSpecificationControl(ctk.CTkFrame):
         """Return a *copy* so callers can’t mutate internal state."""
         return _StackSpecModel(**vars(self._model))
     
-    def generate_spec(self) -> StackAcquisitionSpec:
+    def generate_spec(self) -> RepeatedStackAcquisitionSpec:
         f = self._frame_spec_control
         m = self._model                          # shorthand
-        return StackAcquisitionSpec(
+        return RepeatedStackAcquisitionSpec(
             bidirectional_scanning = (f.directions_var.get() == "Bidirectional"),
             line_width             = f._frame_width,
             frame_height           = f._frame_height,
@@ -574,13 +741,155 @@ class StackSpecificationControl(ctk.CTkFrame):
             lower_limit            = m.lower,
             upper_limit            = m.upper,
             depth_spacing          = m.spacing,
+            volumes                = self._volumes,
+            alternate_direction    = self.alternate_var.get(),
         )
     
 
+@dataclass
+class _MosaicSpecModel:
+    x_min: units.Position
+    x_max: units.Position
+    y_min: units.Position
+    y_max: units.Position
+    overlap: float          # fraction of the field of view
+    frames_per_tile: int
+
+
+class MosaicSpecificationControl(ctk.CTkFrame):
+
+    _FIELD_INFO = (
+        # label text     attribute name in the model
+        ("X min:",        "x_min"),
+        ("X max:",        "x_max"),
+        ("Y min:",        "y_min"),
+        ("Y max:",        "y_max"),
+        ("Overlap %:",    "overlap"),
+        ("Frames/Tile:",  "frames_per_tile"),
+    )
+
+    def __init__(self, parent, frame_spec_control: FrameSpecificationControl):
+        super().__init__(parent)
+        self._frame_spec_control = frame_spec_control
+
+        self._model = _MosaicSpecModel(
+            x_min   = units.Position("-1 mm"),
+            x_max   = units.Position("1 mm"),
+            y_min   = units.Position("-1 mm"),
+            y_max   = units.Position("1 mm"),
+            overlap = 0.1,
+            frames_per_tile = 1,
+        )
+
+        COLS = 2
+        ctk.CTkLabel(
+            self,
+            text="Mosaic Specification",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).grid(row=0, columnspan=4, sticky="w", padx=10, pady=(0, 4))
+
+        self._widgets: dict[str, LabeledEntry] = {}
+        for i, (text, attr) in enumerate(self._FIELD_INFO):
+            widget = LabeledEntry(
+                self, text,
+                default=self._format(attr),
+                on_validate=lambda val, field=attr: self._on_field_change(field, val)
+            )
+            row, col = divmod(i, COLS)
+            widget.grid(row=row+1, column=col, padx=4, pady=3, sticky="e")
+            self._widgets[attr] = widget
+
+        r = len(self._FIELD_INFO) // COLS + 1
+        self.tiles_display = LabeledDisplay(self, "Tiles:", default="", width=110)
+        self.tiles_display.grid(row=r, column=0, columnspan=2, padx=4, sticky="w")
+        self.result_display = LabeledDisplay(self, "Last run:", default="", width=140)
+        self.result_display.grid(row=r+1, column=0, columnspan=2, padx=4, sticky="w")
+        self.update_tile_count()
+
+    def _format(self, field: str) -> str:
+        value = getattr(self._model, field)
+        if field == "overlap":
+            return f"{100 * value:g}"
+        return str(value)
+
+    def _on_field_change(self, field: str, raw: str) -> None:
+        widget = self._widgets[field]
+        try:
+            if field == "overlap":
+                value = float(raw) / 100
+                if not 0 <= value < 1:
+                    raise ValueError
+            elif field == "frames_per_tile":
+                value = int(raw)
+                if not 1 <= value < 10:
+                    raise ValueError
+            else:
+                value = units.Position(raw)
+            setattr(self._model, field, value)
+            widget.set_text_normal()
+            widget.set(self._format(field))
+            self.update_tile_count()
+        except Exception:
+            widget.set_text_red()
+
+    def _tiles(self):
+        f = self._frame_spec_control
+        m = self._model
+        return serpentine_tiles(
+            x_range     = (float(m.x_min), float(m.x_max)),
+            y_range     = (float(m.y_min), float(m.y_max)),
+            tile_width  = float(f._frame_width),
+            tile_height = float(f._frame_height),
+            overlap     = m.overlap,
+        )
+
+    def update_tile_count(self) -> None:
+        """Call when the bounding box or the frame size changes."""
+        tiles = self._tiles()
+        rows = 1 + max(t.row for t in tiles)
+        cols = 1 + max(t.col for t in tiles)
+        self.tiles_display.update(f"{len(tiles)} ({rows} × {cols})")
+
+    def report(self, statistics: dict) -> None:
+        """Show the total time and dead-time fraction of the finished mosaic."""
+        total = statistics.get("total_time_s")
+        if total is None:
+            return
+        dead = statistics.get("dead_time_fraction")
+        dead_text = "" if dead is None else f", {100 * dead:.0f}% dead"
+        self.result_display.update(f"{total:.1f} s{dead_text}")
+
+    def generate_spec(self) -> MosaicAcquisitionSpec:
+        self.update_tile_count() # frame size may have changed since
+        f = self._frame_spec_control
+        m = self._model
+        return MosaicAcquisitionSpec(
+            bidirectional_scanning = (f.directions_var.get() == "Bidirectional"),
+            line_width             = f._frame_width,
+            frame_height           = f._frame_height,
+            pixel_time             = f._pixel_time,
+            pixel_size             = f._pixel_width,
+            pixel_height           = f._pixel_height,
+            line_duty_cycle        = f._line_duty_cycle,
+            frames_per_acquisition = 1,
+            x_range                = (m.x_min, m.x_max),
+            y_range                = (m.y_min, m.y_max),
+            overlap                = m.overlap,
+            saved_frames_per_step  = m.frames_per_tile,
+        )
+
+
 class TimingIndicator(ctk.CTkFrame):
-    def __init__(self, parent, hardware: Hardware):
+    """Line/frame rate (and stack duration) for the current specification.
+
+    Scanner properties are read from the hardware mirror, so editing a field
+    does not wait on the scanner.
+    """
+    def __init__(self, parent, mirror: HardwareMirror):
         super().__init__(parent)
-        self._hw = hardware
+        self._mirror = mirror
+        self.stack_control: "StackSpecificationControl | None" = None # set by the stack control
+        self._frame_rate: units.Frequency | None = None
 
         timing_label = ctk.CTkLabel(self, text="Timing", font=ctk.CTkFont(size=16, weight='bold'))
         timing_label.grid(row=0, columnspan=2, padx=10, sticky="w")
@@ -597,6 +906,12 @@ class TimingIndicator(ctk.CTkFrame):
         self.frame_rate = ctk.CTkLabel(self, text="")
         self.frame_rate.grid(row=2, column=1, padx=5, sticky="w")
 
+        # Stack rows, shown once a stack control registers
+        self._stack_time_label = ctk.CTkLabel(self, text="Stack Time:")
+        self.stack_time = ctk.CTkLabel(self, text="")
+        self._sweep_saving_label = ctk.CTkLabel(self, text="Sweep Saves:")
+        self.sweep_saving = ctk.CTkLabel(self, text="")
+
     def update(self, spec: FrameAcquisitionSpec):
         """Receive a FrameAcquisitionSpec and update accordingly"""
         if spec.pixel_time:
@@ -604,28 +919,59 @@ class TimingIndicator(ctk.CTkFrame):
             line_rate = units.Frequency(1 / fast_period_time)
             if spec.bidirectional_scanning:
                 line_rate *= 2
+            self._frame_rate = line_rate / spec.lines_per_frame
             self.line_rate.configure(
                 text=str(line_rate)
             )
             self.frame_rate.configure(
-                text=str(line_rate / spec.lines_per_frame)
+                text=str(self._frame_rate)
             )
         
         else:
+            line_rate = self._mirror.get("fast_scanner.frequency", None)
+            if line_rate is None: # scanners still initializing; updated again once ready
+                self._frame_rate = None
+                self.line_rate.configure(text="...")
+                self.frame_rate.configure(text="...")
+                return
             if spec.bidirectional_scanning:
-                line_rate = 2 * self._hw.fast_raster_scanner.frequency
-            else:
-                line_rate = self._hw.fast_raster_scanner.frequency
+                line_rate = 2 * line_rate
 
-            flyback_time = self._hw.slow_raster_scanner.flyback_time
+            flyback_time = self._mirror.get("slow_scanner.flyback_time", None)
             if flyback_time is None:
                 flyback_time = 10 / line_rate
             flyback_lines = round(
                 flyback_time * line_rate
             )
             total_lines_per_frame = spec.lines_per_frame + flyback_lines
+            self._frame_rate = line_rate / total_lines_per_frame
 
             self.line_rate.configure(text=str(line_rate))
-            self.frame_rate.configure(text=str(line_rate/total_lines_per_frame))
+            self.frame_rate.configure(text=str(self._frame_rate))
 
+        if self.stack_control is not None:
+            self._update_stack()
 
+    def _update_stack(self) -> None:
+        """Estimated stack duration for the selected z mode, and what sweeping saves."""
+        self._stack_time_label.grid(row=3, column=0, padx=5, sticky="e")
+        self.stack_time.grid(row=3, column=1, padx=5, sticky="w")
+        self._sweep_saving_label.grid(row=4, column=0, padx=5, sticky="e")
+        self.sweep_saving.grid(row=4, column=1, padx=5, sticky="w")
+        try:
+            spec = self.stack_control.generate_spec() # type: ignore
+            acceleration = self._mirror.get("z.acceleration", None)
+            if acceleration is not None:
+                acceleration = float(acceleration)
+            step, sweep = stack_times(spec, float(1 / self._frame_rate), acceleration) # type: ignore
+        except Exception:
+            self.stack_time.configure(text="")
+            self.sweep_saving.configure(text="")
+            return
+
+        duration = sweep if self.stack_control.continuous else step # type: ignore
+        self.stack_time.configure(text=f"{duration:.1f} s")
+        saving = step - sweep
+        self.sweep_saving.configure(
+            text=f"{saving:.1f} s ({100 * saving / step:.0f}%)" if step > 0 else ""
+        )
@@ -61,4 +61,82 @@ class LabeledDisplay(ctk.CTkFrame):
         self._disp.pack(fill="both", expand=True)
 
     def update(self, value: str) -> None:
-        self._disp.configure(text=value)
\ No newline at end of file
+        self._disp.configure(text=value)
+
+class DispatchStatus(ctk.CTkLabel):
+    """
+    Small indicator of whether the last value submitted to a
+    LatestValueDispatcher has reached the device: an open dot while sending,
+    a filled dot once applied, '!' if the device rejected it.
+    """
+    _SYMBOLS = {
+        "pending":  ("○", "orange"),
+        "applied":  ("●", "green"),
+        "error":    ("!", "red"),
+    }
+
+    def __init__(self, parent, dispatcher, poll_ms: int = 50):
+        super().__init__(parent, text="", width=14)
+        self._dispatcher = dispatcher
+        self._poll_ms = poll_ms
+        self._polling = False
+
+    def track(self) -> None:
+        """Call after submitting a value; polls until the dispatcher is idle."""
+        if not self._polling:
+            self._polling = True
+            self._poll()
+
+    def _poll(self) -> None:
+        status = self._dispatcher.status
+        text, color = self._SYMBOLS[status]
+        self.configure(text=text, text_color=color)
+        if status == "pending":
+            self.after(self._poll_ms, self._poll)
+        else:
+            self._polling = False
+
+
+class LazySection(ctk.CTkFrame):
+    """
+    Collapsible section whose body is built the first time it is expanded
+    (or its content is requested), keeping it off the startup path.
+    `build(parent)` creates and returns the body widget.
+    """
+    def __init__(self, parent, title: str, build: Callable[[ctk.CTkFrame], ctk.CTkBaseClass],
+                 expanded: bool = False, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._title = title
+        self._build = build
+        self._content = None
+        self.expanded = False
+
+        self._header = ctk.CTkButton(
+            self, text="", anchor="w", fg_color="transparent", hover=False,
+            text_color=("gray10", "gray90"), font=ctk.CTkFont(size=16, weight="bold"),
+            command=self.toggle,
+        )
+        self._header.pack(fill="x", padx=4)
+        self._body = ctk.CTkFrame(self, fg_color="transparent")
+        self._set_header()
+        if expanded:
+            self.toggle()
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = self._build(self._body)
+            self._content.pack(fill="x")
+        return self._content
+
+    def toggle(self) -> None:
+        self.expanded = not self.expanded
+        if self.expanded:
+            self.content # build on first expand
+            self._body.pack(fill="x")
+        else:
+            self._body.pack_forget()
+        self._set_header()
+
+    def _set_header(self) -> None:
+        self._header.configure(text=f"{'▾' if self.expanded else '▸'} {self._title}")
@@ -3,6 +3,11 @@ import customtkinter as ctk
 from dirigo import units
 from dirigo.hw_interfaces.detector import Detector, DetectorSet
 
+from dirigo_gui.components.common import DispatchStatus
+from dirigo_gui.hardware.device_lock import device_lock
+from dirigo_gui.hardware.dispatcher import LatestValueDispatcher
+from dirigo_gui.hardware.state_mirror import HardwareMirror
+
 
 
 class DetectorFrame(ctk.CTkFrame):
@@ -11,16 +16,20 @@ class DetectorFrame(ctk.CTkFrame):
         - enable/disable
         - gain
 
+    Values are read from the hardware mirror, not the device, and gain
+    changes are sent by a background dispatcher that drops superseded values.
     """
-    def __init__(self, parent, detector: Detector):
+    def __init__(self, parent, detector: Detector, mirror: HardwareMirror):
         super().__init__(parent, fg_color="transparent")
 
         if not isinstance(detector, Detector):
             raise ValueError("DetectorFrame must be initialized with a Detector hardware object")
         self._detector = detector
+        self._mirror = mirror
+        self._key = f"detector{detector.index}"
 
         # Enable/Disable Checkbox
-        self.enabled_var = ctk.BooleanVar(value=self._detector.enabled)
+        self.enabled_var = ctk.BooleanVar(value=self._mirror.get(f"{self._key}.enabled"))
         self.enable_checkbox = ctk.CTkCheckBox(
             self, 
             text=f"Detector {self._detector.index + 1}",
@@ -36,18 +45,27 @@ class DetectorFrame(ctk.CTkFrame):
             slider_label = ctk.CTkLabel(slider_frame, text="Gain:")
             slider_label.grid(row=0, column=0, padx=5)
             self.entry = ctk.CTkEntry(slider_frame, width=56)
-            self.entry.insert(0, f"{self._detector.gain}")
+            self.entry.insert(0, f"{self._mirror.get(f'{self._key}.gain')}")
             self.entry.grid(row=0, column=2, padx=5, pady=2)
 
+            self._gain_dispatcher = LatestValueDispatcher(
+                f"Gain-{detector.index}",
+                send=lambda value: setattr(self._detector, 'gain', value),
+                on_applied=lambda value: self._mirror.invalidate(f"{self._key}.gain", value),
+                lock=device_lock(detector),
+            )
+            self.gain_status = DispatchStatus(slider_frame, self._gain_dispatcher)
+            self.gain_status.grid(row=0, column=3, padx=(0, 5))
+
             self.slider = ctk.CTkSlider(
                 slider_frame, 
-                from_=self._detector.gain_range.min, 
-                to=self._detector.gain_range.max, 
+                from_=self._gain_range.min, 
+                to=self._gain_range.max, 
                 orientation="horizontal", 
                 width=150,
                 command=lambda value: self.update_entry(value)
             )
-            self.slider.set(self._detector.gain)  
+            self.slider.set(self._mirror.get(f"{self._key}.gain"))  
             self.slider.grid(row=0, column=1, padx=5, sticky="ew")
 
             self.entry.bind(
@@ -65,22 +83,33 @@ class DetectorFrame(ctk.CTkFrame):
             # Gain is not adjustable
             self.entry = None
             self.slider = None
+            self._gain_dispatcher = None
+
+    @property
+    def _gain_range(self):
+        return self._mirror.get(f"{self._key}.gain_range")
 
     def update_enabled(self):
-        self._detector.enabled = self.enabled_var.get()
+        with device_lock(self._detector):
+            self._detector.enabled = self.enabled_var.get()
+        self._mirror.invalidate(f"{self._key}.enabled", self.enabled_var.get())
+
+    def _set_gain(self, value) -> None:
+        self._gain_dispatcher.submit(value) # type: ignore
+        self.gain_status.track()
 
     def update_entry(self, value):
         """Update the gain entry box and display_min property."""
         if self.entry is None:
             raise RuntimeError("Entry not initialized")
-        if isinstance(self._detector.gain_range, units.VoltageRange):
+        if isinstance(self._gain_range, units.VoltageRange):
             self.entry.delete(0, ctk.END)
             self.entry.insert(0, str(units.Voltage(value)))
-            self._detector.gain = units.Voltage(value)
+            self._set_gain(units.Voltage(value))
         else:
             self.entry.delete(0, ctk.END)
             self.entry.insert(0, str(int(value)))
-            self._detector.gain = int(value)
+            self._set_gain(int(value))
 
     def update_slider(self):
         """Update the slider when the entry box value changes."""
@@ -91,7 +120,7 @@ class DetectorFrame(ctk.CTkFrame):
             self.slider.set(value)
             self.entry.delete(0, ctk.END)
             self.entry.insert(0, str(value))  # Update entry with clamped value
-            self._detector.gain = int(value) # Handle NotImplementedError?
+            self._set_gain(int(value)) # Handle NotImplementedError?
         except ValueError:
             # If invalid input, restore the slider's current value
             self.entry.delete(0, ctk.END)
@@ -99,17 +128,23 @@ class DetectorFrame(ctk.CTkFrame):
 
     def clamp_value(self, value) -> int :
         value = int(value)
-        if value < self._detector.gain_range.min:  # Clamp to minimum
-            value = self._detector.gain_range.min
-        elif value > self._detector.gain_range.max:  # Clamp to maximum
-            value = self._detector.gain_range.max
+        gain_range = self._gain_range
+        if value < gain_range.min:  # Clamp to minimum
+            value = gain_range.min
+        elif value > gain_range.max:  # Clamp to maximum
+            value = gain_range.max
         return value
 
+    def destroy(self):
+        if self._gain_dispatcher is not None:
+            self._gain_dispatcher.close()
+        return super().destroy()
+
 
 
 
 class DetectorSetControl(ctk.CTkFrame):
-    def __init__(self, parent, detector_set: DetectorSet):
+    def __init__(self, parent, detector_set: DetectorSet, mirror: HardwareMirror):
         super().__init__(parent)
 
         if not isinstance(detector_set, DetectorSet):
@@ -123,6 +158,14 @@ class DetectorSetControl(ctk.CTkFrame):
         # Create N DetectorFrames
         self.detector_frames: list[DetectorFrame] = []
         for detector in self._detector_set:
-            detector_frame = DetectorFrame(self, detector)
+            detector_frame = DetectorFrame(self, detector, mirror)
             detector_frame.pack(fill="x", pady=2, padx=2)
-            self.detector_frames.append(detector_frame)
\ No newline at end of file
+            self.detector_frames.append(detector_frame)
+
+    @property
+    def gains(self) -> list[float]:
+        """Gain settings as shown by the sliders (NaN if not adjustable)."""
+        return [
+            float(f.slider.get()) if f.slider is not None else float('nan')
+            for f in self.detector_frames
+        ]
\ No newline at end of file
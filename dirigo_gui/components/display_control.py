@@ -1,12 +1,19 @@
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 import customtkinter as ctk
 
 from dirigo.main import Dirigo
 from dirigo.sw_interfaces import Display
 from dirigo.sw_interfaces.display import get_available_color_vector_names
-from dirigo.plugins.processors import RollingAverageProcessor
-from dirigo.plugins.displays import DisplayChannel, FrameDisplay, Gamma
+
+if TYPE_CHECKING: # the plugin modules are slow to import (numba), so only loaded once a pipeline is built
+    from dirigo.plugins.processors import RollingAverageProcessor
+    from dirigo.plugins.displays import DisplayChannel, FrameDisplay
+
+
+# Range of processed data at RasterFrameProcessor's default 16-bit precision,
+# used until a pipeline reports the actual range (see DisplayControl.set_data_range)
+DEFAULT_DATA_RANGE = (-2**15, 2**15 - 1)
 
 
 class ChannelFrame(ctk.CTkFrame):
@@ -18,17 +25,14 @@ class ChannelFrame(ctk.CTkFrame):
         - max display value
 
     """
-    def __init__(self, parent, dirigo: Dirigo, channel_index: int):
+    def __init__(self, parent, channel_index: int, data_range: tuple[int, int] = DEFAULT_DATA_RANGE):
         """Constructs a frame with channel display properties."""
         super().__init__(parent, corner_radius=10, fg_color="transparent")
         self.index = channel_index
-        self._display_channel: Optional[DisplayChannel] = None # A display channel object is linked to this later
+        self._display_channel: Optional['DisplayChannel'] = None # A display channel object is linked to this later
 
-        # Slider limits -- set up a dummy acquisition/processor to return data range min/max 
-        acq = dirigo.make("acquisition", "raster_frame")
-        proc = dirigo.make("processor", "raster_frame", upstream=acq, autostart=False)
-        self.slider_min = proc.data_range.min
-        self.slider_max = proc.data_range.max
+        # Slider limits
+        self.slider_min, self.slider_max = data_range
 
         # Enable/Disable Checkbox
         self.enabled_var = ctk.BooleanVar(value=True)
@@ -210,6 +214,16 @@ class ChannelFrame(ctk.CTkFrame):
         self.max_entry.delete(0, ctk.END)
         self.max_entry.insert(0, str(new_value))
     
+    def set_data_range(self, data_range: tuple[int, int]):
+        """Change the slider limits, clamping the current min/max to them."""
+        if data_range == (self.slider_min, self.slider_max):
+            return
+        self.slider_min, self.slider_max = data_range
+        self.min_slider.configure(from_=self.slider_min, to=self.slider_max)
+        self.max_slider.configure(from_=self.slider_min, to=self.slider_max)
+        self.min = self.min
+        self.max = self.max
+
     def set_widgets_state(self, new_state):
         self.enable_checkbox.configure(state=new_state)
         self.color_vector_menu.configure(state=new_state)
@@ -220,13 +234,17 @@ class ChannelFrame(ctk.CTkFrame):
 
 
 class DisplayControl(ctk.CTkFrame): 
-    def __init__(self, parent, dirigo:Dirigo, title: str = "Display"):
+    def __init__(self, parent, dirigo:Dirigo, title: str = "Display", 
+                 data_range: tuple[int, int] = DEFAULT_DATA_RANGE):
         """Set up panel with controls for N channels"""
         #super().__init__(parent, fg_color="transparent")
         super().__init__(parent)
         self.dirigo = dirigo
-        self._averager: Optional[RollingAverageProcessor] = None
-        self._display_worker: Optional[FrameDisplay] = None
+        self._averager: Optional['RollingAverageProcessor'] = None
+        self._display_worker: Optional['FrameDisplay'] = None
+        # Processed data range: from the settings of the previous session, else the 
+        # default, until a pipeline reports it (no dummy pipeline is built for it)
+        self.data_range = data_range
 
         # Make title label
         title_label = ctk.CTkLabel(self, text=title, font=ctk.CTkFont(size=16, weight="bold"))
@@ -235,7 +253,7 @@ class DisplayControl(ctk.CTkFrame):
         # Make N ChannelFrames
         self.channel_frames: list[ChannelFrame] = []
         for i in range(self.dirigo.hw.nchannels_present):
-            channel_frame = ChannelFrame(self, self.dirigo, i)
+            channel_frame = ChannelFrame(self, i, self.data_range)
             channel_frame.pack(fill="y", pady=2, padx=2, anchor="n")
             self.channel_frames.append(channel_frame)  # Save reference to each ChannelFrame
 
@@ -267,8 +285,14 @@ class DisplayControl(ctk.CTkFrame):
 
         settings_grid_frame.pack(fill="x", anchor='w')
 
+    def set_data_range(self, data_range: tuple[int, int]):
+        self.data_range = (int(data_range[0]), int(data_range[1]))
+        for channel_frame in self.channel_frames:
+            channel_frame.set_data_range(self.data_range)
+
     def update_gamma(self):
         if self._display_worker:
+            from dirigo.plugins.displays import Gamma
             try:
                 new_gamma = float(self.gamma.get())
                 self._display_worker._transfer_function = Gamma(gamma=new_gamma)
@@ -315,13 +339,14 @@ class DisplayControl(ctk.CTkFrame):
                 self.average.delete(0, ctk.END)
                 self.average.insert(0, str(1))
     
-    def link_averager_worker(self, averager: RollingAverageProcessor):
+    def link_averager_worker(self, averager: 'RollingAverageProcessor'):
         self._averager = averager
         self._averager.n_frame_average = int(self.average.get())
 
-    def link_display_worker(self, display: FrameDisplay):
+    def link_display_worker(self, display: 'FrameDisplay'):
         """Links GUI properties to the dynamically generated Display worker."""
         self._display_worker = display
+        self.set_data_range((display.data_range.min, display.data_range.max))
         
         display_index = 0 # Display and Digitizer have slightly different indices--Display skips channels that are not enabled
         for channel in self.dirigo.hw.digitizer.channels:
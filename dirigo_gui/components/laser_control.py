@@ -3,14 +3,21 @@ import customtkinter as ctk
 from dirigo import units
 from dirigo.hw_interfaces.beam_attenuator import BeamAttenuator
 
+from dirigo_gui.components.common import DispatchStatus
+from dirigo_gui.hardware.device_lock import device_lock
+from dirigo_gui.hardware.dispatcher import LatestValueDispatcher
+from dirigo_gui.hardware.state_mirror import HardwareMirror
+
 
 class PowerFrame(ctk.CTkFrame):
-    def __init__(self, parent, beam_attenuator: BeamAttenuator):
+    def __init__(self, parent, beam_attenuator: BeamAttenuator, mirror: HardwareMirror):
         super().__init__(parent, fg_color="transparent")
 
         if not isinstance(beam_attenuator, BeamAttenuator):
             raise ValueError("PowerFrame must be initialized with a BeamAttenuator object")
         self._beam_attenuator = beam_attenuator
+        self._mirror = mirror # power and limits are read from here, not the device
+        fraction = self._mirror.get("laser.fraction")
 
         # Make laser power slider
         slider_frame = ctk.CTkFrame(self, fg_color = "transparent")
@@ -18,18 +25,28 @@ class PowerFrame(ctk.CTkFrame):
         slider_label = ctk.CTkLabel(slider_frame, text="Power:")
         slider_label.grid(row=0, column=0, padx=5)
         self.entry = ctk.CTkEntry(slider_frame, width=56)
-        self.entry.insert(0, f"{round(100*self._beam_attenuator.fraction)}")
+        self.entry.insert(0, f"{round(100*fraction)}")
         self.entry.grid(row=0, column=2, padx=5, pady=2)
 
+        # Power changes are sent in the background, dropping superseded values
+        self._dispatcher = LatestValueDispatcher(
+            "Laser",
+            send=self._beam_attenuator.set_fraction,
+            on_applied=lambda fraction: self._mirror.invalidate("laser.fraction", fraction),
+            lock=device_lock(beam_attenuator),
+        )
+        self.status = DispatchStatus(slider_frame, self._dispatcher)
+        self.status.grid(row=0, column=3, padx=(0, 5))
+
         self.slider = ctk.CTkSlider(
             slider_frame, 
-            from_=round(100*self._beam_attenuator.fraction_limits.min), 
-            to=round(100*self._beam_attenuator.fraction_limits.max), 
+            from_=round(100*self._fraction_limits.min), 
+            to=round(100*self._fraction_limits.max), 
             orientation="horizontal", 
             width=150,
             command=lambda value: self.update_entry(value)
         )
-        self.slider.set(round(100*self._beam_attenuator.fraction))
+        self.slider.set(round(100*fraction))
         self.slider.grid(row=0, column=1, padx=5, sticky="ew")
 
         self.entry.bind(
@@ -43,13 +60,21 @@ class PowerFrame(ctk.CTkFrame):
 
         slider_frame.grid(row=1, column=0, columnspan=2, pady=5, sticky="ew")
 
+    @property
+    def _fraction_limits(self):
+        return self._mirror.get("laser.fraction_limits")
+
+    def _set_fraction(self, fraction: float) -> None:
+        self._dispatcher.submit(fraction)
+        self.status.track()
+
     def update_entry(self, value):
         if self.entry is None:
             raise RuntimeError("Entry not initialized")
 
         self.entry.delete(0, ctk.END)
         self.entry.insert(0, str(value))
-        self._beam_attenuator.set_fraction(value/100.0)
+        self._set_fraction(value/100.0)
 
     def update_slider(self):
         """Update the slider when the entry box value changes."""
@@ -60,18 +85,23 @@ class PowerFrame(ctk.CTkFrame):
         self.slider.set(value)
         self.entry.delete(0, ctk.END)
         self.entry.insert(0, str(value))  # Update entry with clamped value
-        self._beam_attenuator.set_fraction(value/100.0)
+        self._set_fraction(value/100.0)
 
     def clamp_value(self, value) -> int :
         value = int(value)
-        if value < 100*self._beam_attenuator.fraction_limits.min:  # Clamp to minimum
-            value = round(100*self._beam_attenuator.fraction_limits.min)
-        elif value > 100*self._beam_attenuator.fraction_limits.max:  # Clamp to maximum
-            value = round(100*self._beam_attenuator.fraction_limits.max)
+        limits = self._fraction_limits
+        if value < 100*limits.min:  # Clamp to minimum
+            value = round(100*limits.min)
+        elif value > 100*limits.max:  # Clamp to maximum
+            value = round(100*limits.max)
         return value
 
+    def destroy(self):
+        self._dispatcher.close()
+        return super().destroy()
+
 class LaserControl(ctk.CTkFrame):
-    def __init__(self, parent, beam_attenuator: BeamAttenuator):
+    def __init__(self, parent, beam_attenuator: BeamAttenuator, mirror: HardwareMirror):
         super().__init__(parent)
 
         if not isinstance(beam_attenuator, BeamAttenuator):
@@ -83,5 +113,10 @@ class LaserControl(ctk.CTkFrame):
         title_label.pack(anchor="nw", pady=(10,0), padx=10)
 
         # Create PowerFrame
-        power_frame = PowerFrame(self, self._beam_attenuator)
-        power_frame.pack(fill="x", pady=2, padx=2)
+        self.power_frame = PowerFrame(self, self._beam_attenuator, mirror)
+        self.power_frame.pack(fill="x", pady=2, padx=2)
+
+    @property
+    def fraction(self) -> float:
+        """Power fraction as shown by the slider."""
+        return self.power_frame.slider.get() / 100.0
@@ -3,6 +3,9 @@ import customtkinter as ctk
 from dirigo import units
 from dirigo.hw_interfaces.stage import MultiAxisStage, LinearStage
 from dirigo_gui.components.common import LabeledDisplay
+from dirigo_gui.hardware.stage_poller import StagePoller
+from dirigo_gui.hardware.device_lock import device_lock
+from dirigo_gui.hardware.motion import MotionQueue
 
 
 XY_VELOCITY_DEFAULT = units.Velocity("2 mm/s") # TODO set these somewhere else
@@ -70,12 +73,13 @@ class LiveLabeledEntry(ctk.CTkFrame):
         if self._on_commit:
             self._on_commit(self.entry.get().strip())
 
-    def set_live(self, s: str) -> None:
-        """Update displayed value unless user is editing."""
+    def set_live(self, s: str) -> bool:
+        """Update displayed value unless user is editing. Returns True if updated."""
         if self._editing:
-            return
+            return False
         self.entry.delete(0, "end")
         self.entry.insert(0, s)
+        return True
 
     def get(self) -> str:
         return self.entry.get().strip()
@@ -183,7 +187,7 @@ class ZControl(ctk.CTkFrame):
 
 
 class StageControl(ctk.CTkFrame):
-    POLLING_INTERVAL_MS = 50
+    POLLING_INTERVAL_MS = 50 # UI refresh from the poller's cache, no hardware I/O
     def __init__(self, 
                  parent, 
                  stage: MultiAxisStage, 
@@ -193,6 +197,22 @@ class StageControl(ctk.CTkFrame):
         super().__init__(parent, *args, **kwargs)
         self._stage = stage
         self._z_motor = z_motor
+        self.positions: dict[str, float] = {}
+        self._displayed: dict[str, str] = {} # last string pushed to each entry
+
+        axes_to_poll = {"x": stage.x, "y": stage.y}
+        locks = {"x": device_lock(stage), "y": device_lock(stage)} # shared by poller and movers
+        if z_motor:
+            axes_to_poll["z"] = z_motor
+            locks["z"] = device_lock(z_motor)
+        self.poller = StagePoller(axes_to_poll, locks=locks)
+        self.poller.start()
+        self.motion = MotionQueue(
+            axes_to_poll,
+            cached_position=self._cached_position,
+            on_command=self.poller.wake,
+            locks=locks,
+        )
         #self._is_pressed = False
 
         axes = []
@@ -281,17 +301,46 @@ class StageControl(ctk.CTkFrame):
             )
             self.z_goto.pack(side=ctk.LEFT)
 
+        # commands are set by the owner (see ReferenceGUI.open_overview, run_autofocus)
+        tools_row = ctk.CTkFrame(self, fg_color="transparent")
+        tools_row.pack(fill="x", padx=10, pady=(0, 6))
+        self.overview_button = ctk.CTkButton(tools_row, text="Overview...", width=90)
+        self.overview_button.pack(side=ctk.RIGHT)
+        if self._z_motor:
+            self.autofocus_button = ctk.CTkButton(tools_row, text="Autofocus", width=90)
+            self.autofocus_button.pack(side=ctk.RIGHT, padx=(0, 4))
+            self.autofocus_label = ctk.CTkLabel(tools_row, text="", anchor="w")
+            self.autofocus_label.pack(side=ctk.LEFT, fill="x", expand=True)
+
         self.poll_stage()
 
     # ---------------- Polling ----------------
     def poll_stage(self):
-        self.x_goto.set_live(str(self._stage.x.position.with_unit("mm")))
-        self.y_goto.set_live(str(self._stage.y.position.with_unit("mm")))
-        if self._z_motor:
-            self.z_goto.set_live(str(self._z_motor.position.with_unit("μm")))
+        """Push positions that changed since the last refresh to the entries."""
+        states = self.poller.snapshot()
+        positions = dict(self.positions)
+        for axis, unit in (("x", "mm"), ("y", "mm"), ("z", "μm")):
+            state = states.get(axis)
+            if state is None:
+                continue
+            positions[axis] = float(state.position)
+            text = str(state.position.with_unit(unit))
+            if self._displayed.get(axis) != text:
+                if getattr(self, f"{axis}_goto").set_live(text):
+                    self._displayed[axis] = text
+        self.positions = positions # last polled values, readable from any thread
 
         self.after(self.POLLING_INTERVAL_MS, self.poll_stage)
 
+    def _cached_position(self, axis: str) -> units.Position | None:
+        state = self.poller.get(axis)
+        return state.position if state else None
+
+    def destroy(self):
+        self.motion.close()
+        self.poller.stop()
+        return super().destroy()
+
     # ---------------- Parsing helpers ----------------
     def _xy_velocity(self) -> units.Velocity:
         s = self.xy_vel_entry.get()
@@ -327,43 +376,42 @@ class StageControl(ctk.CTkFrame):
 
     # ---------------- Motion primitives ----------------
 
-    def _move_relative(self, axis_obj: LinearStage, delta: units.Position) -> None:
-        new_pos = axis_obj.position + delta
-        axis_obj.move_to(new_pos)
+    def _move_relative(self, axis: str, delta: units.Position) -> None:
+        self.motion[axis].step(delta) # merged with any step not yet sent
 
     def _start_continuous(self, direction: str) -> None:
         if direction == "+y":
-            self._stage.y.move_velocity(-self._xy_velocity())
+            self.motion["y"].move_velocity(-self._xy_velocity())
         elif direction == "+x":
-            self._stage.x.move_velocity(-self._xy_velocity())
+            self.motion["x"].move_velocity(-self._xy_velocity())
         elif direction == "-y":
-            self._stage.y.move_velocity(self._xy_velocity())
+            self.motion["y"].move_velocity(self._xy_velocity())
         elif direction == "-x":
-            self._stage.x.move_velocity(self._xy_velocity())
+            self.motion["x"].move_velocity(self._xy_velocity())
         elif direction == "+z" and self._z_motor:
-            self._z_motor.move_velocity(self._z_velocity())
+            self.motion["z"].move_velocity(self._z_velocity())
         elif direction == "-z" and self._z_motor:
-            self._z_motor.move_velocity(-self._z_velocity())
+            self.motion["z"].move_velocity(-self._z_velocity())
 
     def _do_step(self, direction: str) -> None:
         if direction in {"+x", "-x", "+y", "-y"}:
             step = self._xy_step()
             if direction == "+x":
-                self._move_relative(self._stage.x, -step)
+                self._move_relative("x", -step)
             elif direction == "-x":
-                self._move_relative(self._stage.x, step)
+                self._move_relative("x", step)
             elif direction == "+y":
-                self._move_relative(self._stage.y, -step)
+                self._move_relative("y", -step)
             elif direction == "-y":
-                self._move_relative(self._stage.y, step)
+                self._move_relative("y", step)
             return
 
         if direction in {"+z", "-z"} and self._z_motor:
             step = self._z_step()
             if direction == "+z":
-                self._move_relative(self._z_motor, step)
+                self._move_relative("z", step)
             else:
-                self._move_relative(self._z_motor, -step)
+                self._move_relative("z", -step)
 
 
     # ---------------- Event handlers ----------------
@@ -381,28 +429,22 @@ class StageControl(ctk.CTkFrame):
             self._do_step(direction)
 
     def stop_all(self) -> None:
-        self._stage.x.stop()
-        self._stage.y.stop()
-        if self._z_motor:
-            self._z_motor.stop()
+        self.motion.stop_all()
 
-    def _goto_x(self, s: str) -> None:
+    def _goto(self, axis: str, s: str) -> None:
+        self._displayed.pop(axis, None) # entry was edited, refresh it on next poll
         try:
-            self._stage.x.move_to(units.Position(s))
+            self.motion[axis].move_to(units.Position(s))
         except Exception:
             pass  # optionally show validation feedback
 
+    def _goto_x(self, s: str) -> None:
+        self._goto("x", s)
+
     def _goto_y(self, s: str) -> None:
-        try:
-            self._stage.y.move_to(units.Position(s))
-        except Exception:
-            pass
+        self._goto("y", s)
 
     def _goto_z(self, s: str) -> None:
         if not self._z_motor:
             return
-        try:
-            self._z_motor.move_to(units.Position(s))
-        except Exception:
-            pass
-
+        self._goto("z", s)
@@ -0,0 +1,177 @@
+from typing import Callable, Optional
+
+import customtkinter as ctk
+
+from dirigo import units
+from dirigo_gui.components.common import LabeledEntry, LabeledDisplay
+from dirigo_gui.routines.timelapse import StagePosition, TimelapsePlan
+
+
+
+class PositionRow(ctk.CTkFrame):
+    def __init__(self, parent, position: StagePosition, on_remove: Callable[[], None]):
+        super().__init__(parent, fg_color="transparent")
+        z = "" if position.z is None else f", {units.Position(position.z).with_unit('μm')}"
+        text = (f"{position.name}: {units.Position(position.x).with_unit('mm')}, "
+                f"{units.Position(position.y).with_unit('mm')}{z}")
+        ctk.CTkLabel(self, text=text, anchor="w").pack(side=ctk.LEFT, fill="x", expand=True)
+        ctk.CTkButton(self, text="×", width=24, command=on_remove).pack(side=ctk.RIGHT)
+
+
+class TimelapseControl(ctk.CTkFrame):
+    """Position list and cadence for multi-position time-lapse."""
+    def __init__(self, parent, current_position: Callable[[], Optional[StagePosition]],
+                 stack_available: bool = False, title: Optional[str] = "Time-lapse"):
+        super().__init__(parent)
+        self._current_position = current_position
+        self.positions: list[StagePosition] = []
+        self._interval = units.Time("5 min")
+        self._rounds = 10
+        self._stack_range = (units.Position("-50 um"), units.Position("50 um"))
+        self._next_index = 1
+
+        if title: # omitted inside a LazySection, whose header shows it
+            ctk.CTkLabel(
+                self,
+                text=title,
+                font=ctk.CTkFont(size=16, weight="bold")
+            ).grid(row=0, columnspan=2, sticky="w", padx=10, pady=(0, 4))
+
+        self._list = ctk.CTkScrollableFrame(self, height=90)
+        self._list.grid(row=1, column=0, columnspan=2, padx=5, sticky="ew")
+
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        ctk.CTkButton(buttons, text="Add Current", width=90,
+                      command=self.add_current).pack(side=ctk.LEFT, padx=2)
+        ctk.CTkButton(buttons, text="Clear", width=60,
+                      command=self.clear).pack(side=ctk.LEFT, padx=2)
+        buttons.grid(row=2, column=0, columnspan=2, pady=4)
+
+        self.interval_entry = LabeledEntry(
+            self, "Every:", default=str(self._interval),
+            on_validate=self._on_interval_change
+        )
+        self.interval_entry.grid(row=3, column=0, padx=4, pady=3, sticky="e")
+        self.rounds_entry = LabeledEntry(
+            self, "Rounds:", default=str(self._rounds),
+            on_validate=self._on_rounds_change, width=45
+        )
+        self.rounds_entry.grid(row=3, column=1, padx=4, pady=3, sticky="e")
+
+        self._mode = ctk.StringVar(value="Series")
+        mode = ctk.CTkSegmentedButton(
+            self,
+            values=["Series", "Stack"] if stack_available else ["Series"],
+            variable=self._mode,
+        )
+        mode.grid(row=4, column=0, columnspan=2, pady=3)
+
+        self._autofocus_var = ctk.BooleanVar(value=False)
+        if stack_available: # autofocus needs the z motor too
+            ctk.CTkCheckBox(
+                self, text="Autofocus each visit", variable=self._autofocus_var,
+                width=10, height=10,
+            ).grid(row=6, column=0, columnspan=2, padx=5, pady=3, sticky="w")
+
+            # Stacks are taken around each position's z, unlike the absolute
+            # Lower/Upper limits of the stack specification
+            self.stack_lower_entry = LabeledEntry(
+                self, "Stack Δz from:", default=str(self._stack_range[0]),
+                on_validate=lambda raw: self._on_stack_range_change(0, raw)
+            )
+            self.stack_lower_entry.grid(row=7, column=0, padx=4, pady=3, sticky="e")
+            self.stack_upper_entry = LabeledEntry(
+                self, "to:", default=str(self._stack_range[1]),
+                on_validate=lambda raw: self._on_stack_range_change(1, raw)
+            )
+            self.stack_upper_entry.grid(row=7, column=1, padx=4, pady=3, sticky="e")
+
+        self.status_display = LabeledDisplay(self, "Status:", default="", width=150)
+        self.status_display.grid(row=5, column=0, columnspan=2, padx=4, sticky="w")
+
+    # ---------- Position list ----------
+    def add_current(self) -> None:
+        position = self._current_position()
+        if position is None:
+            return
+        position.name = f"P{self._next_index}"
+        self._next_index += 1
+        self.positions.append(position)
+        self._refresh_list()
+
+    def remove(self, position: StagePosition) -> None:
+        self.positions.remove(position)
+        self._refresh_list()
+
+    def clear(self) -> None:
+        self.positions = []
+        self._next_index = 1
+        self._refresh_list()
+
+    def _refresh_list(self) -> None:
+        for child in self._list.winfo_children():
+            child.destroy()
+        for position in self.positions:
+            PositionRow(self._list, position, 
+                        on_remove=lambda p=position: self.remove(p)).pack(fill="x")
+
+    # ---------- Cadence ----------
+    def _on_interval_change(self, raw: str) -> None:
+        try:
+            value = units.Time(raw)
+            if value <= 0:
+                raise ValueError
+            self._interval = value
+            self.interval_entry.set_text_normal()
+            self.interval_entry.set(str(self._interval))
+        except Exception:
+            self.interval_entry.set_text_red()
+
+    def _on_rounds_change(self, raw: str) -> None:
+        try:
+            value = int(raw)
+            if value == 0 or value < -1:
+                raise ValueError
+            self._rounds = value
+            self.rounds_entry.set_text_normal()
+        except Exception:
+            self.rounds_entry.set_text_red()
+
+    def _on_stack_range_change(self, end: int, raw: str) -> None:
+        entry = self.stack_upper_entry if end else self.stack_lower_entry
+        try:
+            value = units.Position(raw)
+            stack_range = list(self._stack_range)
+            stack_range[end] = value
+            if stack_range[0] >= stack_range[1]:
+                raise ValueError
+            self._stack_range = (stack_range[0], stack_range[1])
+            entry.set_text_normal()
+            entry.set(str(value))
+        except Exception:
+            entry.set_text_red()
+
+    @property
+    def acquisition_name(self) -> str:
+        return "raster_stack" if self._mode.get() == "Stack" else "raster_frame"
+
+    def generate_plan(self) -> TimelapsePlan:
+        if not self.positions:
+            raise ValueError("Add at least one position to the time-lapse.")
+        return TimelapsePlan(
+            positions   = [StagePosition(**p.to_dict()) for p in self.positions],
+            interval    = float(self._interval),
+            rounds      = self._rounds,
+            child       = self.acquisition_name,
+            autofocus   = self._autofocus_var.get(),
+            stack_range = ((float(self._stack_range[0]), float(self._stack_range[1]))
+                           if self.acquisition_name == "raster_stack" else None),
+            start       = self._current_position(), # cached, no device I/O
+        )
+
+    def report(self, statistics: dict, behind: list[str]) -> None:
+        """Show progress; `behind` names positions whose visits started late."""
+        text = f"round {statistics['rounds_completed'] + 1}, {statistics['visits']} visits"
+        if behind:
+            text += f"; late: {', '.join(behind[-3:])}"
+        self.status_display.update(text)
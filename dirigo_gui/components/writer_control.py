@@ -7,6 +7,9 @@ from platformdirs import user_documents_path
 
 from dirigo.sw_interfaces import Writer
 
+from dirigo_gui.components.common import LazySection
+from dirigo_gui.workers.reduction import ReductionSpec, BIT_DEPTHS, BINNINGS
+
 
 
 class WriterControl(ctk.CTkFrame):
@@ -45,11 +48,61 @@ class WriterControl(ctk.CTkFrame):
         save_raw_label = ctk.CTkLabel(self, text="Save Raw:", font=ctk.CTkFont(size=14, weight="bold"))
         save_raw_label.grid(row=3, column=0, sticky="e")
         self.save_raw_checkbox = ctk.CTkCheckBox(self, text="")
-        self.save_raw_checkbox.grid(row=3, column=1, columnspan=2, sticky="w", padx=5, pady=2)
+        self.save_raw_checkbox.grid(row=3, column=1, sticky="w", padx=5, pady=2)
+
+        # Review a saved series
+        self.review_button = ctk.CTkButton(self, text="Review...", command=self.open_review, width=20)
+        self.review_button.grid(row=3, column=2, padx=5, pady=2)
+
+        # Data reduction (applies to processed data only); widgets built on first expand
+        self._binning_var = ctk.StringVar(value="1x1")
+        self._bit_depth_var = ctk.StringVar(value=BIT_DEPTHS[0])
+        self.decimation = 1
+        self._decimation_var = ctk.StringVar(value=str(self.decimation))
+        self.crop: tuple[int, int, int, int] | None = None
+        self._crop_var = ctk.StringVar(value="")
+        self.reduction_section = LazySection(
+            self, "Reduction", build=self._build_reduction, fg_color="transparent"
+        )
+        self.reduction_section.grid(row=4, column=0, columnspan=3, sticky="ew", pady=(6, 2))
 
         # Configure resizing
         self.columnconfigure(1, weight=1)
 
+    def _build_reduction(self, parent) -> ctk.CTkFrame:
+        frame = ctk.CTkFrame(parent, fg_color="transparent")
+
+        binning_label = ctk.CTkLabel(frame, text="Binning:")
+        binning_label.grid(row=0, column=0, sticky="e", padx=5, pady=2)
+        self.binning_menu = ctk.CTkOptionMenu(
+            frame, values=[f"{b}x{b}" for b in BINNINGS], variable=self._binning_var, width=70
+        )
+        self.binning_menu.grid(row=0, column=1, padx=5, pady=2, sticky="w")
+
+        bit_depth_label = ctk.CTkLabel(frame, text="Bit Depth:")
+        bit_depth_label.grid(row=1, column=0, sticky="e", padx=5, pady=2)
+        self.bit_depth_menu = ctk.CTkOptionMenu(
+            frame, values=list(BIT_DEPTHS), variable=self._bit_depth_var, width=70
+        )
+        self.bit_depth_menu.grid(row=1, column=1, padx=5, pady=2, sticky="w")
+
+        decimation_label = ctk.CTkLabel(frame, text="Keep Every:")
+        decimation_label.grid(row=2, column=0, sticky="e", padx=5, pady=2)
+        self._decimation_entry = ctk.CTkEntry(frame, textvariable=self._decimation_var, width=70)
+        self._decimation_entry.grid(row=2, column=1, padx=5, pady=2, sticky="w")
+        self._decimation_entry.bind("<Return>", self._validate_decimation_input)
+        self._decimation_entry.bind("<FocusOut>", self._validate_decimation_input)
+
+        crop_label = ctk.CTkLabel(frame, text="Crop:")
+        crop_label.grid(row=3, column=0, sticky="e", padx=5, pady=2)
+        self._crop_entry = ctk.CTkEntry(frame, textvariable=self._crop_var, placeholder_text="x0, y0, w, h")
+        self._crop_entry.grid(row=3, column=1, padx=5, pady=2, sticky="ew")
+        self._crop_entry.bind("<Return>", self._validate_crop_input)
+        self._crop_entry.bind("<FocusOut>", self._validate_crop_input)
+
+        frame.columnconfigure(1, weight=1)
+        return frame
+
     def _validate_frames_per_file_input(self, event=None):
         """Validates the input of the Entry widget."""
         value = self._frames_per_file_var.get().strip()
@@ -65,21 +118,71 @@ class WriterControl(ctk.CTkFrame):
                     self._frames_per_file_var.set(str(self.frames_per_file))
                 else:
                     # The input is an int and >=1, record it in public attribute
-                    self.frames_per_file = value
+                    self.frames_per_file = number
 
             except ValueError:
                 # revert value
                 self._frames_per_file_var.set(str(self.frames_per_file))
 
+    def _validate_decimation_input(self, event=None):
+        """Validates the keep-every-Nth-frame entry."""
+        try:
+            number = int(self._decimation_var.get().strip())
+            if number < 1:
+                raise ValueError
+            self.decimation = number
+        except ValueError:
+            pass
+        self._decimation_var.set(str(self.decimation))
+
+    def _validate_crop_input(self, event=None):
+        """Validates the crop entry: blank for full frame, or 'x0, y0, w, h'."""
+        value = self._crop_var.get().strip()
+        if not value:
+            self.crop = None
+            return
+        try:
+            crop = tuple(int(v) for v in value.replace(" ", "").split(","))
+            if len(crop) != 4 or min(crop) < 0 or crop[2] < 1 or crop[3] < 1:
+                raise ValueError
+            self.crop = crop # type: ignore
+        except ValueError:
+            pass
+        self._crop_var.set("" if self.crop is None else ", ".join(str(v) for v in self.crop))
+
+    def generate_reduction_spec(self, value_range: tuple[int, int] | None = None) -> ReductionSpec:
+        """
+        Collect the reduction settings into a ReductionSpec. `value_range` is
+        only used when downcasting (8- or 12-bit output). Raises ValueError
+        for invalid settings.
+        """
+        bit_depth = self._bit_depth_var.get()
+        return ReductionSpec(
+            binning     = int(self._binning_var.get().split("x")[0]),
+            crop        = self.crop,
+            decimation  = self.decimation,
+            bit_depth   = bit_depth,
+            value_range = value_range if bit_depth != "Native" else None,
+        )
+
     def select_save_path(self):
         self.save_path = filedialog.askdirectory(initialdir=self.save_path)
         if self.save_path:
             print(f"Selected directory: {self.save_path}")
 
+    def open_review(self):
+        """Pick a saved file and open its series in a playback window."""
+        path = filedialog.askopenfilename(
+            initialdir=self.save_path, filetypes=[("TIFF series", "*.tif")]
+        )
+        if path:
+            from dirigo_gui.widgets.playback import PlaybackWindow # deferred: loads tifffile/dirigo writers
+            PlaybackWindow(self.winfo_toplevel(), path)
+
     def link_writer_worker(self, writer_worker: Writer):
         """Transfer writer GUI settings to the writer worker (thread)."""
         writer_worker.save_path = Path(self.save_path)
         writer_worker.basename = self.basename_entry.get()
-        writer_worker.frames_per_file = int(self._frames_per_file_entry.get())
+        writer_worker.frames_per_file = self.frames_per_file # int, or float('inf') for a single file
 
 
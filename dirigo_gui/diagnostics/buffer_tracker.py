@@ -0,0 +1,262 @@
+"""
+Debug tracker for the lifecycle of pooled product buffers.
+
+Every worker publishes products from a fixed pool: a buffer is taken from
+the pool (Worker._get_free_product), published to subscribers, and goes
+back to the pool when the last of them releases it. A consumer that forgets
+to release stalls the producer once the pool is empty; a consumer that
+keeps using a buffer after releasing it sees it overwritten by the producer.
+
+While installed, the tracker wraps the dirigo Product and Worker methods
+involved, and ImageViewer.show and _paste (redraws), and records:
+
+- per pool: its size, how many buffers are out, and the high-water mark;
+- buffers out of their pool for longer than `stale_after` (never released);
+- buffers painted by a viewer while no consumer holds them (use after release),
+  and releases past zero, with the call site.
+
+It is meant for debugging (--debug-buffers); every publish and release
+takes a lock.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import json
+import threading
+import time
+import traceback
+
+from platformdirs import user_log_dir
+
+from dirigo.sw_interfaces.worker import Worker, Product
+
+from dirigo_gui.diagnostics.stall_watchdog import _site
+from dirigo_gui.widgets.image_display import ImageViewer
+
+
+
+@dataclass
+class PoolStats:
+    owner: str          # worker class and thread name
+    kind: str           # product class
+    size: int = 0       # buffers seen (in the pool or out)
+    out: int = 0        # buffers currently out of the pool
+    high_water: int = 0 # most buffers out at once
+    acquired: int = 0   # times a buffer was taken from the pool
+    returned: int = 0   # times a buffer went back to the pool
+
+
+@dataclass
+class BufferState:
+    product: Product
+    pool: int                           # id of the pool queue
+    generation: int = 0                 # times taken from the pool
+    out_since: Optional[float] = None   # perf_counter when taken; None while in the pool
+
+
+@dataclass
+class Violation:
+    kind: str       # "use after release" or "over-release"
+    owner: str
+    site: str
+    time: float = field(default_factory=time.time)
+    stack: list[str] = field(default_factory=list)
+
+
+class BufferTracker:
+    LOG_DIR = Path(user_log_dir("Dirigo-GUI", "Dirigo")) / "buffers"
+    MAX_VIOLATIONS = 100 # kept with stacks; later ones are only counted
+
+    def __init__(self, stale_after: float = 2.0):
+        self.stale_after = stale_after # s out of the pool before a buffer is reported as unreleased
+        self._lock = threading.Lock()
+        self.pools: dict[int, PoolStats] = {}
+        self._buffers: dict[int, BufferState] = {} # by id(product)
+        self._products: dict[int, Product] = {} # by id(product.data), to find the product a frame belongs to
+        self.violations: list[Violation] = []
+        self.violation_counts: dict[str, int] = {}
+        self._originals: dict[tuple[type, str], object] = {}
+
+    # ---------- Installing ----------
+    def install(self) -> None:
+        tracker = self
+        get_free_product = Worker._get_free_product
+        add_consumers = Product._add_consumers
+        release = Product._release
+        show = ImageViewer.show
+        paste = ImageViewer._paste
+
+        def _get_free_product(worker):
+            product = get_free_product(worker)
+            tracker._taken(worker, product)
+            return product
+
+        def _add_consumers(product, n: int):
+            generation = tracker._generation(product)
+            add_consumers(product, n)
+            if n == 0:
+                tracker._returned(product, generation)
+
+        def _release(product):
+            generation = tracker._generation(product)
+            try:
+                release(product)
+            except RuntimeError:
+                tracker._violation("over-release", product)
+                raise
+            if product._remaining == 0:
+                tracker._returned(product, generation)
+
+        def _show(viewer, frame):
+            tracker.check_use(frame)
+            return show(viewer, frame)
+
+        def _paste(viewer, frame, is_resize: bool = False):
+            tracker.check_use(frame)
+            return paste(viewer, frame, is_resize)
+
+        self._originals = {
+            (Worker, "_get_free_product"):  get_free_product,
+            (Product, "_add_consumers"):    add_consumers,
+            (Product, "_release"):          release,
+            (ImageViewer, "show"):          show,
+            (ImageViewer, "_paste"):        paste,
+        }
+        Worker._get_free_product = _get_free_product # type: ignore
+        Product._add_consumers = _add_consumers # type: ignore
+        Product._release = _release # type: ignore
+        ImageViewer.show = _show # type: ignore
+        ImageViewer._paste = _paste # type: ignore
+
+    def uninstall(self) -> None:
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals = {}
+
+    # ---------- Events ----------
+    def _generation(self, product: Product) -> int:
+        state = self._buffers.get(id(product))
+        return state.generation if state is not None else -1
+
+    def _taken(self, worker: Worker, product: Product) -> None:
+        pool_id = id(worker._product_pool)
+        with self._lock:
+            stats = self.pools.get(pool_id)
+            if stats is None:
+                stats = self.pools[pool_id] = PoolStats(
+                    f"{type(worker).__name__} ({worker.name})", type(product).__name__
+                )
+            state = self._buffers.get(id(product))
+            if state is None:
+                state = self._buffers[id(product)] = BufferState(product, pool_id)
+                self._products[id(product.data)] = product
+            elif state.out_since is not None: # its return raced with this, count it now
+                stats.out -= 1
+                stats.returned += 1
+            state.generation += 1
+            state.out_since = time.perf_counter()
+            stats.acquired += 1
+            stats.out += 1
+            stats.size = max(stats.size, stats.out + worker._product_pool.qsize())
+            stats.high_water = max(stats.high_water, stats.out)
+
+    def _returned(self, product: Product, generation: int) -> None:
+        with self._lock:
+            state = self._buffers.get(id(product))
+            if state is None or state.generation != generation or state.out_since is None:
+                return # untracked, or already taken again (see _taken)
+            state.out_since = None
+            stats = self.pools[state.pool]
+            stats.out -= 1
+            stats.returned += 1
+
+    def check_use(self, frame) -> None:
+        """Record a violation if `frame` is (a view of) a product buffer that is back in its pool."""
+        array = frame
+        while array is not None:
+            product = self._products.get(id(array))
+            if product is not None and product.data is array:
+                if product._remaining == 0: # in the pool, or taken again by the producer
+                    self._violation("use after release", product)
+                return
+            array = getattr(array, "base", None)
+
+    def _violation(self, kind: str, product: Product) -> None:
+        stack = traceback.StackSummary.from_list(traceback.extract_stack()[:-2]) # drop the tracker's frames
+        with self._lock:
+            state = self._buffers.get(id(product))
+            owner = self.pools[state.pool].owner if state is not None else type(product).__name__
+            self.violation_counts[kind] = self.violation_counts.get(kind, 0) + 1
+            if len(self.violations) < self.MAX_VIOLATIONS:
+                self.violations.append(Violation(kind, owner, _site(stack), stack=stack.format()))
+
+    # ---------- Results ----------
+    def unreleased(self) -> list[dict]:
+        """Buffers out of their pool for longer than stale_after."""
+        now = time.perf_counter()
+        with self._lock:
+            return [{
+                "owner":        self.pools[state.pool].owner,
+                "kind":         self.pools[state.pool].kind,
+                "out_s":        now - state.out_since,
+                "references":   state.product._remaining,
+            } for state in self._buffers.values()
+              if state.out_since is not None and now - state.out_since > self.stale_after]
+
+    def report(self) -> dict:
+        unreleased = self.unreleased()
+        with self._lock:
+            return {
+                "stale_after_s":    self.stale_after,
+                "pools":            [vars(stats).copy() for stats in self.pools.values()],
+                "unreleased":       unreleased,
+                "violation_counts": dict(self.violation_counts),
+                "violations": [{
+                    "kind":     v.kind,
+                    "owner":    v.owner,
+                    "site":     v.site,
+                    "time":     datetime.fromtimestamp(v.time).isoformat(timespec="seconds"),
+                    "stack":    v.stack,
+                } for v in self.violations],
+            }
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = ["Buffer pools (out of the pool at most / size):"]
+        for pool in report["pools"]:
+            lines.append(f"  {pool['owner']}: {pool['high_water']}/{pool['size']} {pool['kind']}s, "
+                         f"{pool['out']} out now")
+        for buffer in report["unreleased"]:
+            lines.append(f"  UNRELEASED {buffer['kind']} from {buffer['owner']}: out for "
+                         f"{buffer['out_s']:.1f} s with {buffer['references']} reference(s)")
+        for kind, count in report["violation_counts"].items():
+            sites = sorted({v["site"] for v in report["violations"] if v["kind"] == kind})
+            lines.append(f"  {count} {kind.upper()}: {', '.join(sites)}")
+        return "\n".join(lines)
+
+    @property
+    def problems(self) -> bool:
+        return bool(self.violation_counts) or bool(self.unreleased())
+
+    def save(self) -> Optional[Path]:
+        """Write the report to the log directory, if there were any problems."""
+        if not self.problems:
+            return None
+        self.LOG_DIR.mkdir(parents=True, exist_ok=True)
+        path = self.LOG_DIR / f"buffers_{datetime.now():%Y%m%d_%H%M%S}.json"
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+        return path
+
+    def clear(self) -> None:
+        """Forget pools with no buffers out (e.g. of finished acquisitions) and the violations."""
+        with self._lock:
+            idle = {pool_id for pool_id, stats in self.pools.items() if stats.out == 0}
+            for buffer_id in [b for b, state in self._buffers.items() if state.pool in idle]:
+                del self._buffers[buffer_id]
+            self._products = {k: p for k, p in self._products.items() if id(p) in self._buffers}
+            for pool_id in idle:
+                del self.pools[pool_id]
+            self.violations = []
+            self.violation_counts = {}
@@ -0,0 +1,396 @@
+"""
+Scripted UI-responsiveness harness for the reference GUI.
+
+An interaction script is replayed against ReferenceGUI running on the
+simulated rig (see dirigo_gui.simulation). Actions go through the same
+widget bindings a user's clicks, drags and key presses would (the preview
+button, the display sliders' canvases, the jog arrows, the zoom
+accelerators), so whatever those handlers do on the Tk thread is measured.
+
+For each event, latency is from when it was due to when its handler and
+the redraws it queued have finished (update_idletasks), i.e. it includes
+any time the event waited behind other work in the event loop. The frames
+the LiveViewer shows are timestamped, so the display frame rate during each
+step can be compared with the rate while the preview runs undisturbed
+("wait" steps).
+
+A script is a JSON object with a list of steps, times in seconds from the
+start of the replay:
+
+    {"name": "jog", "end": 6.0, "steps": [
+        {"at": 0.0, "action": "start_preview"},
+        {"at": 1.0, "action": "wait", "duration": 2.0},
+        {"at": 3.0, "action": "jog", "direction": "+x", "mode": "Continuous", "hold": 1.0},
+        {"at": 5.0, "action": "stop_preview"}]}
+
+Actions and their parameters:
+
+- start_preview, stop_preview
+- wait: duration
+- drag_slider: channel, slider ("min" or "max"), from, to (fractions of the
+  slider), duration, events
+- jog: direction ("+x", "-y", "+z", ...), mode ("Step" or "Continuous"),
+  hold (s between press and release)
+- zoom: direction (+1 or -1)
+
+Steps are named by their "label", or by their action. Without a script, a
+built-in one exercising every action is run. Reports are JSON; runs can be
+compared, and the exit status is 1 if any event's p95 latency or any
+step's display frame rate regressed or is outside the given limits:
+
+    python -m dirigo_gui.diagnostics.interaction_replay -o new.json --compare old.json
+
+On Linux without a display, Xvfb is started if it is installed.
+"""
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+import argparse
+import copy
+import json
+import platform
+import sys
+import time
+import tkinter
+
+import numpy as np
+
+from dirigo_gui.diagnostics.render_benchmark import virtual_display, _summarize
+from dirigo_gui.reference_gui import ReferenceGUI
+from dirigo_gui.simulation.acquisition import SimulatedFrameAcquisition
+from dirigo_gui.simulation.controller import SimulatedDirigo
+from dirigo_gui.simulation.hardware import SimulationConfig
+
+
+ACTIONS = ("start_preview", "stop_preview", "wait", "drag_slider", "jog", "zoom")
+WINDOW = 0.5            # s, shortest window the display frame rate is measured over
+READY_TIMEOUT = 30.0    # s to wait for the hardware to initialize
+SETTLE = 0.5            # s after the last step before the replay ends
+
+DEFAULT_SCRIPT = {
+    "name": "default",
+    "steps": [
+        {"at": 0.0, "action": "start_preview"},
+        {"at": 1.0, "action": "wait", "duration": 2.0, "label": "idle"},
+        {"at": 3.0, "action": "drag_slider", "channel": 0, "slider": "min",
+         "from": 0.5, "to": 0.55, "duration": 1.5, "events": 45},
+        {"at": 5.0, "action": "jog", "direction": "+x", "mode": "Continuous", "hold": 1.0},
+        {"at": 6.5, "action": "jog", "direction": "-y", "mode": "Step", "hold": 0.1,
+         "label": "jog step"},
+        {"at": 7.5, "action": "zoom", "direction": 1, "label": "zoom in"},
+        {"at": 8.5, "action": "zoom", "direction": -1, "label": "zoom out"},
+        {"at": 9.5, "action": "stop_preview"},
+    ],
+}
+
+
+class ReplayError(RuntimeError):
+    pass
+
+
+def load_script(script: dict) -> dict:
+    """Validate `script`, filling in step labels, windows and the end time."""
+    script = copy.deepcopy(script)
+    steps = sorted(script.get("steps", []), key=lambda s: s["at"])
+    if not steps:
+        raise ValueError("Interaction script has no steps")
+    labels: dict[str, int] = {}
+    for step in steps:
+        if step.get("action") not in ACTIONS:
+            raise ValueError(f"Unknown action {step.get('action')!r}, expected one of {ACTIONS}")
+        label = step.get("label", step["action"])
+        labels[label] = labels.get(label, 0) + 1
+        step["label"] = label if labels[label] == 1 else f"{label} #{labels[label]}"
+        step["window"] = max(float(step.get("duration", step.get("hold", 0.0))), WINDOW)
+    script["steps"] = steps
+    script.setdefault("name", "unnamed")
+    script.setdefault("end", max(s["at"] + s["window"] for s in steps) + SETTLE)
+    return script
+
+
+@dataclass
+class EventRecord:
+    kind: str
+    step: str
+    due: float          # s from the start of the replay
+    latency: float      # s from due to handled and redrawn
+    handler: float      # s in the handler and redraw
+
+
+class InteractionReplay:
+    """Replays a loaded script against `gui`, which must be freshly built."""
+    def __init__(self, gui: ReferenceGUI, script: dict):
+        self.gui = gui
+        self.script = script
+        self.events: list[EventRecord] = []
+        self.frames: list[float] = [] # s from the start of the replay, per frame shown
+        self._t0 = 0.0
+        self._error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        self.gui.report_callback_exception = self._callback_error
+        self._wait_ready(time.perf_counter() + READY_TIMEOUT)
+        self.gui.mainloop()
+        if self._error is not None:
+            raise ReplayError(f"Replay of {self.script['name']!r} failed") from self._error
+
+    def _callback_error(self, exc, value, tb):
+        if self._error is None:
+            self._error = value
+        self.gui.quit()
+
+    def _wait_ready(self, deadline: float):
+        gui = self.gui
+        if (gui.hw_init.done and not gui._pending_attachments
+                and gui.acquisition_control.preview_button.cget("state") == "normal"):
+            self._start()
+        elif time.perf_counter() > deadline:
+            raise ReplayError(f"The GUI was not ready within {READY_TIMEOUT:g} s")
+        else:
+            gui.after(50, self._wait_ready, deadline)
+
+    def _start(self):
+        viewer = self.gui.viewer
+        show = viewer.show
+
+        def timed_show(frame):
+            show(frame)
+            self.frames.append(time.perf_counter() - self._t0)
+
+        viewer.show = timed_show # type: ignore
+        self.gui.focus_force() # for the zoom accelerators
+
+        self._t0 = time.perf_counter()
+        for step in self.script["steps"]:
+            for due, kind, handler in getattr(self, f"_{step['action']}")(step):
+                self._schedule(due, self._fire, step["label"], kind, due, handler)
+        self._schedule(self.script["end"], self._finish)
+
+    def _schedule(self, due: float, callback: Callable, *args):
+        delay = self._t0 + due - time.perf_counter()
+        self.gui.after(max(round(1000 * delay), 0), callback, *args)
+
+    def _fire(self, step: str, kind: str, due: float, handler: Callable[[], None]):
+        t_run = time.perf_counter()
+        handler()
+        self.gui.update_idletasks()
+        t_done = time.perf_counter()
+        self.events.append(EventRecord(
+            kind, step, due,
+            latency = max(t_done - self._t0 - due, 0.0),
+            handler = t_done - t_run,
+        ))
+
+    def _finish(self):
+        if self.gui.acquisition_control.acquisition_running:
+            self.gui.acquisition_control.preview_button.invoke() # not measured
+        self.gui.quit()
+
+    # ---------- Actions: each returns its events as (due, kind, handler) ----------
+    def _start_preview(self, step: dict):
+        return [(step["at"], "start_preview", lambda: self._toggle_preview(start=True))]
+
+    def _stop_preview(self, step: dict):
+        return [(step["at"], "stop_preview", lambda: self._toggle_preview(start=False))]
+
+    def _toggle_preview(self, start: bool):
+        control = self.gui.acquisition_control
+        if control.acquisition_running == start:
+            raise ReplayError(f"Preview already {'running' if start else 'stopped'}")
+        control.preview_button.invoke()
+
+    def _wait(self, step: dict):
+        return []
+
+    def _drag_slider(self, step: dict):
+        channel_frame = self.gui.display_control.channel_frames[step.get("channel", 0)]
+        slider = getattr(channel_frame, f"{step.get('slider', 'min')}_slider")
+        n = max(int(step.get("events", 30)), 1)
+        times = np.linspace(step["at"], step["at"] + step.get("duration", WINDOW), n)
+        fractions = np.linspace(step.get("from", 0.0), step.get("to", 0.1), n)
+
+        def pointer(sequence: str, fraction: float):
+            x = slider._apply_widget_scaling(fraction * slider._current_width)
+            y = slider._apply_widget_scaling(slider._current_height / 2)
+            return lambda: slider._canvas.event_generate(sequence, x=round(x), y=round(y))
+
+        return [(float(t), "drag_slider", pointer("<Button-1>" if i == 0 else "<B1-Motion>", f))
+                for i, (t, f) in enumerate(zip(times, fractions))]
+
+    def _jog(self, step: dict):
+        stage_control = self.gui.stage_control
+        xy, z = stage_control.xy, stage_control.z
+        button = {
+            "+y": xy.btn_up, "+x": xy.btn_right, "-y": xy.btn_down, "-x": xy.btn_left,
+            "+z": z.btn_up, "-z": z.btn_down,
+        }[step["direction"]]
+        mode = step.get("mode")
+
+        def press():
+            if mode is not None:
+                stage_control._mode.set(mode)
+            button._canvas.event_generate("<ButtonPress-1>")
+
+        release = lambda: button._canvas.event_generate("<ButtonRelease-1>")
+        return [(step["at"], "jog_press", press),
+                (step["at"] + step.get("hold", 0.1), "jog_release", release)]
+
+    def _zoom(self, step: dict):
+        sequence = "<Control-equal>" if step.get("direction", 1) > 0 else "<Control-minus>"
+        return [(step["at"], "zoom", lambda: self.gui.event_generate(sequence))]
+
+    # ---------- Results ----------
+    def _fps(self, start: float, stop: float) -> float:
+        frames = np.asarray(self.frames)
+        return float(np.count_nonzero((frames >= start) & (frames < stop)) / (stop - start))
+
+    def report(self, config: Optional[SimulationConfig] = None) -> dict:
+        events: dict[str, dict] = {}
+        for kind in dict.fromkeys(e.kind for e in self.events):
+            records = [e for e in self.events if e.kind == kind]
+            events[kind] = {
+                "count":        len(records),
+                "latency_ms":   _summarize([e.latency for e in records]),
+                "handler_ms":   _summarize([e.handler for e in records]),
+            }
+
+        idle = [s for s in self.script["steps"] if s["action"] == "wait"]
+        idle_time = sum(s["window"] for s in idle)
+        baseline = (sum(self._fps(s["at"], s["at"] + s["window"]) * s["window"] for s in idle)
+                    / idle_time if idle_time else None)
+        steps = []
+        for s in self.script["steps"]:
+            if s["action"] in ("start_preview", "stop_preview"):
+                fps = None # not in steady state
+            else:
+                fps = self._fps(s["at"], s["at"] + s["window"])
+            steps.append({
+                "label":        s["label"],
+                "action":       s["action"],
+                "at":           s["at"],
+                "window_s":     s["window"],
+                "display_fps":  fps,
+                "fps_impact":   1 - fps / baseline if fps is not None and baseline else None,
+            })
+
+        return {
+            "created":      datetime.now().isoformat(timespec="seconds"),
+            "platform":     platform.platform(),
+            "python":       platform.python_version(),
+            "tk":           tkinter.TkVersion,
+            "script":       self.script["name"],
+            "simulation":   asdict(config) if config is not None else None,
+            "frames_shown": len(self.frames),
+            "baseline_fps": baseline,
+            "events":       events,
+            "steps":        steps,
+        }
+
+
+def replay(script: dict, config: Optional[SimulationConfig] = None) -> dict:
+    """Build the GUI on the simulated rig, replay `script` and return the report."""
+    script = load_script(script)
+    config = config or SimulationConfig(init_latency=0.0, seed=0)
+    gui = ReferenceGUI(
+        SimulatedDirigo(config),
+        frame_spec=SimulatedFrameAcquisition.get_specification(),
+        persist_settings=False, # leave the user's settings and telemetry log alone
+        telemetry=False,
+    )
+    session = InteractionReplay(gui, script)
+    try:
+        session.run()
+    finally:
+        if gui.acquisition_control.acquisition_running:
+            gui.stop_acquisition()
+        gui.destroy()
+    return session.report(config)
+
+
+def compare(new: dict, old: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    Events whose p95 latency, and steps whose display fps, are worse than in
+    `old` by more than `tolerance` (fractional).
+    """
+    regressions = []
+    for kind, event in new["events"].items():
+        before = old["events"].get(kind)
+        if before is None:
+            continue
+        p95, p95_before = event["latency_ms"].get("p95"), before["latency_ms"].get("p95")
+        if p95 is not None and p95_before and p95 > p95_before * (1 + tolerance):
+            regressions.append(f"{kind}: p95 latency {p95_before:.1f} -> {p95:.1f} ms")
+
+    previous = {s["label"]: s for s in old["steps"]}
+    for step in new["steps"]:
+        before = previous.get(step["label"])
+        if before is None or step["display_fps"] is None or not before["display_fps"]:
+            continue
+        fps, fps_before = step["display_fps"], before["display_fps"]
+        if fps < fps_before * (1 - tolerance):
+            regressions.append(f"{step['label']}: display {fps_before:.1f} -> {fps:.1f} fps")
+    return regressions
+
+
+def check(report: dict,
+          max_p95_ms: Optional[float] = None,
+          min_fps: Optional[float] = None) -> list[str]:
+    """Events and steps outside absolute limits."""
+    failures = []
+    if max_p95_ms is not None:
+        for kind, event in report["events"].items():
+            p95 = event["latency_ms"].get("p95")
+            if p95 is not None and p95 > max_p95_ms:
+                failures.append(f"{kind}: p95 latency {p95:.1f} ms > {max_p95_ms:g} ms")
+    if min_fps is not None:
+        for step in report["steps"]:
+            fps = step["display_fps"]
+            if fps is not None and fps < min_fps:
+                failures.append(f"{step['label']}: display {fps:.1f} fps < {min_fps:g} fps")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay an interaction script against the reference GUI on simulated hardware"
+    )
+    parser.add_argument("script", type=Path, nargs="?", default=None,
+                        help="JSON interaction script (default: a built-in script using every action)")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="write the JSON report here (default: stdout)")
+    parser.add_argument("--channels", type=int, default=2,
+                        help="simulated channels (default 2)")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="simulated frame rate (default: from the scanners and frame spec)")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="previous report; exit with status 1 if any event or step regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="fractional slowdown counted as a regression (default 0.2)")
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="exit with status 1 if any event's p95 latency exceeds this")
+    parser.add_argument("--min-fps", type=float, default=None,
+                        help="exit with status 1 if the display frame rate during any step is below this")
+    args = parser.parse_args()
+
+    script = DEFAULT_SCRIPT if args.script is None else json.loads(args.script.read_text())
+    config = SimulationConfig(channels=args.channels, frame_rate=args.fps, init_latency=0.0, seed=0)
+    with virtual_display():
+        report = replay(script, config)
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(text)
+
+    failures = check(report, args.max_p95_ms, args.min_fps)
+    if args.compare is not None:
+        failures += compare(report, json.loads(args.compare.read_text()), args.tolerance)
+    for line in failures:
+        print("REGRESSION", line, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Rendering benchmark for ImageViewer and LiveViewer.
+
+Two kinds of case are run for every frame size and zoom level:
+
+- "show": ImageViewer.show is called back to back from the Tk event loop,
+  which gives the cost of rendering one frame (resize, PhotoImage transfer
+  and the canvas redraw, which is forced with update_idletasks so it is
+  included).
+- "live": a producer thread publishes DisplayProducts to a LiveViewer at a
+  fixed rate, as the Display worker does, and the frames the viewer shows
+  are counted. Frames superseded in the viewer's inbox are dropped; frames
+  that find no free buffer in the pool (the viewer is holding them all)
+  are counted as starved.
+
+Results are written as JSON so runs from two versions can be compared:
+
+    python -m dirigo_gui.diagnostics.render_benchmark -o new.json --compare old.json
+
+On Linux without a display, Xvfb is started if it is installed.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+import argparse
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import tkinter
+
+import customtkinter as ctk
+import numpy as np
+import PIL
+
+from dirigo.sw_interfaces.display import DisplayProduct
+
+from dirigo_gui.widgets.image_display import ImageViewer, LiveViewer
+
+
+SIZES = (256, 512, 1024, 2048, 4096)
+RATES = (10.0, 30.0, 60.0, 120.0) # fps offered to the LiveViewer
+MAX_ZOOMED_SIDE = 8192 # larger zoomed images are skipped (Tk needs 4 bytes per pixel)
+
+
+@dataclass
+class CaseResult:
+    viewer: str                     # "show" or "live"
+    size: int                       # frame width and height (pixels)
+    zoom: float
+    rate: Optional[float] = None    # offered fps ("live" only)
+    duration_s: float = 0.0
+    frames_offered: int = 0
+    frames_shown: int = 0
+    frames_dropped: int = 0         # superseded in the viewer's inbox
+    frames_starved: int = 0         # no free buffer when due
+    drop_rate: float = 0.0          # (dropped + starved) / offered
+    display_fps: float = 0.0
+    render_ms: dict = field(default_factory=dict) # mean, p50, p95, max
+    skipped: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        rate = "" if self.rate is None else f"@{self.rate:g}fps"
+        return f"{self.viewer} {self.size}x{self.size} zoom {self.zoom:g}{rate}"
+
+
+def _summarize(durations: list[float]) -> dict:
+    if not durations:
+        return {}
+    d = 1000 * np.asarray(durations)
+    return {
+        "mean": float(d.mean()),
+        "p50":  float(np.percentile(d, 50)),
+        "p95":  float(np.percentile(d, 95)),
+        "max":  float(d.max()),
+    }
+
+
+def synthetic_frames(size: int, n: int) -> list[np.ndarray]:
+    """n distinct (size, size, 3) uint8 frames: a moving colour gradient."""
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    frames = []
+    for i in range(n):
+        shift = i * size // max(n, 1)
+        frame = np.empty((size, size, 3), np.uint8)
+        frame[:, :, 0] = np.roll(ramp, shift)[None, :]
+        frame[:, :, 1] = np.roll(ramp, shift)[:, None]
+        frame[:, :, 2] = 255 - frame[:, :, 0] // 2 - frame[:, :, 1] // 2
+        frames.append(frame)
+    return frames
+
+
+@contextmanager
+def virtual_display() -> Iterator[Optional[str]]:
+    """Start Xvfb if running on Linux without a display; yields the display used."""
+    if sys.platform != "linux" or os.environ.get("DISPLAY"):
+        yield os.environ.get("DISPLAY")
+        return
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise RuntimeError("No display available and Xvfb is not installed")
+    display = f":{100 + os.getpid() % 100}"
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "8192x8192x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    try:
+        time.sleep(0.5) # let the server come up
+        yield display
+    finally:
+        del os.environ["DISPLAY"]
+        process.terminate()
+        process.wait(timeout=5)
+
+
+class RenderBenchmark:
+    def __init__(self,
+                 sizes: tuple[int, ...] = SIZES,
+                 zooms: Optional[tuple[float, ...]] = None,
+                 rates: tuple[float, ...] = RATES,
+                 duration: float = 3.0,  # s per live case
+                 show_frames: int = 30): # frames per show case
+        self.sizes = sizes
+        self.zooms = tuple(ImageViewer.ZOOMS) if zooms is None else zooms
+        self.rates = rates
+        self.duration = duration
+        self.show_frames = show_frames
+        self.results: list[CaseResult] = []
+
+        self._root = ctk.CTk()
+        self._root.title("Render benchmark")
+
+    def run(self) -> list[CaseResult]:
+        try:
+            for size in self.sizes:
+                frames = synthetic_frames(size, 4 if size <= 2048 else 2)
+                for zoom in self.zooms:
+                    if size * zoom > MAX_ZOOMED_SIDE:
+                        reason = f"zoomed side {size * zoom:g} > {MAX_ZOOMED_SIDE}"
+                        self.results.append(CaseResult("show", size, zoom, skipped=reason))
+                        self.results += [CaseResult("live", size, zoom, rate, skipped=reason)
+                                         for rate in self.rates]
+                        continue
+                    self.results.append(self._show_case(frames, zoom))
+                    for rate in self.rates:
+                        self.results.append(self._live_case(frames, zoom, rate))
+                    print(f"{size}x{size} zoom {zoom:g} done", file=sys.stderr)
+        finally:
+            self._root.destroy()
+        return self.results
+
+    def _viewer(self, viewer_class, size: int, zoom: float):
+        viewer = viewer_class(self._root, size, size)
+        viewer.set_zoom(zoom)
+        viewer.configure_size(size, size)
+        viewer.pack()
+        self._root.update()
+        return viewer
+
+    def _show_case(self, frames: list[np.ndarray], zoom: float) -> CaseResult:
+        size = frames[0].shape[0]
+        viewer = self._viewer(ImageViewer, size, zoom)
+        durations = []
+        try:
+            viewer.show(frames[0]) # first call creates the PhotoImage
+            self._root.update_idletasks()
+            t_start = time.perf_counter()
+            for i in range(self.show_frames):
+                t0 = time.perf_counter()
+                viewer.show(frames[i % len(frames)])
+                self._root.update_idletasks() # the canvas redraw
+                durations.append(time.perf_counter() - t0)
+                self._root.update() # handle pending events, as the event loop would
+            elapsed = time.perf_counter() - t_start
+        finally:
+            viewer.destroy()
+        return CaseResult(
+            "show", size, zoom,
+            duration_s      = elapsed,
+            frames_offered  = self.show_frames,
+            frames_shown    = self.show_frames,
+            display_fps     = self.show_frames / elapsed,
+            render_ms       = _summarize(durations),
+        )
+
+    def _live_case(self, frames: list[np.ndarray], zoom: float, rate: float) -> CaseResult:
+        durations: list[float] = []
+
+        class TimedViewer(LiveViewer):
+            closed = False
+
+            def poll_queue(self):
+                if not self.closed: # stop polling once the case is over
+                    super().poll_queue()
+
+            def show(self, frame: np.ndarray) -> None:
+                t0 = time.perf_counter()
+                super().show(frame)
+                self.update_idletasks()
+                durations.append(time.perf_counter() - t0)
+
+        size = frames[0].shape[0]
+        viewer = self._viewer(TimedViewer, size, zoom)
+
+        pool: queue.Queue = queue.Queue()
+        for frame in frames:
+            pool.put(DisplayProduct(pool, frame))
+        stop = threading.Event()
+        counts = {"offered": 0, "starved": 0}
+
+        def produce():
+            period = 1 / rate
+            due = time.perf_counter()
+            while not stop.is_set():
+                due += period
+                stop.wait(max(due - time.perf_counter(), 0))
+                counts["offered"] += 1
+                try:
+                    product = pool.get_nowait()
+                except queue.Empty:
+                    counts["starved"] += 1
+                    continue
+                product._add_consumers(1)
+                viewer._inbox.put(product)
+
+        producer = threading.Thread(target=produce, name="BenchmarkProducer", daemon=True)
+        try:
+            self._root.after(int(1000 * self.duration), stop.set)
+            t_start = time.perf_counter()
+            producer.start()
+            while not stop.is_set():
+                self._root.update()
+                time.sleep(0.001)
+            producer.join()
+            elapsed = time.perf_counter() - t_start
+            self._root.update() # show anything still queued
+        finally:
+            viewer.closed = True
+            viewer.destroy()
+
+        offered, starved, shown = counts["offered"], counts["starved"], len(durations)
+        dropped = max(offered - starved - shown, 0)
+        return CaseResult(
+            "live", size, zoom, rate,
+            duration_s      = elapsed,
+            frames_offered  = offered,
+            frames_shown    = shown,
+            frames_dropped  = dropped,
+            frames_starved  = starved,
+            drop_rate       = (dropped + starved) / offered if offered else 0.0,
+            display_fps     = shown / elapsed,
+            render_ms       = _summarize(durations),
+        )
+
+    def report(self) -> dict:
+        return {
+            "created":  datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "python":   platform.python_version(),
+            "tk":       tkinter.TkVersion,
+            "pillow":   PIL.__version__,
+            "cases":    [asdict(r) for r in self.results],
+        }
+
+
+def compare(new: dict, old: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    Cases whose p95 render cost or display fps are worse than in `old` by
+    more than `tolerance` (fractional).
+    """
+    def key(case: dict) -> tuple:
+        return (case["viewer"], case["size"], case["zoom"], case["rate"])
+
+    previous = {key(c): c for c in old["cases"] if not c.get("skipped")}
+    regressions = []
+    for case in new["cases"]:
+        before = previous.get(key(case))
+        if case.get("skipped") or before is None:
+            continue
+        name = CaseResult(case["viewer"], case["size"], case["zoom"], case["rate"]).key
+        p95, p95_before = case["render_ms"].get("p95"), before["render_ms"].get("p95")
+        if p95 is not None and p95_before and p95 > p95_before * (1 + tolerance):
+            regressions.append(f"{name}: p95 render {p95_before:.2f} -> {p95:.2f} ms")
+        fps, fps_before = case["display_fps"], before["display_fps"]
+        if fps_before and fps < fps_before * (1 - tolerance):
+            regressions.append(f"{name}: display {fps_before:.1f} -> {fps:.1f} fps")
+    return regressions
+
+
+def _floats(text: str) -> tuple[float, ...]:
+    return tuple(float(v) for v in text.split(","))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ImageViewer/LiveViewer rendering")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="write the JSON report here (default: stdout)")
+    parser.add_argument("--sizes", type=lambda s: tuple(int(v) for v in s.split(",")),
+                        default=SIZES, help="frame sizes, comma separated (default 256,...,4096)")
+    parser.add_argument("--zooms", type=_floats, default=None,
+                        help="zoom levels, comma separated (default: every ImageViewer zoom)")
+    parser.add_argument("--rates", type=_floats, default=RATES,
+                        help="offered frame rates for LiveViewer, comma separated (default 10,30,60,120)")
+    parser.add_argument("--duration", type=float, default=3.0,
+                        help="seconds per LiveViewer case (default 3)")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="previous report; exit with status 1 if any case regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="fractional slowdown counted as a regression (default 0.2)")
+    args = parser.parse_args()
+
+    with virtual_display():
+        benchmark = RenderBenchmark(args.sizes, args.zooms, args.rates, args.duration)
+        benchmark.run()
+        report = benchmark.report()
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(text)
+
+    if args.compare is not None:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line, file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
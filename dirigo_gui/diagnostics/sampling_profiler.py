@@ -0,0 +1,182 @@
+"""
+On-demand sampling profiler for every Python thread.
+
+While running, a helper thread wakes every `interval` seconds and records
+the stack of every other thread (the Tk main thread, the dirigo
+acquisition, processor, display and writer workers, pollers) with
+sys._current_frames(). Nothing is installed in the profiled threads, so the
+overhead is the sampling thread's own work and does not depend on how busy
+the other threads are.
+
+On stop, two files are written to the log directory:
+
+- <name>.collapsed.txt: one line per distinct stack, "thread;outer;...;inner
+  count", for flamegraph.pl, speedscope or similar.
+- <name>.summary.txt: samples per thread and the top functions by self and
+  inclusive samples; with memory=True, also the top allocation sites grown
+  since start (tracemalloc).
+
+Native code (numpy, Tk, driver DLLs) is attributed to the Python frame that
+called it.
+"""
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Optional
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from platformdirs import user_log_dir
+
+
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _label(code: CodeType) -> str:
+    filename = os.path.abspath(code.co_filename)
+    if filename.startswith(_PACKAGE_DIR):
+        filename = os.path.relpath(filename, _PACKAGE_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    LOG_DIR = Path(user_log_dir("Dirigo-GUI", "Dirigo")) / "profiles"
+    TRACEMALLOC_FRAMES = 10 # stack depth recorded per allocation
+
+    def __init__(self, interval: float = 0.005, memory: bool = False, top: int = 25):
+        self.interval = interval # s between samples
+        self.memory = memory # also record allocations with tracemalloc (slows allocation-heavy code)
+        self.top = top
+
+        self._stacks: Counter[tuple[str, tuple[CodeType, ...]]] = Counter()
+        self._threads: Counter[str] = Counter()
+        self.samples = 0
+        self.started: Optional[datetime] = None
+        self._t_start = 0.0
+        self._t_stop = 0.0
+
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="SamplingProfiler", daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.TRACEMALLOC_FRAMES)
+                self._started_tracemalloc = True
+            self._snapshot = tracemalloc.take_snapshot()
+        self.started = datetime.now()
+        self._t_start = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> tuple[Path, Path]:
+        """Stop sampling and write the collapsed stacks and summary; returns their paths."""
+        self._stop_event.set()
+        self._thread.join()
+        self._t_stop = time.perf_counter()
+        memory = self._memory_summary()
+        return self.save(memory)
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names: dict[int, str] = {}
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            if len(names) < len(frames) or any(ident not in names for ident in frames):
+                names = {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                codes = []
+                f: Optional[FrameType] = frame
+                while f is not None:
+                    codes.append(f.f_code)
+                    f = f.f_back
+                name = names.get(ident, f"thread-{ident}")
+                self._stacks[(name, tuple(reversed(codes)))] += 1
+                self._threads[name] += 1
+            self.samples += 1
+
+    def _memory_summary(self) -> list[str]:
+        if self._snapshot is None:
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        lines = [
+            f"Traced memory: {current / 1e6:.1f} MB now, {peak / 1e6:.1f} MB peak",
+            f"Top {self.top} allocation sites by growth since start:",
+        ]
+        for stat in snapshot.compare_to(self._snapshot, "lineno")[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size_diff / 1e6:+10.3f} MB  {stat.count_diff:+8d} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+        return lines
+
+    def collapsed(self) -> list[str]:
+        labels: dict[CodeType, str] = {}
+        lines = []
+        for (thread, codes), count in self._stacks.most_common():
+            frames = [labels.setdefault(c, _label(c)) for c in codes]
+            lines.append(";".join([thread, *frames]) + f" {count}") # readers split on the last space
+        return lines
+
+    def summary(self, memory: Optional[list[str]] = None) -> list[str]:
+        elapsed = (self._t_stop or time.perf_counter()) - self._t_start
+        self_counts: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for (thread, codes), count in self._stacks.items():
+            if not codes:
+                continue
+            self_counts[f"{_label(codes[-1])} [{thread}]"] += count
+            for code in set(codes): # recursion counts once per sample
+                inclusive[f"{_label(code)} [{thread}]"] += count
+
+        def table(title: str, counts: Counter[str]) -> list[str]:
+            rows = [title]
+            for name, count in counts.most_common(self.top):
+                share = count / self._threads[name.rsplit(" [", 1)[1][:-1]]
+                rows.append(f"  {count:8d}  {100 * share:5.1f}%  {name}")
+            return rows
+
+        lines = [
+            f"Started {self.started:%Y-%m-%d %H:%M:%S}, {elapsed:.1f} s, " # type: ignore
+            f"{self.samples} samples every {1000 * self.interval:g} ms "
+            f"(achieved {1000 * elapsed / max(self.samples, 1):.2f} ms)",
+            "",
+            "Samples per thread:",
+            *(f"  {count:8d}  {name}" for name, count in self._threads.most_common()),
+            "",
+            *table(f"Top {self.top} by self samples (% of the thread's samples):", self_counts),
+            "",
+            *table(f"Top {self.top} by inclusive samples:", inclusive),
+        ]
+        if memory:
+            lines += ["", *memory]
+        return lines
+
+    def save(self, memory: Optional[list[str]] = None) -> tuple[Path, Path]:
+        self.LOG_DIR.mkdir(parents=True, exist_ok=True)
+        stem = f"profile_{self.started or datetime.now():%Y%m%d_%H%M%S}"
+        collapsed = self.LOG_DIR / f"{stem}.collapsed.txt"
+        summary = self.LOG_DIR / f"{stem}.summary.txt"
+        collapsed.write_text("\n".join(self.collapsed()) + "\n")
+        summary.write_text("\n".join(self.summary(memory)) + "\n")
+        return collapsed, summary
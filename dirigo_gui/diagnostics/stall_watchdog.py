@@ -0,0 +1,148 @@
+"""
+Watchdog for Tk event-loop stalls.
+
+A heartbeat callback is scheduled with after() every `interval_ms`. A helper
+thread watches for the heartbeat to fall behind by more than `threshold`
+seconds and, while it is behind, samples the main thread's Python stack
+with sys._current_frames(). When the heartbeat runs again the stall is
+attributed to the code the samples caught the main thread in, and stalls
+are aggregated per call site.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+from platformdirs import user_log_dir
+
+
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class StallSite:
+    site: str # innermost dirigo_gui frame (else innermost frame) the main thread was stuck in
+    count: int = 0
+    total: float = 0.0 # s
+    worst: float = 0.0 # s
+    worst_stack: list[str] = field(default_factory=list)
+    last_seen: float = 0.0 # time.time()
+
+
+def _site(stack: traceback.StackSummary) -> str:
+    """Innermost frame in this package, else the innermost frame."""
+    for frame in reversed(stack):
+        if os.path.abspath(frame.filename).startswith(_PACKAGE_DIR):
+            return f"{os.path.relpath(frame.filename, _PACKAGE_DIR)}:{frame.name}:{frame.lineno}"
+    frame = stack[-1] if stack else None
+    return f"{os.path.basename(frame.filename)}:{frame.name}:{frame.lineno}" if frame else "?"
+
+
+class StallWatchdog:
+    LOG_DIR = Path(user_log_dir("Dirigo-GUI", "Dirigo")) / "stalls"
+    MAX_SAMPLES = 200 # stack samples kept per stall
+
+    def __init__(self, root, interval_ms: int = 50, threshold: float = 0.2):
+        self._root = root
+        self.interval_ms = interval_ms
+        self.threshold = threshold # s of heartbeat lag counted as a stall
+
+        self._lock = threading.Lock()
+        self._last_beat = time.perf_counter()
+        self._samples: list[traceback.StackSummary] = [] # stacks sampled during the current stall
+        self.sites: dict[str, StallSite] = {}
+        self.stalls = 0
+        self.max_lag = 0.0
+
+        self._main_ident = threading.main_thread().ident
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="StallWatchdog", daemon=True)
+
+    def start(self) -> None:
+        self._last_beat = time.perf_counter()
+        self._root.after(self.interval_ms, self._beat)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+    def _beat(self) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            lag = now - self._last_beat - self.interval_ms / 1000
+            self._last_beat = now
+            samples, self._samples = self._samples, []
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.threshold:
+            self._record(lag, samples)
+        if not self._stop_event.is_set():
+            self._root.after(self.interval_ms, self._beat)
+
+    def _record(self, lag: float, samples: list[traceback.StackSummary]) -> None:
+        # Attribute the stall to the site seen most often while it lasted
+        by_site: dict[str, traceback.StackSummary] = {}
+        counts: dict[str, int] = {}
+        for stack in samples:
+            site = _site(stack)
+            by_site.setdefault(site, stack)
+            counts[site] = counts.get(site, 0) + 1
+        site = max(counts, key=counts.get) if counts else "(not sampled)" # type: ignore
+        with self._lock:
+            self.stalls += 1
+            stats = self.sites.setdefault(site, StallSite(site))
+            stats.count += 1
+            stats.total += lag
+            stats.last_seen = time.time()
+            if lag > stats.worst:
+                stats.worst = lag
+                stats.worst_stack = by_site[site].format() if site in by_site else []
+
+    def _watch(self) -> None:
+        period = min(self.threshold / 4, 0.05)
+        while not self._stop_event.wait(period):
+            with self._lock:
+                behind = time.perf_counter() - self._last_beat - self.interval_ms / 1000
+            if behind > self.threshold:
+                frame = sys._current_frames().get(self._main_ident) # type: ignore
+                if frame is not None:
+                    stack = traceback.extract_stack(frame)
+                    with self._lock:
+                        if len(self._samples) < self.MAX_SAMPLES:
+                            self._samples.append(stack)
+
+    def report(self) -> dict:
+        with self._lock:
+            sites = sorted(self.sites.values(), key=lambda s: s.total, reverse=True)
+            return {
+                "interval_ms":  self.interval_ms,
+                "threshold_s":  self.threshold,
+                "stalls":       self.stalls,
+                "max_lag_s":    self.max_lag,
+                "sites": [{
+                    "site":         s.site,
+                    "count":        s.count,
+                    "total_s":      s.total,
+                    "worst_s":      s.worst,
+                    "last_seen":    datetime.fromtimestamp(s.last_seen).isoformat(timespec="seconds"),
+                    "worst_stack":  s.worst_stack,
+                } for s in sites],
+            }
+
+    def save(self) -> Optional[Path]:
+        """Write the report to the log directory, if there were any stalls."""
+        if not self.stalls:
+            return None
+        self.LOG_DIR.mkdir(parents=True, exist_ok=True)
+        path = self.LOG_DIR / f"stalls_{datetime.now():%Y%m%d_%H%M%S}.json"
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+        return path
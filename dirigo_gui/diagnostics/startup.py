@@ -0,0 +1,28 @@
+"""
+Startup timing breakdown, printed with --profile-startup.
+"""
+import time
+
+
+
+class StartupTimer:
+    """Named phases of startup, each timed from the end of the previous one."""
+    def __init__(self, start: float | None = None):
+        self.start = time.perf_counter() if start is None else start
+        self._last = self.start
+        self.phases: list[tuple[str, float]] = [] # (label, duration in s)
+
+    def mark(self, label: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((label, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return self._last - self.start
+
+    def report(self) -> str:
+        width = max((len(label) for label, _ in self.phases), default=0)
+        lines = [f"  {label:<{width}} {1000 * duration:8.1f} ms" for label, duration in self.phases]
+        lines.append(f"  {'total':<{width}} {1000 * self.total:8.1f} ms")
+        return "Startup time:\n" + "\n".join(lines)
@@ -0,0 +1,374 @@
+"""
+Per-acquisition performance telemetry.
+
+Every acquisition started from the reference GUI appends one record to a
+rotating, line-delimited JSON log in the GUI log directory, so rigs can be
+compared with each other and with themselves over time. A record holds the
+acquisition type and spec, the frame rates achieved by the acquisition and
+the display, the frames each pipeline stage passed on and dropped, the
+writer's throughput, how long stopping took, the Tk stall count (with
+--watch-stalls) and the process's peak resident memory.
+
+Stages are counted by subscribing a StageTap to each worker: it counts what
+the worker publishes and releases each product at once, so it adds no
+buffering. A stage's drops are the frames its upstream published that it
+did not publish itself. This includes frames the rolling averager skips
+on purpose when saving averaged frames.
+
+Summarize the logs from one or more rigs (files or directories):
+
+    dirigo-gui-telemetry [LOG ...] [--period week] [--since 2026-01-01]
+"""
+from datetime import datetime, date
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+from typing import Any, Iterable, Optional
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+from platformdirs import user_log_dir
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+else:
+    import resource
+
+
+
+LOG_DIR = Path(user_log_dir("Dirigo-GUI", "Dirigo")) / "telemetry"
+
+
+def _gui_version() -> Optional[str]:
+    try:
+        return version("dirigo-gui")
+    except PackageNotFoundError:
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process since it started (MB), if available."""
+    if sys.platform == "win32":
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize",
+                    "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                    "PagefileUsage", "PeakPagefileUsage",
+                )
+            ]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32, psapi = ctypes.WinDLL("kernel32"), ctypes.WinDLL("psapi")
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [
+            wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD
+        ]
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(),
+                                          ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / 1e6
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3 # bytes on macOS, KiB on Linux
+
+
+class StageTap:
+    """
+    Subscriber that counts the products a worker publishes and releases
+    each one immediately.
+    """
+    def __init__(self, worker):
+        self._inbox = self # Worker._publish delivers to subscriber._inbox.put
+        self.frames = 0
+        self.first: Optional[float] = None # perf_counter of the first product
+        self.last: Optional[float] = None
+        worker.add_subscriber(self)
+
+    def put(self, product, block: bool = True, timeout: Optional[float] = None) -> None:
+        if product is None:
+            return # end of stream
+        product._release()
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        self.last = now
+        self.frames += 1
+
+    put_nowait = put
+
+    @property
+    def fps(self) -> Optional[float]:
+        if self.frames < 2:
+            return None
+        return (self.frames - 1) / (self.last - self.first) # type: ignore
+
+
+class TelemetryLog:
+    """Line-delimited JSON, rotated to <stem>.1.jsonl, <stem>.2.jsonl, ... when full."""
+    def __init__(self, path: Path = LOG_DIR / "acquisitions.jsonl",
+                 max_bytes: int = 1_000_000, backups: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def _backup(self, i: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{i}{self.path.suffix}")
+
+    def append(self, record: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            for i in range(self.backups - 1, 0, -1):
+                if self._backup(i).exists():
+                    os.replace(self._backup(i), self._backup(i + 1))
+            os.replace(self.path, self._backup(1))
+        with open(self.path, "a") as file:
+            file.write(json.dumps(record, default=str) + "\n")
+
+
+class AcquisitionTelemetry:
+    """
+    Counts one acquisition's pipeline. Build it after the workers are made
+    and before the acquisition is started; call finish() once every worker
+    has been joined.
+    """
+    def __init__(self,
+                 name: str,
+                 spec,
+                 saving: bool,
+                 stages: dict[str, Any], # pipeline order, e.g. acquisition, processor, averager, display
+                 viewer,
+                 writer=None,
+                 stall_watchdog=None,
+                 log: Optional[TelemetryLog] = None):
+        self.name = name
+        self.spec = spec
+        self.saving = saving
+        self.viewer = viewer
+        self.writer = writer
+        self.stall_watchdog = stall_watchdog
+        self.log = log or TelemetryLog()
+
+        self.workers = {n: w for n, w in stages.items() if w is not None}
+        self.taps = {n: StageTap(w) for n, w in self.workers.items()}
+        self._shown = viewer.frames_shown
+        self._superseded = viewer.frames_superseded
+        self._stalls = stall_watchdog.stalls if stall_watchdog is not None else 0
+        self.started = datetime.now()
+        self._t_start = time.perf_counter()
+
+    def _spec(self) -> dict:
+        try:
+            return self.spec.to_dict()
+        except AttributeError:
+            return dict(vars(self.spec))
+
+    def _upstream(self, worker) -> Optional[str]:
+        """Name of the tapped stage `worker` subscribes to."""
+        for name, candidate in self.workers.items():
+            if worker in candidate._subscribers:
+                return name
+        return None
+
+    def record(self, stop_requested: float, stopped: float) -> dict:
+        """`stop_requested` and `stopped` are perf_counter times."""
+        frames = {name: tap.frames for name, tap in self.taps.items()}
+        dropped: dict[str, Optional[int]] = {
+            # frames lost before publishing (e.g. buffer overruns), if the acquisition counts them
+            "acquisition": getattr(self.workers["acquisition"], "frames_dropped", None),
+        }
+        for name, worker in self.workers.items():
+            upstream = self._upstream(worker)
+            if upstream is not None:
+                dropped[name] = max(frames[upstream] - frames[name], 0)
+
+        shown = self.viewer.frames_shown - self._shown
+        frames["shown"] = shown
+        dropped["viewer"] = self.viewer.frames_superseded - self._superseded
+
+        writer_mb_s = None
+        if self.writer is not None:
+            saved = getattr(self.writer, "frames_saved", None)
+            source = self._upstream(self.writer)
+            if saved is not None and source is not None:
+                frames["saved"] = saved
+                dropped["writer"] = max(frames[source] - saved, 0)
+                worker = self.workers[source]
+                frame_bytes = int(np.prod(worker.product_shape)) * np.dtype(worker.product_dtype).itemsize
+                writer_mb_s = saved * frame_bytes / 1e6 / (stopped - self._t_start)
+
+        display = self.taps.get("display")
+        duration = stop_requested - self._t_start
+        return {
+            "time":             self.started.isoformat(timespec="seconds"),
+            "host":             platform.node(),
+            "gui_version":      _gui_version(),
+            "acquisition":      self.name,
+            "saving":           self.saving,
+            "frame_shape":      [getattr(self.spec, "lines_per_frame", None),
+                                 getattr(self.spec, "pixels_per_line", None)],
+            "spec":             self._spec(),
+            "duration_s":       duration,
+            "acquisition_fps":  self.taps["acquisition"].fps,
+            "display_fps":      shown / duration if display is not None and duration > 0 else None,
+            "frames":           frames,
+            "dropped":          dropped,
+            "writer_mb_s":      writer_mb_s,
+            "time_to_stop_s":   stopped - stop_requested,
+            "tk_stalls":        (self.stall_watchdog.stalls - self._stalls
+                                 if self.stall_watchdog is not None else None),
+            "peak_rss_mb":      peak_rss_mb(),
+        }
+
+    def finish(self, stop_requested: float) -> dict:
+        record = self.record(stop_requested, time.perf_counter())
+        for name, worker in self.workers.items():
+            worker.remove_subscriber(self.taps[name])
+        self.log.append(record)
+        return record
+
+
+# ---------- Summary CLI ----------
+PERIODS = ("day", "week", "month")
+# Metric, whether higher is better, and the smallest change worth reporting
+TRENDS = (
+    ("acquisition_fps", True, 0.1),
+    ("display_fps",     True, 0.5),
+    ("drop_pct",        False, 0.5),
+    ("writer_mb_s",     True, 1.0),
+    ("time_to_stop_s",  False, 0.05),
+    ("peak_rss_mb",     False, 50.0),
+)
+
+
+def read_records(paths: Iterable[Path]) -> list[dict]:
+    """Records from log files or directories of them, oldest first; partial lines are skipped."""
+    records = []
+    for path in paths:
+        files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+        for file in files:
+            with open(file) as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+    return sorted(records, key=lambda r: r["time"])
+
+
+def _period(timestamp: str, period: str) -> str:
+    day = datetime.fromisoformat(timestamp).date()
+    if period == "day":
+        return day.isoformat()
+    if period == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{day:%Y-%m}"
+
+
+def _median(values: list) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def _drop_pct(record: dict) -> Optional[float]:
+    acquired = record["frames"].get("acquisition")
+    if not acquired:
+        return None
+    lost = sum(v for k, v in record["dropped"].items() if v and k not in ("viewer", "writer"))
+    return 100 * lost / (acquired + (record["dropped"].get("acquisition") or 0))
+
+
+def summarize(records: list[dict], period: str = "week") -> dict[tuple, list[dict]]:
+    """Rows per (host, acquisition, frame shape), one per period, oldest first."""
+    groups: dict[tuple, dict[str, list[dict]]] = {}
+    for r in records:
+        key = (r["host"], r["acquisition"], "x".join(str(n) for n in r.get("frame_shape") or []))
+        groups.setdefault(key, {}).setdefault(_period(r["time"], period), []).append(r)
+
+    summary = {}
+    for key, periods in groups.items():
+        summary[key] = [{
+            "period":           name,
+            "runs":             len(runs),
+            "acquisition_fps":  _median([r["acquisition_fps"] for r in runs]),
+            "display_fps":      _median([r["display_fps"] for r in runs]),
+            "drop_pct":         _median([_drop_pct(r) for r in runs]),
+            "writer_mb_s":      _median([r["writer_mb_s"] for r in runs]),
+            "time_to_stop_s":   _median([r["time_to_stop_s"] for r in runs]),
+            "tk_stalls":        sum(r["tk_stalls"] or 0 for r in runs),
+            "peak_rss_mb":      max((r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None),
+                                    default=None),
+        } for name, runs in periods.items()]
+    return summary
+
+
+def trends(rows: list[dict], tolerance: float = 0.1) -> list[str]:
+    """Metrics in the latest period worse than the median of the earlier ones by more than `tolerance`."""
+    if len(rows) < 2:
+        return []
+    latest, earlier = rows[-1], rows[:-1]
+    changes = []
+    for metric, higher_is_better, floor in TRENDS:
+        before = _median([r[metric] for r in earlier])
+        now = latest[metric]
+        if before is None or now is None or abs(now - before) < floor:
+            continue
+        worse = now < before * (1 - tolerance) if higher_is_better else now > before * (1 + tolerance)
+        if worse:
+            changes.append(f"{metric} {before:.3g} -> {now:.3g}")
+    return changes
+
+
+def _cell(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.3g}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Dirigo GUI acquisition telemetry")
+    parser.add_argument("logs", type=Path, nargs="*", default=[LOG_DIR],
+                        help=f"telemetry files or directories (default {LOG_DIR})")
+    parser.add_argument("--period", choices=PERIODS, default="week",
+                        help="aggregate runs per day, week or month (default week)")
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="only runs on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="fractional change in the latest period reported as degraded (default 0.1)")
+    args = parser.parse_args()
+
+    records = read_records(args.logs)
+    if args.since is not None:
+        records = [r for r in records if datetime.fromisoformat(r["time"]).date() >= args.since]
+    if not records:
+        print("No telemetry records found", file=sys.stderr)
+        sys.exit(1)
+
+    columns = ("period", "runs", "acquisition_fps", "display_fps", "drop_pct",
+               "writer_mb_s", "time_to_stop_s", "tk_stalls", "peak_rss_mb")
+    headers = ("period", "runs", "acq fps", "disp fps", "drop %", "MB/s", "stop s", "stalls", "RSS MB")
+    degraded = []
+    for (host, acquisition, shape), rows in sorted(summarize(records, args.period).items()):
+        print(f"\n{host}  {acquisition}  {shape}")
+        print("  " + "".join(f"{h:>10}" for h in headers))
+        for row in rows:
+            print("  " + "".join(f"{_cell(row[c]):>10}" for c in columns))
+        changes = trends(rows, args.tolerance)
+        if changes:
+            degraded.append(f"{host} {acquisition} {shape} ({rows[-1]['period']}): " + ", ".join(changes))
+
+    if degraded:
+        print()
+        for line in degraded:
+            print("DEGRADED", line)
+
+
+if __name__ == "__main__":
+    main()
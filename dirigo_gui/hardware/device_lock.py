@@ -0,0 +1,29 @@
+"""
+One lock per hardware device, shared by every GUI thread that talks to it.
+
+The dirigo drivers are not guaranteed to be thread-safe, and the GUI reaches
+the same device from several background threads: the stage poller and axis
+movers, the hardware mirror, and the setting dispatchers. Each holds the
+device's lock around its device calls, so at most one call is in flight per
+device.
+"""
+from typing import Any
+import threading
+
+from dirigo_gui.hardware.io_profiler import ProfiledDevice
+
+
+
+_registry_lock = threading.Lock()
+_locks: dict[int, tuple[Any, threading.RLock]] = {} # by id(device); holds the device so ids are not reused
+
+
+def device_lock(device: Any) -> threading.RLock:
+    """The lock for `device`; a device and its I/O profiling proxies share one."""
+    while type(device) is ProfiledDevice:
+        device = object.__getattribute__(device, "_target")
+    with _registry_lock:
+        entry = _locks.get(id(device))
+        if entry is None:
+            entry = _locks[id(device)] = (device, threading.RLock())
+        return entry[1]
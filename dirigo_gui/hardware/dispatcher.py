@@ -0,0 +1,121 @@
+from typing import Any, Callable, Optional
+import threading
+import time
+
+
+
+class LatestValueDispatcher:
+    """
+    Sends settings (e.g. a detector gain or laser power) to a device on a
+    background thread, keeping only the newest pending value.
+
+    A slider drag submits a value per motion event; values that arrive while
+    a command is in flight replace each other, so at most one stale command
+    is ever queued and the device ends on the last value submitted.
+
+    The round-trip time of each command is measured and the minimum spacing
+    between commands adapts to it: when round trips grow well beyond the
+    fastest seen (the device is falling behind) the spacing is doubled, and
+    otherwise it decays back toward `min_interval`.
+
+    Values are sent holding `lock` (see device_lock), if given.
+    """
+    def __init__(self,
+                 name: str,
+                 send: Callable[[Any], None],
+                 on_applied: Optional[Callable[[Any], None]] = None,
+                 min_interval: float = 0.0,
+                 max_interval: float = 1.0,
+                 lock: Optional[threading.RLock] = None):
+        self.name = name
+        self._send = send
+        self._device_lock = lock or threading.RLock()
+        self._on_applied = on_applied # called on the dispatcher thread
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self._condition = threading.Condition()
+        self._pending: Any = None
+        self._has_pending = False
+        self._in_flight = False
+        self.applied: Any = None # last value the device accepted
+        self.superseded = 0      # values replaced before they were sent
+        self.error: Optional[Exception] = None # from the last send, if it failed
+
+        self.rtt: Optional[float] = None      # s, smoothed round-trip time
+        self.rtt_min: Optional[float] = None  # s, fastest round trip seen
+        self.interval = min_interval          # s, current minimum spacing between sends
+        self._last_send = 0.0
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"Dispatch-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, value: Any) -> None:
+        with self._condition:
+            if self._has_pending:
+                self.superseded += 1
+            self._pending = value
+            self._has_pending = True
+            self._condition.notify()
+
+    @property
+    def busy(self) -> bool:
+        """True while a value is waiting to be sent or in flight."""
+        with self._condition:
+            return self._has_pending or self._in_flight
+
+    @property
+    def status(self) -> str:
+        """'applied', 'pending' or 'error', for display."""
+        if self.busy:
+            return "pending"
+        return "error" if self.error is not None else "applied"
+
+    def close(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=2.0)
+
+    def _adapt(self, rtt: float) -> None:
+        self.rtt = rtt if self.rtt is None else 0.8 * self.rtt + 0.2 * rtt
+        self.rtt_min = rtt if self.rtt_min is None else min(self.rtt_min, rtt)
+        if rtt > 2 * self.rtt_min:
+            self.interval = min(self.max_interval, max(2 * self.interval, self.rtt))
+        else:
+            self.interval = max(self.min_interval, 0.8 * self.interval)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._has_pending and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                # Respect the adapted spacing; newer values may arrive meanwhile
+                while (wait := self._last_send + self.interval - time.perf_counter()) > 0:
+                    self._condition.wait(wait)
+                    if not self._running:
+                        return
+                value = self._pending
+                self._has_pending = False
+                self._in_flight = True
+
+            with self._device_lock: # round trip timed without waiting for the lock
+                t0 = time.perf_counter()
+                try:
+                    self._send(value)
+                    self.error = None
+                except Exception as e: # keep serving later values
+                    self.error = e
+                t1 = time.perf_counter()
+            self._last_send = t1
+            self._adapt(t1 - t0)
+
+            if self.error is None:
+                self.applied = value
+                if self._on_applied:
+                    self._on_applied(value)
+            with self._condition:
+                self._in_flight = False
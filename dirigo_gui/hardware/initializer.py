@@ -0,0 +1,131 @@
+"""
+Concurrent initialization of the hardware the reference GUI uses.
+
+dirigo's Hardware initializes each device the first time its property is
+accessed, which can take seconds per device (connecting to a stage
+controller, homing, loading a digitizer board). HardwareInitializer touches
+those properties on a thread pool so independent devices come up
+concurrently, while the Tk thread stays responsive and polls for devices
+becoming ready.
+
+Hardware's cached properties are not locked, so tasks that build a shared
+dependency (e.g. detectors and the slow scanner both construct the fast
+scanner) are ordered with `after` rather than run concurrently.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+import threading
+import time
+
+from dirigo.components.hardware import Hardware, NotConfiguredError
+
+
+
+@dataclass
+class DeviceTask:
+    name: str                       # as shown on the splash
+    load: Callable[[Hardware], Any] # accesses the Hardware property that initializes the device
+    after: tuple[str, ...] = ()     # tasks that must settle first
+    state: str = "waiting"          # waiting, queued, initializing, ready, absent or failed
+    started: Optional[float] = None # s since the initializer started
+    elapsed: Optional[float] = None # s spent initializing
+    device: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def settled(self) -> bool:
+        return self.state in ("ready", "absent", "failed")
+
+
+def default_tasks() -> list[DeviceTask]:
+    """The devices the reference GUI panels use."""
+    return [
+        DeviceTask("digitizer",         lambda hw: hw.digitizer),
+        DeviceTask("fast scanner",      lambda hw: hw.fast_raster_scanner),
+        DeviceTask("slow scanner",      lambda hw: hw.slow_raster_scanner, after=("fast scanner",)),
+        DeviceTask("detectors",         lambda hw: hw.detectors, after=("fast scanner",)),
+        DeviceTask("stages",            lambda hw: hw.stages),
+        DeviceTask("z motor",           lambda hw: hw.preferred_z_motor, after=("stages",)),
+        DeviceTask("beam attenuator",   lambda hw: hw.beam_attenuator),
+    ]
+
+
+class HardwareInitializer:
+    """
+    Runs device tasks on a thread pool, each as soon as the tasks it comes
+    `after` have settled. `on_ready` hooks (keyed by task name) run on the
+    pool thread right after a device initializes, e.g. to register it with
+    the HardwareMirror; an exception from the hook fails the task.
+
+    State is polled from the Tk thread (see StartupSplash and
+    ReferenceGUI._poll_hardware); nothing here touches Tk.
+    """
+    def __init__(self,
+                 hw: Hardware,
+                 tasks: Optional[list[DeviceTask]] = None,
+                 on_ready: Optional[dict[str, Callable[[Any], None]]] = None,
+                 max_workers: int = 4):
+        self._hw = hw
+        self.tasks: dict[str, DeviceTask] = {t.name: t for t in (tasks or default_tasks())}
+        self._on_ready = on_ready or {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="HardwareInit")
+        self._t0 = 0.0
+        self.elapsed: Optional[float] = None # s until every task settled
+
+    def start(self) -> None:
+        self._t0 = time.perf_counter()
+        with self._lock:
+            if not self.tasks:
+                self.elapsed = 0.0
+            self._submit_unblocked()
+
+    @property
+    def done(self) -> bool:
+        return self.elapsed is not None
+
+    def __getitem__(self, name: str) -> DeviceTask:
+        return self.tasks[name]
+
+    def _submit_unblocked(self) -> None:
+        for task in self.tasks.values():
+            if task.state == "waiting" and all(self.tasks[a].settled for a in task.after):
+                task.state = "queued"
+                self._executor.submit(self._run, task)
+
+    def _run(self, task: DeviceTask) -> None:
+        t = time.perf_counter()
+        task.started = t - self._t0
+        task.state = "initializing"
+        try:
+            device = task.load(self._hw)
+            hook = self._on_ready.get(task.name)
+            if hook is not None and device:
+                hook(device)
+        except NotConfiguredError:
+            state = "absent"
+        except Exception as e: # report on the splash, keep starting the rest
+            task.error = e
+            state = "failed"
+        else:
+            task.device = device
+            state = "ready" if device else "absent"
+        task.elapsed = time.perf_counter() - t
+
+        with self._lock:
+            task.state = state
+            self._submit_unblocked()
+            if all(t.settled for t in self.tasks.values()):
+                self.elapsed = time.perf_counter() - self._t0
+                self._executor.shutdown(wait=False)
+
+    def summary(self) -> str:
+        lines = [
+            f"  {t.name:<16} {t.state:<8} "
+            + (f"{1000 * t.elapsed:8.1f} ms" if t.elapsed is not None else "")
+            for t in self.tasks.values()
+        ]
+        if self.elapsed is not None:
+            lines.append(f"  {'all devices':<16} {'':<8} {1000 * self.elapsed:8.1f} ms")
+        return "Hardware init:\n" + "\n".join(lines)
@@ -0,0 +1,214 @@
+"""
+Opt-in latency profiling of the device calls made by the GUI.
+
+The hardware objects handed to the GUI controls are wrapped in ProfiledDevice
+proxies that time every property read, property write and method call and
+record it in an IOProfiler, binned per call site (device member + the code
+that made the call). Calls made on the Tk (main) thread that exceed a
+threshold are also logged individually, since those freeze the GUI.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+import inspect
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+from dirigo.hw_interfaces.hw_interface import HardwareInterface
+
+
+
+# Log-spaced latency bins: 1 us to 10 s, 5 per decade
+BIN_EDGES = np.logspace(-6, 1, 7 * 5 + 1)
+
+
+@dataclass
+class CallSiteStats:
+    device: str
+    member: str
+    kind: str       # 'get', 'set' or 'call'
+    site: str       # module:function:line of the calling code
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(BIN_EDGES.size + 1, dtype=np.int64))
+    total: float = 0.0
+    max: float = 0.0
+    tk_thread: int = 0  # calls made on the Tk thread
+    slow_tk: int = 0    # of which exceeded the threshold
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def percentile(self, q: float) -> float:
+        """Latency (s) at percentile q (0-100), to bin resolution (upper bin edge)."""
+        n = self.count
+        if n == 0:
+            return float('nan')
+        i = int(np.searchsorted(np.cumsum(self.counts), q / 100 * n))
+        return float(BIN_EDGES[min(i, BIN_EDGES.size - 1)])
+
+    def as_dict(self) -> dict:
+        return {
+            "device":       self.device,
+            "member":       self.member,
+            "kind":         self.kind,
+            "site":         self.site,
+            "count":        self.count,
+            "total_s":      self.total,
+            "mean_s":       self.total / self.count if self.count else None,
+            "p50_s":        self.percentile(50),
+            "p95_s":        self.percentile(95),
+            "max_s":        self.max,
+            "tk_thread":    self.tk_thread,
+            "slow_tk":      self.slow_tk,
+            "histogram":    self.counts.tolist(),
+        }
+
+
+@dataclass(frozen=True)
+class SlowCall:
+    device: str
+    member: str
+    kind: str
+    site: str
+    duration: float
+    wall_time: float # time.time() when the call returned
+
+
+class IOProfiler:
+    """Latency histograms per call site, and a log of slow calls on the Tk thread."""
+    def __init__(self, slow_threshold: float = 0.010, max_slow_calls: int = 500):
+        self.slow_threshold = slow_threshold # s
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str, str, str], CallSiteStats] = {}
+        self.slow_calls: deque[SlowCall] = deque(maxlen=max_slow_calls)
+        self._tk_thread = threading.main_thread() # Tk runs its loop on the main thread
+
+    def wrap(self, target: Any, name: str) -> "ProfiledDevice":
+        return ProfiledDevice(target, name, self)
+
+    def record(self, device: str, member: str, kind: str, site: str, duration: float) -> None:
+        on_tk = threading.current_thread() is self._tk_thread
+        with self._lock:
+            key = (device, member, kind, site)
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CallSiteStats(device, member, kind, site)
+            stats.counts[np.searchsorted(BIN_EDGES, duration)] += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            if on_tk:
+                stats.tk_thread += 1
+                if duration > self.slow_threshold:
+                    stats.slow_tk += 1
+                    self.slow_calls.append(
+                        SlowCall(device, member, kind, site, duration, time.time())
+                    )
+
+    def stats(self) -> list[CallSiteStats]:
+        """All call sites, the most total time first."""
+        with self._lock:
+            return sorted(self._stats.values(), key=lambda s: s.total, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.slow_calls.clear()
+
+    def report(self) -> dict:
+        with self._lock:
+            slow = [vars(c).copy() for c in self.slow_calls]
+        return {
+            "slow_threshold_s": self.slow_threshold,
+            "bin_edges_s":      BIN_EDGES.tolist(),
+            "call_sites":       [s.as_dict() for s in self.stats()],
+            "slow_tk_calls":    slow,
+        }
+
+    def export(self, path: Path | str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2, allow_nan=True)
+
+
+def _call_site() -> str:
+    """module:function:line of the first caller outside this module."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+def _profiled(value: Any, name: str, profiler: IOProfiler) -> Any:
+    """Wrap device objects returned by a device (e.g. stage axes, detectors)."""
+    if isinstance(value, HardwareInterface) and not isinstance(value, ProfiledDevice):
+        return ProfiledDevice(value, name, profiler)
+    return value
+
+
+class ProfiledDevice:
+    """
+    Transparent proxy that times the device's property reads/writes and
+    method calls. isinstance() checks against the device's class still pass.
+    Plain (non-property) attributes are passed through untimed.
+    """
+    def __init__(self, target: Any, name: str, profiler: IOProfiler):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_profiler", profiler)
+
+    @property # type: ignore
+    def __class__(self):
+        return type(self._target)
+
+    def _timed(self, member: str, kind: str, fn, *args, **kwargs):
+        site = _call_site()
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._profiler.record(self._name, member, kind, site, time.perf_counter() - t0)
+
+    def __getattr__(self, member: str):
+        target = self._target
+        static = inspect.getattr_static(type(target), member, None)
+        if isinstance(static, property):
+            value = self._timed(member, "get", getattr, target, member)
+            return _profiled(value, f"{self._name}.{member}", self._profiler)
+        value = getattr(target, member)
+        if callable(value) and not isinstance(value, type):
+            def method(*args, **kwargs):
+                result = self._timed(member, "call", value, *args, **kwargs)
+                return _profiled(result, f"{self._name}.{member}()", self._profiler)
+            return method
+        return _profiled(value, f"{self._name}.{member}", self._profiler)
+
+    def __setattr__(self, member: str, value) -> None:
+        target = self._target
+        if isinstance(inspect.getattr_static(type(target), member, None), property):
+            self._timed(member, "set", setattr, target, member, value)
+        else:
+            setattr(target, member, value)
+
+    # Container protocol (e.g. DetectorSet), looked up on the type so delegated explicitly
+    def __iter__(self):
+        for i, item in enumerate(self._target):
+            yield _profiled(item, f"{self._name}[{i}]", self._profiler)
+
+    def __len__(self) -> int:
+        return len(self._target)
+
+    def __getitem__(self, index):
+        return _profiled(self._target[index], f"{self._name}[{index}]", self._profiler)
+
+    def __bool__(self) -> bool:
+        return bool(self._target)
+
+    def __repr__(self) -> str:
+        return f"<profiled {self._target!r}>"
@@ -0,0 +1,171 @@
+from typing import Callable, Optional
+import threading
+
+from dirigo import units
+from dirigo.hw_interfaces.stage import LinearStage
+
+
+
+class AxisMover:
+    """
+    Issues motion commands for one axis on a background thread, so Tk
+    callbacks return immediately.
+
+    Only the newest request is kept: relative steps that arrive before the
+    previous command has been sent are merged into a single target, and an
+    absolute move, velocity move or stop replaces whatever is pending. The
+    commanded target is tracked, so a step does not need to read the current
+    position from the controller (the poller's cached position is used for
+    the first step after a stop). Call invalidate() when something else
+    (an acquisition, autofocus) may have moved the axis.
+
+    Commands are sent holding `lock` (see device_lock), if given.
+    """
+    def __init__(self,
+                 name: str,
+                 axis: LinearStage,
+                 cached_position: Optional[Callable[[], Optional[units.Position]]] = None,
+                 on_command: Optional[Callable[[], None]] = None,
+                 lock: Optional[threading.RLock] = None):
+        self.name = name
+        self._axis = axis
+        self._device_lock = lock or threading.RLock()
+        self._cached_position = cached_position
+        self._on_command = on_command # e.g. wake the position poller
+
+        self._condition = threading.Condition()
+        self._pending: Optional[tuple[str, object]] = None # (kind, value)
+        self._pending_delta = 0.0 # accumulated relative steps (m or deg)
+        self._target: Optional[float] = None # last commanded absolute target
+        self.superseded = 0 # requests replaced before they were sent
+        self.error: Optional[Exception] = None # last error from the axis, if any
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"Mover-{name}", daemon=True)
+        self._thread.start()
+
+    @property
+    def target(self) -> Optional[float]:
+        """Last commanded target position, or None after a stop/velocity move."""
+        return self._target
+
+    def step(self, delta: units.Position) -> None:
+        with self._condition:
+            if self._pending is not None and self._pending[0] in ("stop", "velocity"):
+                self.superseded += 1
+                self._pending = None
+            self._pending_delta += float(delta)
+            if self._pending is None:
+                self._pending = ("relative", None)
+            self._condition.notify()
+
+    def move_to(self, position: units.Position) -> None:
+        self._replace(("absolute", float(position)))
+
+    def move_velocity(self, velocity: units.Velocity) -> None:
+        self._replace(("velocity", velocity))
+
+    def stop(self) -> None:
+        self._replace(("stop", None))
+
+    def invalidate(self) -> None:
+        """Forget the commanded target; the next step starts from the polled position."""
+        with self._condition:
+            self._target = None
+
+    def _replace(self, request: tuple[str, object]) -> None:
+        with self._condition:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = request
+            self._pending_delta = 0.0
+            self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=2.0)
+
+    def _start_position(self) -> float:
+        if self._target is not None:
+            return self._target
+        if self._cached_position is not None:
+            position = self._cached_position()
+            if position is not None:
+                return float(position)
+        return float(self._axis.position) # no cache yet, ask the controller
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                kind, value = self._pending
+                delta = self._pending_delta
+                self._pending = None
+                self._pending_delta = 0.0
+
+            try:
+                with self._device_lock:
+                    self._execute(kind, value, delta)
+                self.error = None
+            except Exception as e: # keep serving later requests
+                self.error = e
+                self._target = None
+            if self._on_command:
+                self._on_command()
+
+    def _execute(self, kind: str, value, delta: float) -> None:
+        if kind == "stop":
+            self._target = None
+            self._axis.stop()
+        elif kind == "velocity":
+            self._target = None
+            self._axis.move_velocity(value)
+        else:
+            if kind == "absolute":
+                target = value + delta
+            else:
+                target = self._start_position() + delta
+            self._target = target
+            self._axis.move_to(units.Position(target))
+
+
+class MotionQueue:
+    """One AxisMover per axis."""
+    def __init__(self,
+                 axes: dict[str, LinearStage],
+                 cached_position: Optional[Callable[[str], Optional[units.Position]]] = None,
+                 on_command: Optional[Callable[[], None]] = None,
+                 locks: Optional[dict[str, threading.RLock]] = None):
+        self.movers = {
+            name: AxisMover(
+                name, axis,
+                cached_position=(lambda n=name: cached_position(n)) if cached_position else None,
+                on_command=on_command,
+                lock=(locks or {}).get(name),
+            )
+            for name, axis in axes.items()
+        }
+
+    def __getitem__(self, axis: str) -> AxisMover:
+        return self.movers[axis]
+
+    def __contains__(self, axis: str) -> bool:
+        return axis in self.movers
+
+    def stop_all(self) -> None:
+        for mover in self.movers.values():
+            mover.stop()
+
+    def invalidate(self) -> None:
+        """Forget all commanded targets, e.g. after an acquisition moved the stage."""
+        for mover in self.movers.values():
+            mover.invalidate()
+
+    def close(self) -> None:
+        for mover in self.movers.values():
+            mover.close()
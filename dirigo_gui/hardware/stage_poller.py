@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Optional
+import threading
+import time
+
+from dirigo import units
+from dirigo.hw_interfaces.stage import LinearStage
+
+
+
+@dataclass(frozen=True)
+class AxisState:
+    position: units.Position
+    moving: bool
+    timestamp: float # time.perf_counter() when the axis was read
+
+
+class StagePoller:
+    """
+    Polls stage axes on a background thread and caches their position and
+    moving/idle state, so the GUI never waits on a controller round trip.
+
+    Axes are polled every `moving_interval` seconds while any of them is
+    moving and every `idle_interval` seconds otherwise. Call wake() after
+    commanding a move to get a fresh reading right away.
+
+    Each axis is read holding its entry in `locks` (see device_lock), if
+    given, so reads do not overlap commands sent from other threads.
+    """
+    def __init__(self,
+                 axes: dict[str, LinearStage],
+                 moving_interval: float = 0.05,
+                 idle_interval: float = 0.5,
+                 locks: Optional[dict[str, threading.RLock]] = None):
+        self._axes = axes
+        self._device_locks = {name: (locks or {}).get(name) or threading.RLock() for name in axes}
+        self.moving_interval = moving_interval
+        self.idle_interval = idle_interval
+
+        self._lock = threading.Lock()
+        self._states: dict[str, AxisState] = {}
+        self.errors: dict[str, Exception] = {} # last read error per axis, if any
+
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="StagePoller", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def wake(self) -> None:
+        """Poll immediately instead of waiting for the next interval."""
+        self._wake.set()
+
+    def get(self, axis: str) -> Optional[AxisState]:
+        with self._lock:
+            return self._states.get(axis)
+
+    def snapshot(self) -> dict[str, AxisState]:
+        """Latest state of every axis read so far."""
+        with self._lock:
+            return dict(self._states)
+
+    @property
+    def any_moving(self) -> bool:
+        with self._lock:
+            return any(s.moving for s in self._states.values())
+
+    def _read(self, name: str, axis: LinearStage) -> None:
+        try:
+            with self._device_locks[name]:
+                position = axis.position
+                moving = bool(axis.moving)
+        except Exception as e: # keep polling the other axes
+            self.errors[name] = e
+            return
+        self.errors.pop(name, None)
+        state = AxisState(position, moving, time.perf_counter())
+        with self._lock:
+            self._states[name] = state
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            for name, axis in self._axes.items():
+                self._read(name, axis)
+            interval = self.moving_interval if self.any_moving else self.idle_interval
+            self._wake.wait(interval)
+            self._wake.clear()
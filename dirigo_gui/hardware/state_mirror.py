@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+import heapq
+import threading
+import time
+
+from dirigo_gui.hardware.device_lock import device_lock
+
+
+
+_MISSING = object()
+
+
+@dataclass
+class _Entry:
+    read: Callable[[], Any]
+    interval: Optional[float] # s between refreshes, None to read only on demand
+    value: Any = _MISSING
+    error: Optional[Exception] = None
+    timestamp: float = 0.0 # time.perf_counter() of the last successful read
+    stale: bool = False    # written since the last read
+    writes: int = 0        # invalidate() count, to drop reads that raced a write
+    due: Optional[float] = None # next scheduled read; older heap items for the key are ignored
+    lock: threading.RLock = field(default_factory=threading.RLock) # held while reading
+
+
+class HardwareMirror:
+    """
+    Cache of slowly changing hardware properties (detector gains, laser
+    power, scanner frequency, ...) for the GUI to read without device I/O.
+
+    Each property is registered with watch(key, read, interval): it is read
+    once right away, then re-read on a background thread every `interval`
+    seconds (or never, for constants such as ranges and limits). After
+    writing a property, call invalidate(key, value) so readers see the new
+    value immediately and it is re-read from the device soon after.
+
+    Properties registered through the add_* methods are read holding their
+    device's lock (see device_lock).
+
+    get() re-raises the error of a property that has never been read
+    successfully (e.g. NotImplementedError for a fixed-gain detector), so
+    callers can treat it like the device property itself.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._schedule: list[tuple[float, str]] = [] # heap of (due time, key)
+        self.errors: dict[str, Exception] = {} # last read error per key, if any
+
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="HardwareMirror", daemon=True)
+
+    # Registration per device, so devices can be added as they finish initializing
+    def add_detectors(self, detectors) -> None:
+        for detector in detectors:
+            key = f"detector{detector.index}"
+            lock = device_lock(detector)
+            self.watch(f"{key}.enabled", lambda d=detector: d.enabled, interval=2.0, lock=lock)
+            self.watch(f"{key}.gain", lambda d=detector: d.gain, interval=1.0, lock=lock)
+            self.watch(f"{key}.gain_range", lambda d=detector: d.gain_range, lock=lock)
+
+    def add_beam_attenuator(self, attenuator) -> None:
+        lock = device_lock(attenuator)
+        self.watch("laser.fraction", lambda: attenuator.fraction, interval=1.0, lock=lock)
+        self.watch("laser.fraction_limits", lambda: attenuator.fraction_limits, lock=lock)
+
+    def add_scanners(self, fast, slow) -> None:
+        self.watch("fast_scanner.frequency", lambda: fast.frequency, interval=1.0,
+                   lock=device_lock(fast))
+        self.watch("slow_scanner.flyback_time", lambda: slow.flyback_time,
+                   lock=device_lock(slow))
+
+    def add_z_motor(self, z_motor) -> None:
+        self.watch("z.acceleration", lambda: z_motor.acceleration, interval=5.0,
+                   lock=device_lock(z_motor))
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def watch(self, key: str, read: Callable[[], Any], interval: Optional[float] = None,
+              lock: Optional[threading.RLock] = None) -> None:
+        """Register a property and read it now (on the calling thread), holding `lock` if given."""
+        entry = _Entry(read, interval) if lock is None else _Entry(read, interval, lock=lock)
+        with self._lock:
+            self._entries[key] = entry
+        self._refresh(key, entry)
+        self._wake.set() # reschedule
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, default: Any = _MISSING) -> Any:
+        """Cached value of `key`. Never touches the device."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.value is _MISSING:
+            if default is not _MISSING:
+                return default
+            if entry is not None and entry.error is not None:
+                raise entry.error
+            raise KeyError(key)
+        return entry.value
+
+    def age(self, key: str) -> Optional[float]:
+        """Seconds since `key` was last read from the device, None if never."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.value is _MISSING:
+            return None
+        return time.perf_counter() - entry.timestamp
+
+    def invalidate(self, key: str, value: Any = _MISSING) -> None:
+        """
+        Mark `key` as written: show `value` (if given) until the device is
+        re-read, which is scheduled right away.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            if value is not _MISSING:
+                entry.value = value
+            entry.stale = True
+            entry.writes += 1
+            entry.due = time.perf_counter()
+            heapq.heappush(self._schedule, (entry.due, key))
+        self._wake.set()
+
+    def _refresh(self, key: str, entry: _Entry) -> None:
+        writes = entry.writes
+        try:
+            with entry.lock:
+                value = entry.read()
+        except Exception as e:
+            entry.error = e
+            self.errors[key] = e
+        else:
+            with self._lock:
+                if entry.writes != writes:
+                    return # written meanwhile; the re-read is already scheduled
+                entry.value = value
+                entry.error = None
+                entry.timestamp = time.perf_counter()
+                entry.stale = False
+            self.errors.pop(key, None)
+        with self._lock:
+            if entry.interval is not None and not isinstance(entry.error, NotImplementedError):
+                entry.due = time.perf_counter() + entry.interval
+                heapq.heappush(self._schedule, (entry.due, key))
+            else:
+                entry.due = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                now = time.perf_counter()
+                due = []
+                while self._schedule and self._schedule[0][0] <= now:
+                    t, key = heapq.heappop(self._schedule)
+                    entry = self._entries.get(key)
+                    if entry is not None and entry.due == t:
+                        due.append((key, entry))
+                timeout = self._schedule[0][0] - now if self._schedule else None
+            for key, entry in due:
+                self._refresh(key, entry)
+            if due:
+                continue
+            self._wake.wait(timeout)
+            self._wake.clear()
@@ -1,4 +1,8 @@
+import time
+_IMPORT_START = time.perf_counter() # for --profile-startup
+import argparse
 import queue 
+import json
 from pathlib import Path
 import toml
 import warnings
@@ -7,125 +11,255 @@ from typing import Optional
 from platformdirs import user_config_dir
 import customtkinter as ctk
 
+from dirigo import units
 from dirigo.main import Dirigo
-from dirigo.components.hardware import NotConfiguredError
+from dirigo.hw_interfaces.beam_attenuator import BeamAttenuator
+from dirigo.hw_interfaces.detector import DetectorSet
+from dirigo.hw_interfaces.stage import MultiAxisStage
+from dirigo.plugins.acquisitions import FrameAcquisitionSpec
 from dirigo.sw_interfaces import Acquisition, Processor, Display
 
+from dirigo_gui.diagnostics.buffer_tracker import BufferTracker
+from dirigo_gui.diagnostics.sampling_profiler import SamplingProfiler
+from dirigo_gui.diagnostics.stall_watchdog import StallWatchdog
+from dirigo_gui.diagnostics.telemetry import AcquisitionTelemetry
+from dirigo_gui.diagnostics.startup import StartupTimer
+from dirigo_gui.hardware.initializer import HardwareInitializer
+from dirigo_gui.hardware.io_profiler import IOProfiler
+from dirigo_gui.hardware.state_mirror import HardwareMirror
 from dirigo_gui.widgets.image_display import LiveViewer
+from dirigo_gui.widgets.io_profile import IOProfileWindow
+from dirigo_gui.widgets.overview import OverviewFeed, OverviewWindow
+from dirigo_gui.widgets.splash import StartupSplash
+from dirigo_gui.workers.tile_pyramid import TilePyramid
 from dirigo_gui.components.detector_control import DetectorSetControl
 from dirigo_gui.components.laser_control import LaserControl
+from dirigo_gui.components.common import LazySection
 from dirigo_gui.components.display_control import DisplayControl
 from dirigo_gui.components.writer_control import WriterControl
 from dirigo_gui.components.acquisition_control import (
     AcquisitionControl, FrameSpecificationControl, TimingIndicator,
-    StackSpecificationControl
+    StackSpecificationControl, MosaicSpecificationControl
 )
 from dirigo_gui.components.stage_control import StageControl
+from dirigo_gui.components.timelapse_control import TimelapseControl
+from dirigo_gui.routines.timelapse import StagePosition
 
 
 
 class LeftPanel(ctk.CTkFrame):
-    def __init__(self, parent, controller: Dirigo, start_callback, stop_callback):
+    def __init__(self,
+                 parent,
+                 mirror: HardwareMirror,
+                 start_callback,
+                 stop_callback,
+                 frame_spec: Optional[FrameAcquisitionSpec] = None):
         super().__init__(parent, width=200, corner_radius=0)
         self._start_callback = start_callback
         self._stop_callback = stop_callback
 
         self.acquisition_control = AcquisitionControl(self, self._start_callback, self._stop_callback)
+        self.acquisition_control.set_ready(False) # until the hardware has initialized
         
-        self.timing_indicator = TimingIndicator(self, controller.hw)
-        self.frame_specification = FrameSpecificationControl(self, self.timing_indicator)
+        self.timing_indicator = TimingIndicator(self, mirror)
+        self.frame_specification = FrameSpecificationControl(
+            self, self.timing_indicator, spec=frame_spec
+        )
         
         self.timing_indicator.update(self.frame_specification.generate_spec())
 
         self.acquisition_control.pack(pady=10, padx=10, fill="x")
         self.frame_specification.pack(pady=10, padx=10, fill="x")
-        try: # Try to use a z-axis motor
-            z_scanner = controller.hw.preferred_z_motor # try access
-            self.stack_specification = StackSpecificationControl(self, self.frame_specification)
-            self.stack_specification.pack(pady=10, padx=10, fill="x")
-        except NotConfiguredError:
-            z_scanner = None # no stack acquisitions without a z objective scanner
         self.timing_indicator.pack(pady=10, padx=10, fill="x")
 
+    def attach_motion(self, stages: Optional[MultiAxisStage], z_scanner):
+        """Add the stack, stage and stage-routine controls, once the motors have initialized."""
+        if z_scanner is not None: # no stack acquisitions without a z motor
+            self.stack_specification = StackSpecificationControl(self, self.frame_specification)
+            self.stack_specification.pack(pady=10, padx=10, fill="x", before=self.timing_indicator)
+
         # ! Note that this does not allow for Z-axis PRESENT, XY ABSENT
-        try: 
-            self.stage_control = StageControl(
-                self, 
-                controller.hw.stages, 
-                z_scanner,
-            )
-            self.stage_control.pack(side=ctk.BOTTOM, fill="x", padx=10, pady=5)
-        except NotConfiguredError:
-            pass # no stage
+        if stages is None:
+            return # no stage
+        self.stage_control = StageControl(
+            self, 
+            stages, 
+            z_scanner,
+        )
+        self.stage_control.pack(side=ctk.BOTTOM, fill="x", padx=10, pady=5)
+        self.mosaic_specification = MosaicSpecificationControl(self, self.frame_specification)
+        self.mosaic_specification.pack(pady=10, padx=10, fill="x", before=self.timing_indicator)
+        # Collapsed at launch; built on first expand (or first time-lapse start)
+        self.timelapse_section = LazySection(
+            self, "Time-lapse",
+            build=lambda parent: TimelapseControl(
+                parent, self._current_stage_position, 
+                stack_available=z_scanner is not None, title=None
+            ),
+        )
+        self.timelapse_section.pack(pady=10, padx=10, fill="x", before=self.timing_indicator)
+        self.acquisition_control.enable_stage_routines()
+
+    @property
+    def timelapse_control(self) -> TimelapseControl:
+        return self.timelapse_section.content
+
+    def _current_stage_position(self) -> StagePosition | None:
+        positions = self.stage_control.positions
+        if "x" not in positions or "y" not in positions:
+            return None
+        return StagePosition("", positions["x"], positions["y"], positions.get("z"))
 
 
 class RightPanel(ctk.CTkFrame):
-    def __init__(self, parent, controller: Dirigo, toggle_theme_callback):
+    # Top-to-bottom order of the controls, which are attached as their devices initialize
+    _ORDER = ("detector_control", "laser_control", "display_control", "writer_control")
+
+    def __init__(self, parent, controller: Dirigo, mirror: HardwareMirror, toggle_theme_callback):
         super().__init__(parent, width=200, corner_radius=0)
 
+        self._controller = controller
+        self._mirror = mirror
         self._toggle_theme_callback = toggle_theme_callback
 
-        if controller.hw.detectors:
-            self.detector_control = DetectorSetControl(self, controller.hw.detectors)
-            self.detector_control.pack(padx=10, pady=10, fill="x")
-
-        if controller.hw.beam_attenuator:
-            self.laser_control = LaserControl(self, controller.hw.beam_attenuator)
-            self.laser_control.pack(padx=10, pady=10, fill="x")
-        
-        self.display_control = DisplayControl(self, controller)
-        self.display_control.pack(padx=10, pady=10, fill="x")
-
         self.writer_control = WriterControl(self)
         self.writer_control.pack(padx=10, pady=10, fill="x")
 
         self.theme_switch = ctk.CTkSwitch(self, text="Color Mode: ", command=self._toggle_theme_callback)
         self.theme_switch.pack(side=ctk.BOTTOM, pady=10, padx=10, fill="x")
 
+    def attach_detectors(self, detectors: DetectorSet):
+        self._attach("detector_control", DetectorSetControl(self, detectors, self._mirror))
+
+    def attach_laser(self, beam_attenuator: BeamAttenuator):
+        self._attach("laser_control", LaserControl(self, beam_attenuator, self._mirror))
+
+    def attach_display(self):
+        self._attach("display_control", DisplayControl(self, self._controller))
+
+    def _attach(self, name: str, control: ctk.CTkFrame):
+        """Pack `control` above the controls that come after it in _ORDER."""
+        later = [getattr(self, n) for n in self._ORDER[self._ORDER.index(name) + 1:] if hasattr(self, n)]
+        setattr(self, name, control)
+        control.pack(padx=10, pady=10, fill="x", before=later[0])
+
 
 class ReferenceGUI(ctk.CTk):
-    def __init__(self, dirigo_controller: Dirigo):
+    def __init__(self,
+                 dirigo_controller: Dirigo,
+                 io_profiler: Optional[IOProfiler] = None,
+                 stall_threshold: Optional[float] = None,
+                 startup_timer: Optional[StartupTimer] = None,
+                 frame_spec: Optional[FrameAcquisitionSpec] = None,
+                 persist_settings: bool = True,
+                 profile_memory: bool = False,
+                 telemetry: bool = True,
+                 track_buffers: bool = False):
         super().__init__()
+        self._startup_timer = startup_timer
+        self._initial_frame_spec = frame_spec # None to load the saved default
+        self._persist_settings = persist_settings # False to neither load nor save settings.toml
 
         self.dirigo = dirigo_controller
+        # Hardware as seen by the GUI controls; wrapped to time every device call if profiling
+        self.io_profiler = io_profiler
+        self.hw = io_profiler.wrap(self.dirigo.hw, "hw") if io_profiler else self.dirigo.hw
+        self.io_profile_window: Optional[IOProfileWindow] = None
+        # On-demand sampling profiler, toggled with Ctrl+Shift+P
+        self.profiler: Optional[SamplingProfiler] = None
+        self._profile_memory = profile_memory
+        # Performance record appended to the telemetry log for each acquisition
+        self._telemetry_enabled = telemetry
+        self.telemetry: Optional[AcquisitionTelemetry] = None
+        # Product buffer lifecycle checks (debug), reported after each acquisition
+        self.buffer_tracker: Optional[BufferTracker] = None
+        if track_buffers:
+            self.buffer_tracker = BufferTracker()
+            self.buffer_tracker.install()
 
         self.acquisition: Optional[Acquisition] = None
+        self._autofocus: Optional[Acquisition] = None # run from the stage controls, see run_autofocus
         self.processor: Optional[Processor] = None
+        self.reducer: Optional[Processor] = None
         self.display: Optional[Display] = None
         self.inbox = queue.Queue() # to receive queued data from Display
+        self.hardware_state: dict = {} # cached values for writer threads, see _refresh_hardware_state
+        # Cached device properties for the controls; refreshed in the background. Devices
+        # are added by the initializer's worker threads as they come up.
+        self.hw_mirror = HardwareMirror()
+        self.hw_mirror.start()
+        self.hw_init = HardwareInitializer(self.hw, on_ready={ # type: ignore
+            "detectors":        self.hw_mirror.add_detectors,
+            "beam attenuator":  self.hw_mirror.add_beam_attenuator,
+            "slow scanner":     lambda slow: self.hw_mirror.add_scanners(self.hw.fast_raster_scanner, slow),
+            "z motor":          self.hw_mirror.add_z_motor,
+        })
+        self.hw_init.start()
 
         self.title("Dirigo Reference GUI")
         self._configure_ui()
+        self._mark_startup("panels")
         self._restore_settings()
+        self._mark_startup("settings")
+
+        # Attach the hardware panels as their devices become ready
+        self.splash = StartupSplash(self, self.hw_init)
+        self._pending_attachments = [
+            (("digitizer",),            self._attach_display),
+            (("slow scanner",),         self._attach_scanners),
+            (("detectors",),            self._attach_detectors),
+            (("beam attenuator",),      self._attach_laser),
+            (("stages", "z motor"),     self._attach_motion),
+        ]
+        self._poll_hardware()
 
         self.protocol("WM_DELETE_WINDOW", self.on_close_request) # custom close function
 
+        # Event-loop stall detection (opt-in)
+        self.stall_watchdog: Optional[StallWatchdog] = None
+        if stall_threshold is not None:
+            self.stall_watchdog = StallWatchdog(self, threshold=stall_threshold)
+            self.stall_watchdog.start()
+
+        if startup_timer is not None:
+            self.after_idle(self._report_startup)
+
+    def _mark_startup(self, label: str):
+        if self._startup_timer is not None:
+            self._startup_timer.mark(label)
+
+    def _report_startup(self):
+        """Runs once the event loop is idle, i.e. the window is drawn and interactive."""
+        self._mark_startup("first draw")
+        print(self._startup_timer.report()) # type: ignore
+
+    @property
+    def timelapse_control(self) -> TimelapseControl:
+        return self.left_panel.timelapse_control
+
     def _configure_ui(self):
         self.left_panel = LeftPanel(
             parent=self,
-            controller=self.dirigo,
+            mirror=self.hw_mirror,
             start_callback=self.start_acquisition,
             stop_callback=self.stop_acquisition,
+            frame_spec=self._initial_frame_spec,
         )
         self.acquisition_control = self.left_panel.acquisition_control # pass refs up to the parent GUI for easier access
         self.frame_specification = self.left_panel.frame_specification
-        try:
-            self.stack_specification = self.left_panel.stack_specification
-        except AttributeError:
-            pass
-        try:
-            self.stage_control = self.left_panel.stage_control
-        except AttributeError:
-            pass
         self.left_panel.pack(side=ctk.LEFT, fill=ctk.Y)
 
         self.right_panel = RightPanel(
             parent=self, 
             controller=self.dirigo,
+            mirror=self.hw_mirror,
             toggle_theme_callback=self.toggle_mode
         )
-        self.display_control = self.right_panel.display_control 
         self.writer_control = self.right_panel.writer_control
+        if self.io_profiler is not None:
+            ctk.CTkButton(
+                self.right_panel, text="I/O Profile", command=self.open_io_profile
+            ).pack(side=ctk.BOTTOM, padx=10, pady=(0, 4), fill="x")
         self.right_panel.pack(side=ctk.RIGHT, fill=ctk.Y)
 
         self.viewer = LiveViewer(
@@ -137,39 +271,112 @@ class ReferenceGUI(ctk.CTk):
 
         self.bind("<Control-equal>", lambda e: self.viewer.cycle_zoom(+1))
         self.bind("<Control-minus>", lambda e: self.viewer.cycle_zoom(-1))
+        self.bind("<Control-P>", lambda e: self.toggle_profiler()) # Ctrl+Shift+P
+
+    # ---------- Hardware panels, attached as devices initialize ----------
+    def _poll_hardware(self, interval_ms: int = 50):
+        for attachment in list(self._pending_attachments):
+            names, attach = attachment
+            if all(self.hw_init[name].settled for name in names):
+                self._pending_attachments.remove(attachment)
+                attach()
+        if self._pending_attachments or not self.hw_init.done:
+            self.after(interval_ms, self._poll_hardware, interval_ms)
+            return
+        # Acquisitions need the display controls (i.e. a data acquisition device)
+        if not self._autofocus_running(): # otherwise _poll_autofocus re-enables them
+            self.acquisition_control.set_ready(hasattr(self, "display_control"))
+        self._disable_unsimulated()
+        if self._startup_timer is not None:
+            print(self.hw_init.summary())
+
+    def _disable_unsimulated(self):
+        """On the simulated rig, disable the routines that drive a real FrameAcquisition."""
+        from dirigo_gui.simulation.controller import SimulatedDirigo # deferred, as in main()
+        if not isinstance(self.dirigo, SimulatedDirigo):
+            return
+        self.acquisition_control.set_unavailable("stack", "mosaic", "timelapse")
+        stage_control = getattr(self, "stage_control", None)
+        if stage_control is not None and hasattr(stage_control, "autofocus_button"):
+            stage_control.autofocus_button.configure(state=ctk.DISABLED)
+
+    def _attach_display(self):
+        if self.hw_init["digitizer"].state == "failed":
+            return # no data acquisition device; reported on the splash
+        self.right_panel.attach_display()
+        self.display_control = self.right_panel.display_control
+        self._restore_display_settings()
+
+    def _attach_scanners(self):
+        self.left_panel.timing_indicator.update(self.frame_specification.generate_spec())
+
+    def _attach_detectors(self):
+        if self.hw_init["detectors"].device is not None:
+            self.right_panel.attach_detectors(self.hw_init["detectors"].device)
+
+    def _attach_laser(self):
+        if self.hw_init["beam attenuator"].device is not None:
+            self.right_panel.attach_laser(self.hw_init["beam attenuator"].device)
+
+    def _attach_motion(self):
+        stages = self.hw_init["stages"].device
+        z_scanner = self.hw_init["z motor"].device
+        self.left_panel.attach_motion(stages, z_scanner)
+        if z_scanner is not None:
+            self.stack_specification = self.left_panel.stack_specification
+        if stages is not None:
+            self.stage_control = self.left_panel.stage_control
+            self.mosaic_specification = self.left_panel.mosaic_specification
+            # Overview map, built from displayed frames while the stage is at rest
+            self.overview_map = TilePyramid()
+            self.overview_feed = OverviewFeed(self, self.overview_map)
+            self.overview_window: Optional[OverviewWindow] = None
+            self.stage_control.overview_button.configure(command=self.open_overview)
+            if hasattr(self.stage_control, 'autofocus_button'):
+                self.stage_control.autofocus_button.configure(command=self.run_autofocus)
 
     def _restore_settings(self):
         config_dir = Path(user_config_dir("Dirigo-GUI", "Dirigo"))
 
+        self._settings: dict = {}
+        if not self._persist_settings:
+            return
         try:
             with open(config_dir / "settings.toml", "r") as file:
-                settings = toml.load(file)
-            # Populate GUI
-
-            if settings["window_color_mode"] == "Dark":
-                self.right_panel.theme_switch.select()
-            else:
-                self.right_panel.theme_switch.deselect()
-            ctk.set_appearance_mode(settings["window_color_mode"])
-
-            i = 0
-            while f"channel_{i}" in settings:
-                channel_settings = settings[f"channel_{i}"]
-                channel_frame = self.display_control.channel_frames[i]
-                channel_frame.enabled = channel_settings["enabled"]
-                channel_frame.color_vector_name = channel_settings["color_vector"]
-                channel_frame.min = channel_settings["display_min"]
-                channel_frame.max = channel_settings["display_max"]
-                i += 1
-
-            self.display_control.gamma.delete(0, ctk.END)
-            self.display_control.gamma.insert(0, str(float(settings["gamma"])))
-
+                self._settings = toml.load(file)
         except FileNotFoundError:
             warnings.warn("Could not find GUI settings file. Using defaults.", UserWarning)
+            return
+        # Populate GUI; display settings are applied once the display controls are attached
+
+        if self._settings["window_color_mode"] == "Dark":
+            self.right_panel.theme_switch.select()
+        else:
+            self.right_panel.theme_switch.deselect()
+        ctk.set_appearance_mode(self._settings["window_color_mode"])
+
+    def _restore_display_settings(self):
+        settings = self._settings
+        if not settings:
+            return
+        if "data_range" in settings: # as reported by the last pipeline built
+            self.display_control.set_data_range(tuple(settings["data_range"]))
+
+        i = 0
+        while f"channel_{i}" in settings and i < len(self.display_control.channel_frames):
+            channel_settings = settings[f"channel_{i}"]
+            channel_frame = self.display_control.channel_frames[i]
+            channel_frame.enabled = channel_settings["enabled"]
+            channel_frame.color_vector_name = channel_settings["color_vector"]
+            channel_frame.min = channel_settings["display_min"]
+            channel_frame.max = channel_settings["display_max"]
+            i += 1
+
+        self.display_control.gamma.delete(0, ctk.END)
+        self.display_control.gamma.insert(0, str(float(settings["gamma"])))
 
     def start_acquisition(self, log_frames: bool = False, acq_name: str = 'raster_frame'):
-        if acq_name not in {'raster_frame', 'raster_stack'}:
+        if acq_name not in {'raster_frame', 'raster_stack', 'raster_mosaic', 'timelapse'}:
             raise ValueError("Unsupported Acquistion type: {acq_type}") 
         self.display_count = 0
         self.tk_image = None # resets the previous image if it exists
@@ -179,18 +386,61 @@ class ReferenceGUI(ctk.CTk):
             spec = self.frame_specification.generate_spec()
         elif acq_name == 'raster_stack':
             spec = self.stack_specification.generate_spec()
+        elif acq_name == 'raster_mosaic':
+            spec = self.mosaic_specification.generate_spec()
+        elif acq_name == 'timelapse':
+            if not self.timelapse_control.positions:
+                warnings.warn("Add at least one position to the time-lapse.", UserWarning)
+                self.acquisition_control.stopped()
+                return
+            plan = self.timelapse_control.generate_plan()
+            if plan.child == 'raster_stack':
+                spec = self.stack_specification.generate_spec()
+            else:
+                spec = self.frame_specification.generate_spec()
         if not log_frames:
             # in focus mode, don't save frames and run indefinitely
             spec.buffers_per_acquisition = -1 # -1 codes for infinite
 
+        # Check the reduction settings before any worker is created
+        reduction_spec = None
+        if log_frames and not self.writer_control.save_raw_checkbox.get():
+            try:
+                reduction_spec = self.writer_control.generate_reduction_spec(
+                    value_range=self._display_value_range()
+                )
+            except ValueError as e:
+                warnings.warn(f"Invalid data reduction settings: {e}", UserWarning)
+                self.acquisition_control.stopped()
+                return
+
         # Create workers
-        self.acquisition = self.dirigo.make_acquisition(acq_name, spec=spec)
+        self.reducer = None
+        try:
+            if acq_name == 'timelapse':
+                # One pipeline for the whole time-lapse; the acquisition visits the positions
+                if plan.child == 'raster_stack':
+                    plan.child = self.stack_specification.acquisition_name
+                self.acquisition = self.dirigo.make_acquisition(acq_name, spec=spec, plan=plan)
+            elif acq_name == 'raster_stack':
+                # Step-and-settle or continuous sweep, per the stack specification
+                self.acquisition = self.dirigo.make_acquisition(
+                    self.stack_specification.acquisition_name, spec=spec
+                )
+            else:
+                self.acquisition = self.dirigo.make_acquisition(acq_name, spec=spec)
+        except ValueError as e: # e.g. a continuous sweep faster than the z motor allows
+            warnings.warn(f"Cannot start the acquisition: {e}", UserWarning)
+            self.acquisition_control.stopped()
+            return
         self.processor   = self.dirigo.make_processor("raster_frame", upstream=self.acquisition)
         self.averager    = self.dirigo.make_processor("rolling_average", upstream=self.processor)
         self.display     = self.dirigo.make_display_processor("frame", upstream=self.averager)
 
         # Connect Display(Worker) to GUI LiveViewer
         self.display.add_subscriber(self.viewer) # type: ignore
+        if hasattr(self, 'overview_feed'):
+            self._connect_overview(spec, acq_name, log_frames)
         self.viewer.configure_size(spec.pixels_per_line, spec.lines_per_frame)
 
         # Link workers to GUI control elements
@@ -200,7 +450,7 @@ class ReferenceGUI(ctk.CTk):
         if log_frames:        
             if self.writer_control.save_raw_checkbox.get():
                 # To save 'raw', directly connect the Acquisition to Writer
-                self.writer = self.dirigo.make("writer", "tiff", upstream=self.acquisition)
+                self.writer = self.dirigo.make("writer", "rollover_tiff", upstream=self.acquisition)
                 self.writer.basename = self.writer.basename + "_raw"
                 self.writer.frames_per_file = self.writer.frames_per_file
             else:
@@ -208,23 +458,226 @@ class ReferenceGUI(ctk.CTk):
                 if hasattr(self.acquisition.spec, '_saved_frames_per_step'):
                     self.averager.n_frame_average = self.acquisition.spec._saved_frames_per_step
                     self.averager._skip_n_frames = self.acquisition.spec._saved_frames_per_step - 1
-                self.writer = self.dirigo.make("writer", "tiff", upstream=self.averager)
+                if reduction_spec.active:
+                    # Reduce (bin, crop, decimate, downcast) before writing
+                    self.reducer = self.dirigo.make_processor(
+                        "reduction", upstream=self.averager, spec=reduction_spec
+                    )
+                    self.writer = self.dirigo.make("writer", "rollover_tiff", upstream=self.reducer)
+                else:
+                    self.writer = self.dirigo.make("writer", "rollover_tiff", upstream=self.averager)
 
             if acq_name == 'raster_stack':
                 self.writer.mode = 'z-stack'
+                if self.writer_control.save_raw_checkbox.get():
+                    self.writer.frames_per_depth = spec._saved_frames_per_step
+            elif acq_name == 'raster_mosaic':
+                # Index saved frames by tile (one averaged frame per tile unless saving raw)
+                self.writer.tiles = self.acquisition.tiles
+                if self.writer_control.save_raw_checkbox.get():
+                    self.writer.frames_per_tile = spec._saved_frames_per_step
+                elif self.reducer is not None:
+                    self.writer.decimation = reduction_spec.decimation
 
             self.writer_control.link_writer_worker(self.writer)
+            self._refresh_hardware_state()
+            self.writer.metadata_source = lambda: self.hardware_state
+            if self.reducer is not None:
+                self._save_reduction_metadata()
         else:
             self.writer = None
 
+        if self._telemetry_enabled:
+            self.telemetry = AcquisitionTelemetry(
+                acq_name, spec, log_frames,
+                stages={
+                    "acquisition":  self.acquisition,
+                    "processor":    self.processor,
+                    "averager":     self.averager,
+                    "reducer":      self.reducer,
+                    "display":      self.display,
+                },
+                viewer=self.viewer,
+                writer=self.writer,
+                stall_watchdog=self.stall_watchdog,
+            )
+        self._invalidate_motion()
         self.acquisition.start()
 
         # Start polling for acquisition ended, trigger controls update if ended
         self.poll_acquisition_status()
 
+    def _connect_overview(self, spec, acq_name: str, log_frames: bool):
+        """Feed displayed frames to the overview map, registered at their stage position."""
+        if acq_name == 'raster_mosaic':
+            # Frames arrive in tile order: one averaged frame per tile unless saving raw
+            tiles = self.acquisition.tiles
+            per_tile = spec._saved_frames_per_step if self.writer_control.save_raw_checkbox.get() else 1
+            def position_source(n):
+                i = n // per_tile
+                return (tiles[i].x, tiles[i].y) if i < len(tiles) else None
+        elif acq_name == 'raster_stack' or hasattr(spec, 'depths'):
+            return # z changes between frames
+        elif acq_name == 'timelapse':
+            acquisition = self.acquisition
+            def position_source(n):
+                if not acquisition.visits:
+                    return None
+                position = acquisition.plan.positions[acquisition.visits[-1].position]
+                return position.x, position.y
+        else:
+            def position_source(n):
+                if self.stage_control.poller.any_moving:
+                    return None # frame would be smeared / misregistered
+                positions = self.stage_control.positions
+                if "x" not in positions or "y" not in positions:
+                    return None
+                return positions["x"], positions["y"]
+
+        self.overview_feed.reset(
+            pixel_size=(float(spec.pixel_size), float(spec.pixel_height)),
+            position_source=position_source,
+        )
+        self.display.add_subscriber(self.overview_feed) # type: ignore
+
+    def open_io_profile(self):
+        if self.io_profile_window is not None and self.io_profile_window.winfo_exists():
+            self.io_profile_window.lift()
+            return
+        self.io_profile_window = IOProfileWindow(self, self.io_profiler) # type: ignore
+
+    def toggle_profiler(self):
+        """Start sampling every thread, or stop and write the profile to the log directory."""
+        if self.profiler is None:
+            self.profiler = SamplingProfiler(memory=self._profile_memory)
+            self.profiler.start()
+            self.title("Dirigo Reference GUI (profiling)")
+        else:
+            collapsed, summary = self.profiler.stop()
+            self.profiler = None
+            self.title("Dirigo Reference GUI")
+            print(f"Profile saved: {summary} (collapsed stacks: {collapsed.name})")
+
+    def open_overview(self):
+        if self.overview_window is not None and self.overview_window.winfo_exists():
+            self.overview_window.lift()
+            return
+
+        def stage_position():
+            positions = self.stage_control.positions
+            if "x" in positions and "y" in positions:
+                return positions["x"], positions["y"]
+            return None
+
+        def move_stage(x: float, y: float):
+            if self.acquisition_control.stage_busy:
+                return # a mosaic or time-lapse is moving the stage, or a saved series is in progress
+            self.stage_control.motion["x"].move_to(units.Position(x))
+            self.stage_control.motion["y"].move_to(units.Position(y))
+
+        def field_size():
+            f = self.frame_specification
+            return float(f._frame_width), float(f._frame_height)
+
+        self.overview_window = OverviewWindow(
+            self, self.overview_map,
+            stage_position=stage_position,
+            move_stage=move_stage,
+            field_size=field_size,
+        )
+
+    def run_autofocus(self):
+        """Focus with the z motor (see routines.autofocus), unless already acquiring."""
+        if self.acquisition_control.acquisition_running:
+            return
+        if self._autofocus_running():
+            return # a previous autofocus is still running
+        self._autofocus = self.dirigo.make_acquisition(
+            "autofocus", spec=self.frame_specification.generate_spec()
+        )
+        self.acquisition_control.set_ready(False) # the autofocus owns the digitizer and scanners
+        self.stage_control.autofocus_button.configure(state=ctk.DISABLED)
+        self.stage_control.autofocus_label.configure(text="Focusing...")
+        self._invalidate_motion()
+        self._autofocus.start()
+        self._poll_autofocus()
+
+    def _autofocus_running(self) -> bool:
+        return self._autofocus is not None and self._autofocus.is_alive()
+
+    def _poll_autofocus(self, interval_ms: int = 100):
+        if self._autofocus.is_alive():
+            self.after(interval_ms, self._poll_autofocus, interval_ms)
+            return
+        self._autofocus.join()
+        self._invalidate_motion()
+        self.acquisition_control.set_ready(hasattr(self, "display_control"))
+        self.stage_control.autofocus_button.configure(state=ctk.NORMAL)
+        result = self._autofocus.result
+        if result is None:
+            text = "Autofocus failed"
+        else:
+            z = units.Position(result.z).with_unit("μm")
+            edge = " (edge)" if result.at_edge else ""
+            text = f"z = {z}{edge}, {result.runtime:.1f} s"
+        self.stage_control.autofocus_label.configure(text=text)
+
+    def _refresh_hardware_state(self):
+        """
+        Snapshot the last known hardware state from the GUI controls (no device
+        I/O). The dict is replaced, never mutated, so worker threads can read
+        it at any time.
+        """
+        state = {}
+        stage_control = getattr(self, "stage_control", None)
+        if stage_control is not None:
+            positions = stage_control.positions
+            state["stage_x"] = positions.get("x")
+            state["stage_y"] = positions.get("y")
+            state["z"] = positions.get("z")
+        detector_control = getattr(self.right_panel, "detector_control", None)
+        if detector_control is not None:
+            state["detector_gains"] = detector_control.gains
+        laser_control = getattr(self.right_panel, "laser_control", None)
+        if laser_control is not None:
+            state["laser_fraction"] = laser_control.fraction
+        self.hardware_state = state
+
+    def _display_value_range(self) -> tuple[int, int]:
+        """Span of the display min/max settings over the enabled channels."""
+        frames = [f for f in self.display_control.channel_frames if f.enabled] \
+            or self.display_control.channel_frames
+        return min(f.min for f in frames), max(f.max for f in frames)
+
+    def _save_reduction_metadata(self):
+        """Record the applied data reduction next to the saved series."""
+        path = Path(self.writer.save_path) / f"{self.writer.basename}_reduction.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.reducer.metadata, file, indent=2)
+
+    def _save_visit_log(self):
+        """Record which saved frames belong to which time-lapse position and round."""
+        per_saved = 1
+        spec = self.acquisition.spec
+        if hasattr(spec, '_saved_frames_per_step') and not self.writer_control.save_raw_checkbox.get():
+            per_saved = spec._saved_frames_per_step # averaged to one frame per depth
+        path = Path(self.writer.save_path) / f"{self.writer.basename}_visits.json"
+        with open(path, "w") as file:
+            json.dump(self.acquisition.visit_log(per_saved), file, indent=2)
+
+    def _report_timelapse(self):
+        statistics = self.acquisition.statistics
+        behind = [v["position"] for v in self.acquisition.visit_log()
+                  if v["late_by_s"] > self.acquisition.plan.late_tolerance * self.acquisition.plan.interval]
+        self.timelapse_control.report(statistics, behind)
+
     def poll_acquisition_status(self, interval_ms: int = 100):
         if self.acquisition is None:
             raise RuntimeError("Acquisition not initialized")
+        self._refresh_hardware_state()
+        if hasattr(self.acquisition, 'visit_log'): # time-lapse
+            self._report_timelapse()
         if not self.acquisition.is_alive():
             self.stop_acquisition() 
             # terminates the polling loop
@@ -238,6 +691,7 @@ class ReferenceGUI(ctk.CTk):
             raise RuntimeError("Processor not initialized")
         if self.display is None:
             raise RuntimeError("Display not initialized")
+        stop_requested = time.perf_counter()
         # Send stop to all threads, wait until all complete
         self.acquisition.stop()
         self.processor.stop()
@@ -246,11 +700,45 @@ class ReferenceGUI(ctk.CTk):
         self.acquisition.join()
         self.processor.join()
         self.display.join()
+        if self.reducer is not None:
+            self.reducer.join()
         if self.writer is not None:
             self.writer.stop()
             self.writer.join()
+        if hasattr(self.acquisition, 'tiles'): # mosaic
+            self.mosaic_specification.report(self.acquisition.statistics)
+        if hasattr(self.acquisition, 'visit_log'): # time-lapse
+            self._report_timelapse()
+            if self.writer is not None:
+                self._save_visit_log()
+        if self.telemetry is not None:
+            try:
+                self.telemetry.finish(stop_requested)
+            except OSError as e:
+                warnings.warn(f"Could not write acquisition telemetry: {e}", UserWarning)
+            self.telemetry = None
+        if self.buffer_tracker is not None:
+            # Once the viewers have drained the end of the stream and released their frames
+            self.after(1000 * int(self.buffer_tracker.stale_after + 1), self._report_buffers)
+        self._invalidate_motion()
         self.acquisition_control.stopped()
 
+    def _invalidate_motion(self):
+        """Make the next stage step start from the polled position, not a stale target."""
+        stage_control = getattr(self, "stage_control", None)
+        if stage_control is not None:
+            stage_control.motion.invalidate()
+
+    def _report_buffers(self):
+        tracker = self.buffer_tracker
+        if tracker is None:
+            return
+        print(tracker.summary())
+        path = tracker.save()
+        if path is not None:
+            print(f"Buffer problems recorded, see {path}")
+        tracker.clear()
+
     def toggle_mode(self):
         current_mode = ctk.get_appearance_mode()
         new_mode = "Light" if current_mode == "Dark" else "Dark"
@@ -266,6 +754,11 @@ class ReferenceGUI(ctk.CTk):
 
             # Start polling or waiting to check if the acquisition is truly stopped
             self.after(100, self._check_acquisition_stopped)
+        elif self._autofocus_running():
+            # An autofocus (run_autofocus) is moving the z motor: abort it first
+            self._autofocus.stop()
+            self._autofocus.join(timeout=2.0)
+            self.destroy()
         else:
             # No acquisition running, so we can close immediately
             self.destroy()
@@ -285,7 +778,18 @@ class ReferenceGUI(ctk.CTk):
 
     def destroy(self):
         # Save GUI settings
-        self._save_gui_settings()
+        if self._persist_settings:
+            self._save_gui_settings()
+        self.hw_mirror.stop()
+        if self.profiler is not None:
+            self.toggle_profiler()
+        if self.buffer_tracker is not None:
+            self.buffer_tracker.uninstall()
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.stop()
+            path = self.stall_watchdog.save()
+            if path is not None:
+                print(f"{self.stall_watchdog.stalls} UI stalls recorded, see {path}")
 
         # Close Tkinter
         return super().destroy()
@@ -294,12 +798,20 @@ class ReferenceGUI(ctk.CTk):
         config_dir = Path(user_config_dir("Dirigo-GUI", "Dirigo"))
         config_dir.mkdir(parents=True, exist_ok=True)
         
-        settings = dict()
+        settings = dict(self._settings) # keeps the display settings if closed before they were attached
 
         # Light/Dark mode
         mode = "Dark" if self.right_panel.theme_switch.get() else "Light"
         settings["window_color_mode"] = mode
 
+        if hasattr(self, "display_control"):
+            self._display_settings(settings)
+
+        with open(config_dir / "settings.toml", "w") as file:
+            toml.dump(settings, file)
+
+    def _display_settings(self, settings: dict):
+        """Add the channel and other display settings to `settings`."""
         # Channel controls
         for channel_frame in self.display_control.channel_frames:
             channel_settings = dict()
@@ -312,14 +824,71 @@ class ReferenceGUI(ctk.CTk):
 
         # Other display settings
         settings[f"gamma"] = self.display_control.gamma.get()
-
-        with open(config_dir / "settings.toml", "w") as file:
-            toml.dump(settings, file)
+        settings["data_range"] = list(self.display_control.data_range)
 
 
 def main():
-    dirigo = Dirigo()
-    gui = ReferenceGUI(dirigo)
+    parser = argparse.ArgumentParser(description="Dirigo reference GUI")
+    parser.add_argument("--profile-io", action="store_true",
+                        help="time every device call made by the GUI (see the I/O Profile panel)")
+    parser.add_argument("--slow-call-ms", type=float, default=10.0,
+                        help="flag device calls on the Tk thread slower than this (default 10 ms)")
+    parser.add_argument("--watch-stalls", action="store_true",
+                        help="sample the main thread's stack whenever the Tk event loop stalls")
+    parser.add_argument("--stall-ms", type=float, default=200.0,
+                        help="event-loop lag counted as a stall (default 200 ms)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a breakdown of the time from launch to an interactive window")
+    parser.add_argument("--debug-buffers", action="store_true",
+                        help="track product buffers; report unreleased buffers, use after release "
+                             "and pool high-water marks after each acquisition")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="include tracemalloc allocation growth in profiles (Ctrl+Shift+P)")
+    simulation = parser.add_argument_group("simulation", "run without hardware, on simulated devices")
+    simulation.add_argument("--simulate", action="store_true",
+                            help="use simulated devices and synthetic frames instead of system_config.toml")
+    simulation.add_argument("--sim-channels", type=int, default=2,
+                            help="number of digitizer channels (default 2)")
+    simulation.add_argument("--sim-fps", type=float, default=None,
+                            help="frame rate (default: from the scanner frequency and frame size)")
+    simulation.add_argument("--sim-latency-ms", type=float, default=None,
+                            help="command latency of every simulated device (default 10 ms for "
+                                 "stages, 20 ms for detectors and the laser)")
+    simulation.add_argument("--sim-init-s", type=float, default=0.5,
+                            help="time to initialize each simulated device (default 0.5 s)")
+    args = parser.parse_args()
+
+    startup_timer = StartupTimer(start=_IMPORT_START) if args.profile_startup else None
+    if startup_timer is not None:
+        startup_timer.mark("imports")
+    io_profiler = IOProfiler(slow_threshold=args.slow_call_ms / 1000) if args.profile_io else None
+    frame_spec = None
+    if args.simulate:
+        from dirigo_gui.simulation.hardware import SimulationConfig
+        from dirigo_gui.simulation.controller import SimulatedDirigo
+        from dirigo_gui.simulation.acquisition import SimulatedFrameAcquisition
+        config = SimulationConfig(
+            channels        = args.sim_channels,
+            frame_rate      = args.sim_fps,
+            init_latency    = args.sim_init_s,
+        )
+        if args.sim_latency_ms is not None:
+            config.stage_command_latency = config.device_command_latency = args.sim_latency_ms / 1000
+        dirigo = SimulatedDirigo(config)
+        frame_spec = SimulatedFrameAcquisition.get_specification()
+    else:
+        dirigo = Dirigo() # devices are initialized later, concurrently (see HardwareInitializer)
+    if startup_timer is not None:
+        startup_timer.mark("controller")
+    gui = ReferenceGUI(
+        dirigo,
+        io_profiler     = io_profiler,
+        stall_threshold = args.stall_ms / 1000 if args.watch_stalls else None,
+        startup_timer   = startup_timer,
+        frame_spec      = frame_spec,
+        profile_memory  = args.profile_memory,
+        track_buffers   = args.debug_buffers,
+    )
     gui.mainloop()
 
 
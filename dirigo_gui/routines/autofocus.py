@@ -0,0 +1,240 @@
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional, Type
+import copy
+import json
+import time
+
+from platformdirs import user_config_dir, user_log_dir
+import numpy as np
+
+from dirigo import units
+from dirigo.hw_interfaces.digitizer import Digitizer, DigitizerProfile
+from dirigo.hw_interfaces.scanner import FastRasterScanner, SlowRasterScanner, ObjectiveZScanner
+from dirigo.sw_interfaces.acquisition import Acquisition, AcquisitionProduct
+from dirigo.sw_interfaces.worker import EndOfStream
+from dirigo.plugins.acquisitions import (
+    FrameAcquisitionSpec, FrameAcquisition, LineAcquisitionRuntimeInfo
+)
+
+from dirigo_gui.hardware.device_lock import device_lock
+
+
+
+# ---------- Focus metrics ----------
+def _roi(frame: np.ndarray, roi_fraction: float, subsample: int) -> np.ndarray:
+    """Central ROI of a (Y, X, C) frame, subsampled and summed over channels."""
+    h, w = frame.shape[:2]
+    dy, dx = int(h * (1 - roi_fraction) / 2), int(w * (1 - roi_fraction) / 2)
+    roi = frame[dy:h - dy:subsample, dx:w - dx:subsample]
+    if roi.ndim == 3:
+        return roi.sum(axis=2, dtype=np.float32)
+    return roi.astype(np.float32)
+
+
+def normalized_variance(image: np.ndarray) -> float:
+    mean = float(image.mean())
+    return float(image.var()) / max(abs(mean), 1e-9)
+
+
+def brenner_gradient(image: np.ndarray) -> float:
+    """Mean squared difference between pixels two apart along the fast axis."""
+    diff = image[:, 2:] - image[:, :-2]
+    return float(np.mean(diff * diff))
+
+
+FOCUS_METRICS: dict[str, Callable[[np.ndarray], float]] = {
+    "brenner":              brenner_gradient,
+    "normalized_variance":  normalized_variance,
+}
+
+
+def fit_peak(z: np.ndarray, metric: np.ndarray) -> tuple[float, bool]:
+    """
+    Position of the metric maximum, refined with a parabola through the best
+    sample and its neighbours. Returns (z_peak, at_edge); at_edge means the
+    maximum is at the end of the sweep and the true peak may lie beyond it.
+    """
+    i = int(np.argmax(metric))
+    if i == 0 or i == len(metric) - 1:
+        return float(z[i]), True
+    y0, y1, y2 = metric[i - 1:i + 2]
+    denom = y0 - 2 * y1 + y2
+    if denom >= 0: # not a maximum (flat or noisy)
+        return float(z[i]), False
+    offset = 0.5 * (y0 - y2) / denom # in samples, within (-1, 1)
+    step = (z[i + 1] - z[i - 1]) / 2
+    return float(z[i] + offset * step), False
+
+
+# ---------- Routine ----------
+@dataclass
+class AutofocusSettings:
+    coarse_range: float = 200e-6  # m, full width centred on the start z
+    coarse_step: float = 20e-6
+    fine_range: float = 40e-6     # m, full width centred on the coarse peak
+    fine_step: float = 4e-6
+    metric: str = "brenner"
+    roi_fraction: float = 0.5     # central fraction of the frame scored
+    subsample: int = 2
+    sacrificial_frames: int = 1   # dropped after each z move
+    max_frames_per_step: int = 8
+    target_rel_error: float = 0.02 # std. error of the metric, relative to its value
+
+
+@dataclass
+class AutofocusResult:
+    z: float                      # m, best focus
+    start_z: float
+    frames_per_step: int
+    runtime: float                # s
+    at_edge: bool                 # peak at the end of a sweep
+    coarse: dict = field(default_factory=dict)   # {"z": [...], "metric": [...]}
+    fine: dict = field(default_factory=dict)
+
+
+class AutofocusAcquisition(Acquisition):
+    """
+    Coarse-to-fine autofocus with the preferred z motor.
+
+    Frames come from a continuously running child FrameAcquisition. At each z
+    step the frames taken while moving are dropped, then the focus metric is
+    computed on a subsampled central ROI. The number of frames averaged per
+    step is the smallest that brings the metric's relative standard error
+    under target_rel_error, determined once at the first step. The fitted
+    peak of the fine sweep is the result; the motor is left there.
+
+    Runtime and metric curves are logged to the user log directory.
+    """
+    required_resources = [Digitizer, FastRasterScanner, SlowRasterScanner, ObjectiveZScanner]
+    optional_resources = []
+    spec_location = Path(user_config_dir("Dirigo")) / "acquisition/frame"
+    Spec: Type[FrameAcquisitionSpec] = FrameAcquisitionSpec
+    LOG_DIR = Path(user_log_dir("Dirigo-GUI", "Dirigo")) / "autofocus"
+
+    def __init__(self, hw, system_config, spec, settings: Optional[AutofocusSettings] = None):
+        super().__init__(hw, system_config, spec)
+        self.spec: FrameAcquisitionSpec
+        self.settings = settings or AutofocusSettings()
+        if self.settings.metric not in FOCUS_METRICS:
+            raise ValueError(f"Unknown focus metric: {self.settings.metric}")
+        self._metric = FOCUS_METRICS[self.settings.metric]
+        self.result: Optional[AutofocusResult] = None
+        self.log_path: Optional[Path] = None
+
+        child_spec = copy.copy(self.spec)
+        child_spec.buffers_per_acquisition = -1 # codes for infinite buffers
+        self._frame_acquisition = FrameAcquisition(hw, system_config, child_spec)
+        self._frame_acquisition.add_subscriber(self)
+        self._frames_per_step: Optional[int] = None
+
+    def _receive_product(self,
+                         block: bool = True,
+                         timeout: float | None = None) -> AcquisitionProduct:
+        return super()._receive_product(block, timeout) # type: ignore
+
+    def _score(self) -> float:
+        """Focus metric at the current z, averaged over enough frames."""
+        s = self.settings
+        values = []
+        n = self._frames_per_step or s.max_frames_per_step
+        while len(values) < n:
+            with self._receive_product() as product:
+                values.append(self._metric(_roi(product.data, s.roi_fraction, s.subsample)))
+            if self._frames_per_step is None and len(values) >= 2:
+                # Calibrating: stop once the standard error is small enough
+                mean = abs(np.mean(values))
+                sem = np.std(values, ddof=1) / np.sqrt(len(values))
+                if mean > 0 and sem / mean < s.target_rel_error:
+                    break
+        if self._frames_per_step is None:
+            self._frames_per_step = len(values)
+        return float(np.mean(values))
+
+    def _sweep(self, z_values: np.ndarray) -> np.ndarray:
+        z_motor = self.hw.preferred_z_motor
+        metric = np.full(len(z_values), np.nan)
+        for i, z in enumerate(z_values):
+            if self._stop_event.is_set():
+                break
+            with device_lock(z_motor): # shared with the GUI's poller
+                z_motor.move_to(units.Position(z))
+            time.sleep(units.Time('5 ms'))
+            while self._z_moving(z_motor):
+                with self._receive_product(): pass
+            for _ in range(self.settings.sacrificial_frames):
+                with self._receive_product(): pass
+            metric[i] = self._score()
+        return metric
+
+    @staticmethod
+    def _z_moving(z_motor) -> bool:
+        with device_lock(z_motor):
+            return bool(z_motor.moving)
+
+    def _work(self):
+        s = self.settings
+        z_motor = self.hw.preferred_z_motor
+        t0 = time.perf_counter()
+        with device_lock(z_motor):
+            start_z = float(z_motor.position)
+        try:
+            self._frame_acquisition.start()
+
+            coarse_z = start_z + np.arange(-s.coarse_range / 2, s.coarse_range / 2 + 1e-12, s.coarse_step)
+            coarse = self._sweep(coarse_z)
+            valid = np.isfinite(coarse)
+            if not valid.any():
+                return
+            coarse_peak, _ = fit_peak(coarse_z[valid], coarse[valid])
+
+            fine_z = coarse_peak + np.arange(-s.fine_range / 2, s.fine_range / 2 + 1e-12, s.fine_step)
+            fine = self._sweep(fine_z)
+            valid = np.isfinite(fine)
+            if not valid.any():
+                return
+            best_z, at_edge = fit_peak(fine_z[valid], fine[valid])
+            with device_lock(z_motor):
+                z_motor.move_to(units.Position(best_z))
+
+            self.result = AutofocusResult(
+                z               = best_z,
+                start_z         = start_z,
+                frames_per_step = self._frames_per_step or 0,
+                runtime         = time.perf_counter() - t0,
+                at_edge         = at_edge,
+                coarse          = {"z": coarse_z.tolist(), "metric": coarse.tolist()},
+                fine            = {"z": fine_z.tolist(), "metric": fine.tolist()},
+            )
+            self._write_log()
+        except EndOfStream:
+            pass
+        finally:
+            self._frame_acquisition.stop()
+            self._frame_acquisition.join()
+            if self.result is None:
+                with device_lock(z_motor):
+                    z_motor.move_to(units.Position(start_z)) # failed or aborted: go back
+            self._publish(None) # publish the sentinel
+
+    def _write_log(self) -> None:
+        self.LOG_DIR.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.LOG_DIR / f"autofocus_{datetime.now():%Y%m%d_%H%M%S}.json"
+        with open(self.log_path, "w") as file:
+            json.dump({
+                "settings": asdict(self.settings),
+                "result":   asdict(self.result), # type: ignore
+            }, file, indent=2)
+
+    @property
+    def digitizer_profile(self) -> DigitizerProfile:
+        return self.hw.digitizer.profile
+
+    @property
+    def runtime_info(self) -> LineAcquisitionRuntimeInfo:
+        return self._frame_acquisition.runtime_info
+
+    @classmethod
+    def get_specification(cls, spec_name = "default") -> FrameAcquisitionSpec:
+        return super().get_specification(spec_name) # type: ignore
@@ -0,0 +1,227 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Type
+import math
+import time
+
+from platformdirs import user_config_dir
+import numpy as np
+
+from dirigo import units
+from dirigo.hw_interfaces.digitizer import Digitizer, DigitizerProfile
+from dirigo.hw_interfaces.scanner import FastRasterScanner, SlowRasterScanner
+from dirigo.hw_interfaces.stage import MultiAxisStage
+from dirigo.sw_interfaces.acquisition import Acquisition, AcquisitionProduct
+from dirigo.plugins.acquisitions import (
+    FrameAcquisitionSpec, FrameAcquisition, LineAcquisitionRuntimeInfo
+)
+
+from dirigo_gui.hardware.device_lock import device_lock
+
+
+
+@dataclass(frozen=True)
+class MosaicTile:
+    row: int
+    col: int
+    x: float # tile center, stage coordinates (m)
+    y: float
+
+
+def serpentine_tiles(x_range: tuple[float, float],
+                     y_range: tuple[float, float],
+                     tile_width: float,
+                     tile_height: float,
+                     overlap: float) -> list[MosaicTile]:
+    """
+    Tiles covering the bounding box, in serpentine (boustrophedon) order:
+    even rows run toward +x, odd rows toward -x, so consecutive tiles are
+    always neighbours.
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError("Tile overlap must be in [0, 1)")
+    x_step = tile_width * (1 - overlap)
+    y_step = tile_height * (1 - overlap)
+    x0, x1 = sorted(x_range)
+    y0, y1 = sorted(y_range)
+    n_cols = max(1, math.ceil((x1 - x0 - tile_width) / x_step - 1e-9) + 1)
+    n_rows = max(1, math.ceil((y1 - y0 - tile_height) / y_step - 1e-9) + 1)
+
+    tiles = []
+    for row in range(n_rows):
+        cols = range(n_cols) if row % 2 == 0 else reversed(range(n_cols))
+        for col in cols:
+            tiles.append(MosaicTile(
+                row = row,
+                col = col,
+                x   = x0 + tile_width / 2 + col * x_step,
+                y   = y0 + tile_height / 2 + row * y_step,
+            ))
+    return tiles
+
+
+class MosaicAcquisitionSpec(FrameAcquisitionSpec):
+    def __init__(self,
+                 x_range: tuple[str | units.Position, str | units.Position],
+                 y_range: tuple[str | units.Position, str | units.Position],
+                 overlap: float = 0.1,
+                 saved_frames_per_step: int = 1,
+                 sacrificial_frames_per_step: int = 1,
+                 **kwargs):
+        kwargs.setdefault("frames_per_acquisition", 1)
+        super().__init__(**kwargs)
+
+        self.x_range = tuple(units.Position(v) for v in x_range)
+        self.y_range = tuple(units.Position(v) for v in y_range)
+        self.overlap = float(overlap)
+        if not 0 <= self.overlap < 1:
+            raise ValueError("Tile overlap must be in [0, 1)")
+
+        # Same names as StackAcquisitionSpec so frame averaging is set up alike
+        self._saved_frames_per_step = int(saved_frames_per_step)
+        if not (1 <= self._saved_frames_per_step < 10):
+            raise ValueError("Saved frames out of range [1,10)")
+
+        self._sacrificial_frames_per_step = int(sacrificial_frames_per_step)
+        if not (0 <= self._sacrificial_frames_per_step < 10):
+            raise ValueError("Sacrificial frames out of range [0,10)")
+
+    @property
+    def tiles(self) -> list[MosaicTile]:
+        return serpentine_tiles(
+            x_range     = (float(self.x_range[0]), float(self.x_range[1])),
+            y_range     = (float(self.y_range[0]), float(self.y_range[1])),
+            tile_width  = float(self.line_width),
+            tile_height = float(self.frame_height),
+            overlap     = self.overlap,
+        )
+
+
+class MosaicAcquisition(Acquisition):
+    """
+    Tiled acquisition over a bounding box. Frames are acquired continuously
+    by a child FrameAcquisition; frames taken while the stage is moving or
+    settling are dropped. The move to the next tile is commanded as soon as
+    the last frame of the current tile arrives, so it overlaps with
+    processing and writing of that tile.
+    """
+    required_resources = [Digitizer, FastRasterScanner, SlowRasterScanner, MultiAxisStage]
+    optional_resources = []
+    spec_location = Path(user_config_dir("Dirigo")) / "acquisition/mosaic"
+    Spec: Type[MosaicAcquisitionSpec] = MosaicAcquisitionSpec
+
+    def __init__(self, hw, system_config, spec):
+        super().__init__(hw, system_config, spec)
+        self.spec: MosaicAcquisitionSpec # to refine type hints
+
+        self.tiles = self.spec.tiles
+        self._original_position = None # read on the acquisition thread, see _work
+
+        # Set up child FrameAcquisition & subscribe to it
+        self.spec.buffers_per_acquisition = -1 # codes for infinite buffers
+        self._frame_acquisition = FrameAcquisition(hw, system_config, self.spec)
+        self._frame_acquisition.add_subscriber(self)
+
+        self.tiles_completed = 0
+        self._t_start: float | None = None
+        self._t_end: float | None = None
+        self._frame_times: list[float] = [] # arrival time of every child frame
+
+    def _receive_product(self,
+                         block: bool = True,
+                         timeout: float | None = None) -> AcquisitionProduct:
+        product = super()._receive_product(block, timeout)
+        self._frame_times.append(time.perf_counter())
+        return product # type: ignore
+
+    def _move_to_tile(self, tile: MosaicTile) -> None:
+        with device_lock(self.hw.stages): # shared with the GUI's stage poller
+            self.hw.stages.x.move_to(units.Position(tile.x))
+            self.hw.stages.y.move_to(units.Position(tile.y))
+
+    def _stage_moving(self) -> bool:
+        with device_lock(self.hw.stages):
+            return self.hw.stages.x.moving or self.hw.stages.y.moving
+
+    def _settle(self) -> None:
+        """Drop frames until the stage has stopped, then the sacrificial frames."""
+        while self._stage_moving():
+            if self._stop_event.is_set():
+                return
+            with self._receive_product(): pass
+        for _ in range(self.spec._sacrificial_frames_per_step):
+            with self._receive_product(): pass
+
+    def _work(self):
+        self._t_start = time.perf_counter()
+        with device_lock(self.hw.stages):
+            self._original_position = (self.hw.stages.x.position, self.hw.stages.y.position)
+        self._move_to_tile(self.tiles[0])
+        time.sleep(units.Time('10 ms'))
+        while self._stage_moving():
+            time.sleep(units.Time('10 ms'))
+
+        try:
+            self._frame_acquisition.start()
+            for _ in range(self.spec._sacrificial_frames_per_step):
+                with self._receive_product(): pass
+
+            for i in range(len(self.tiles)):
+                if self._stop_event.is_set():
+                    break
+                for n in range(self.spec._saved_frames_per_step):
+                    with self._receive_product() as product:
+                        last_frame_of_tile = (n == self.spec._saved_frames_per_step - 1)
+                        if last_frame_of_tile and i + 1 < len(self.tiles):
+                            # Start moving now, while this tile is processed & written
+                            self._move_to_tile(self.tiles[i + 1])
+                        self._publish(product)
+                self.tiles_completed += 1
+
+                if i + 1 < len(self.tiles):
+                    self._settle()
+        finally:
+            self._t_end = time.perf_counter()
+            self._frame_acquisition.stop()
+            self._publish(None) # publish the sentinel
+            with device_lock(self.hw.stages):
+                self.hw.stages.x.move_to(self._original_position[0])
+                self.hw.stages.y.move_to(self._original_position[1])
+
+    @property
+    def frame_period(self) -> float | None:
+        """Median interval between frames of the child acquisition (s)."""
+        if len(self._frame_times) < 2:
+            return None
+        return float(np.median(np.diff(self._frame_times)))
+
+    @property
+    def statistics(self) -> dict:
+        """Total time and the fraction of it not spent acquiring saved frames."""
+        if self._t_start is None:
+            return {"tiles": len(self.tiles), "tiles_completed": 0}
+        total = (self._t_end or time.perf_counter()) - self._t_start
+        period = self.frame_period
+        if period is None or total <= 0:
+            dead_fraction = None
+        else:
+            imaging = self.tiles_completed * self.spec._saved_frames_per_step * period
+            dead_fraction = max(0.0, 1 - imaging / total)
+        return {
+            "tiles":                len(self.tiles),
+            "tiles_completed":      self.tiles_completed,
+            "total_time_s":         total,
+            "dead_time_fraction":   dead_fraction,
+        }
+
+    @property
+    def digitizer_profile(self) -> DigitizerProfile:
+        return self.hw.digitizer.profile
+
+    @property
+    def runtime_info(self) -> LineAcquisitionRuntimeInfo:
+        return self._frame_acquisition.runtime_info
+
+    @classmethod
+    def get_specification(cls, spec_name = "default") -> MosaicAcquisitionSpec:
+        return super().get_specification(spec_name) # type: ignore
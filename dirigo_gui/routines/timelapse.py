@@ -0,0 +1,381 @@
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Sequence, Type
+import copy
+import threading
+import time
+
+from platformdirs import user_config_dir
+import numpy as np
+
+from dirigo import units
+from dirigo.hw_interfaces.digitizer import Digitizer, DigitizerProfile
+from dirigo.hw_interfaces.scanner import FastRasterScanner, SlowRasterScanner
+from dirigo.hw_interfaces.stage import MultiAxisStage
+from dirigo.sw_interfaces.acquisition import Acquisition
+from dirigo.sw_interfaces.worker import EndOfStream
+from dirigo.plugins.acquisitions import (
+    FrameAcquisitionSpec, FrameAcquisition, StackAcquisitionSpec, StackAcquisition,
+    LineAcquisitionRuntimeInfo
+)
+from dirigo_gui.hardware.device_lock import device_lock
+from dirigo_gui.routines.autofocus import AutofocusAcquisition
+from dirigo_gui.routines.zstack import RepeatedStackAcquisition, ContinuousStackAcquisition
+
+
+
+@dataclass
+class StagePosition:
+    name: str
+    x: float # m
+    y: float # m
+    z: Optional[float] = None # m, None to leave the z motor where it is
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "StagePosition":
+        return cls(**d)
+
+
+# ---------- Route planning ----------
+def _distances(points: np.ndarray) -> np.ndarray:
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+
+
+def route_length(points: Sequence[tuple[float, float]],
+                 order: Sequence[int],
+                 start: Optional[tuple[float, float]] = None) -> float:
+    """Travel distance (m) visiting `points` in `order`, optionally from `start`."""
+    xy = np.asarray(points, dtype=np.float64)[list(order)]
+    if start is not None:
+        xy = np.vstack([np.asarray(start, dtype=np.float64), xy])
+    return float(np.linalg.norm(np.diff(xy, axis=0), axis=1).sum())
+
+
+def plan_route(points: Sequence[tuple[float, float]],
+               start: Optional[tuple[float, float]] = None,
+               max_passes: int = 20) -> list[int]:
+    """
+    Order in which to visit `points` (open path) to keep total travel short:
+    nearest-neighbour construction from `start` (or the first point), then
+    2-opt segment reversals until no reversal shortens the path.
+    """
+    n = len(points)
+    if n < 3:
+        if n == 2 and start is not None:
+            d = _distances(np.asarray([start, *points], dtype=np.float64))
+            return [0, 1] if d[0, 1] <= d[0, 2] else [1, 0]
+        return list(range(n))
+
+    xy = np.asarray(points, dtype=np.float64)
+    if start is not None:
+        xy = np.vstack([np.asarray(start, dtype=np.float64), xy])
+    dist = _distances(xy)
+
+    # Nearest neighbour (node 0 is the start, or the first point)
+    route = [0]
+    unvisited = np.ones(len(xy), dtype=bool)
+    unvisited[0] = False
+    for _ in range(len(xy) - 1):
+        d = np.where(unvisited, dist[route[-1]], np.inf)
+        nxt = int(np.argmin(d))
+        route.append(nxt)
+        unvisited[nxt] = False
+
+    # 2-opt on the open path, keeping node 0 fixed
+    route = np.array(route)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, len(route) - 1):
+            a, b = route[i - 1], route[i]
+            c = route[i + 1:]                  # candidate segment ends
+            d_next = np.append(route[i + 2:], -1) # node after each end (-1: path end)
+            before = dist[a, b] + np.where(d_next >= 0, dist[c, np.maximum(d_next, 0)], 0)
+            after = dist[a, c] + np.where(d_next >= 0, dist[b, np.maximum(d_next, 0)], 0)
+            gain = before - after
+            k = int(np.argmax(gain))
+            if gain[k] > 1e-12:
+                j = i + 1 + k
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+
+    if start is not None:
+        return [int(r) - 1 for r in route[1:]]
+    return [int(r) for r in route]
+
+
+# ---------- Scheduler ----------
+@dataclass
+class TimelapsePlan:
+    positions: list[StagePosition]
+    interval: float             # s between visits to the same position
+    rounds: int                 # number of visits per position, -1 for no limit
+    child: str = "raster_frame" # 'raster_frame' (SERIES), or a STACK acquisition (see STACK_ACQUISITIONS)
+    late_tolerance: float = 0.1 # fraction of `interval` before a visit counts as late
+    autofocus: bool = False     # refocus at each visit; the found z is kept for the next round
+    stack_range: Optional[tuple[float, float]] = None # m, stack limits relative to each position's z;
+                                                      # None to use the (absolute) limits of the stack spec
+    start: Optional[StagePosition] = None # cached stage position at the start, to plan the first round
+
+
+@dataclass
+class Visit:
+    round: int
+    position: int       # index into TimelapsePlan.positions
+    started: float      # s since the time-lapse started
+    frames: int = 0     # frames published for this visit
+    first_frame: int = 0
+    late_by: float = 0.0 # s past the cadence for this position
+    direction: int = +1  # stacks: +1 first volume lower to upper, -1 upper to lower
+
+
+class TimelapseAcquisition(Acquisition):
+    """
+    Runs a SERIES (FrameAcquisition) or STACK (StackAcquisition) at each
+    position of a TimelapsePlan, once per interval.
+
+    Each round visits the positions in an order planned to minimise stage
+    travel. The frames of every visit are published into one stream, so the
+    downstream processors, display and writer are set up once for the whole
+    time-lapse; `visits` records which frames belong to which position. Only
+    the child acquisition is created per visit (on the acquisition thread),
+    as acquisition threads cannot be restarted. The first child is made up
+    front for its runtime info, which downstream workers read; the plan's
+    cached `start` position is used so this needs no device I/O.
+
+    For stacks, the plan's `stack_range` gives the limits relative to each
+    position's z (or the z at the visit, for positions without one); without
+    it, every position uses the absolute limits of the stack spec. With
+    alternating stack direction, each stack starts from the end nearer the
+    current z and the z motor is left where the stack ended, so there is no
+    return move; the visit log records each visit's direction.
+    """
+    required_resources = [Digitizer, FastRasterScanner, SlowRasterScanner, MultiAxisStage]
+    optional_resources = []
+    spec_location = Path(user_config_dir("Dirigo")) / "acquisition/frame"
+    Spec: Type[FrameAcquisitionSpec] = FrameAcquisitionSpec
+    STACK_ACQUISITIONS: dict[str, Type[StackAcquisition]] = {
+        "raster_stack":     StackAcquisition,
+        "repeated_stack":   RepeatedStackAcquisition,
+        "continuous_stack": ContinuousStackAcquisition,
+    }
+    AUTOFOCUS_STOP_TIMEOUT = 2.0 # s to wait for a focus sweep to wind down on stop
+
+    def __init__(self, hw, system_config, spec, plan: TimelapsePlan):
+        super().__init__(hw, system_config, spec)
+        self.spec: FrameAcquisitionSpec | StackAcquisitionSpec
+        if not plan.positions:
+            raise ValueError("Time-lapse needs at least one position.")
+        if plan.child != "raster_frame" and plan.child not in self.STACK_ACQUISITIONS:
+            raise ValueError(f"Unsupported time-lapse acquisition: {plan.child}")
+        if plan.stack_range is not None and plan.stack_range[0] >= plan.stack_range[1]:
+            raise ValueError("Time-lapse stack range must go from a lower to a higher z.")
+        self.plan = plan
+
+        self.visits: list[Visit] = []
+        self.behind_schedule: list[Visit] = [] # visits that started late
+        self.round = 0
+        self._lock = threading.Lock()
+        self._last_visit: dict[int, float] = {}
+        self._frames_published = 0
+        self._t0: float | None = None
+        self._autofocus_acquisition: Optional[AutofocusAcquisition] = None # while focusing
+
+        start = (plan.start.x, plan.start.y) if plan.start is not None else None
+        self._order = plan_route([(p.x, p.y) for p in plan.positions], start)
+
+        # The first child is needed now: downstream workers read its runtime info.
+        # It is reused for the first visit if it was made for the same stack centre.
+        first = plan.positions[self._order[0]]
+        self._child_z = first.z if first.z is not None or plan.start is None else plan.start.z
+        self._child: Optional[Acquisition] = self._make_child(self._child_z)
+        self._runtime_info: LineAcquisitionRuntimeInfo = self._child.runtime_info # type: ignore
+        self._running_child: Optional[Acquisition] = None
+
+    def _stack_center(self, position: StagePosition) -> Optional[float]:
+        """Z that the stack_range is relative to for a visit, None if not relative."""
+        if self.plan.child == "raster_frame" or self.plan.stack_range is None:
+            return None
+        if position.z is not None:
+            return position.z
+        z_motor = self.hw.preferred_z_motor
+        with device_lock(z_motor):
+            return float(z_motor.position)
+
+    def _make_child(self, z: Optional[float]) -> Acquisition:
+        """Child acquisition; for stacks with a stack_range, `z` is the stack centre."""
+        spec = copy.copy(self.spec) # children may modify their spec
+        if isinstance(spec, StackAcquisitionSpec):
+            if self.plan.stack_range is not None and z is not None:
+                lower, upper = self.plan.stack_range
+                spec.lower_limit = units.Position(z + lower)
+                spec.upper_limit = units.Position(z + upper)
+            child = self.STACK_ACQUISITIONS[self.plan.child](self.hw, self.system_config, spec)
+        else:
+            spec.buffers_per_acquisition = spec.frames_per_acquisition
+            child = FrameAcquisition(self.hw, self.system_config, spec)
+        child.add_subscriber(self)
+        return child
+
+    def _move_to(self, position: StagePosition) -> None:
+        stages = self.hw.stages
+        with device_lock(stages): # shared with the GUI's stage poller
+            stages.x.move_to(units.Position(position.x))
+            stages.y.move_to(units.Position(position.y))
+        z_motor = None
+        if position.z is not None and self.plan.child == "raster_frame":
+            z_motor = self.hw.preferred_z_motor
+            with device_lock(z_motor):
+                z_motor.move_to(units.Position(position.z))
+        time.sleep(units.Time('10 ms'))
+        while self._moving(z_motor):
+            if self._stop_event.is_set():
+                return
+            time.sleep(units.Time('10 ms'))
+
+    def _moving(self, z_motor) -> bool:
+        with device_lock(self.hw.stages):
+            if self.hw.stages.x.moving or self.hw.stages.y.moving:
+                return True
+        if z_motor is None:
+            return False
+        with device_lock(z_motor):
+            return bool(z_motor.moving)
+
+    def _autofocus(self, position: StagePosition) -> None:
+        if position.z is not None:
+            z_motor = self.hw.preferred_z_motor
+            with device_lock(z_motor):
+                z_motor.move_to(units.Position(position.z))
+        autofocus = AutofocusAcquisition(self.hw, self.system_config, self.spec)
+        self._autofocus_acquisition = autofocus
+        if self._stop_event.is_set(): # stopped while it was being made
+            return
+        autofocus.start()
+        autofocus.join()
+        self._autofocus_acquisition = None
+        if autofocus.result is not None:
+            position.z = autofocus.result.z
+
+    def _visit(self, round: int, index: int) -> None:
+        position = self.plan.positions[index]
+        self._move_to(position)
+        if self.plan.autofocus and not self._stop_event.is_set():
+            self._autofocus(position)
+            self._child = None # a stack child must be made for the new z
+        if self._stop_event.is_set(): # stopped while moving or focusing
+            return
+        z = self._stack_center(position)
+        child = self._child
+        if child is None or z != self._child_z:
+            child = self._make_child(z)
+        self._child = None
+
+        now = time.perf_counter() - self._t0 # type: ignore
+        last = self._last_visit.get(index)
+        late_by = 0.0 if last is None else max(0.0, now - last - self.plan.interval)
+        self._last_visit[index] = now
+        visit = Visit(round, index, now, first_frame=self._frames_published, late_by=late_by)
+        if isinstance(child, RepeatedStackAcquisition) and getattr(child.spec, 'alternate_direction', False):
+            # Start from the nearer end and stay there for the next visit
+            z_motor = self.hw.preferred_z_motor
+            with device_lock(z_motor):
+                z_now = float(z_motor.position)
+            lower, upper = float(child._depths[0]), float(child._depths[-1])
+            child.first_direction = +1 if abs(z_now - lower) <= abs(z_now - upper) else -1
+            child.return_to_start = False
+            visit.direction = child.first_direction
+        with self._lock:
+            self.visits.append(visit)
+            if late_by > self.plan.late_tolerance * self.plan.interval:
+                self.behind_schedule.append(visit)
+
+        with self._lock: # so stop() either sees the running child or this sees the stop
+            if self._stop_event.is_set():
+                return
+            self._running_child = child
+            child.start()
+        try:
+            while True:
+                with self._receive_product() as product:
+                    self._publish(product)
+                    visit.frames += 1
+                    self._frames_published += 1
+        except EndOfStream:
+            pass
+        finally:
+            if child.is_alive():
+                child.stop()
+                child.join()
+            self._running_child = None
+
+    def _work(self):
+        self._t0 = time.perf_counter()
+        try:
+            while self.plan.rounds < 0 or self.round < self.plan.rounds:
+                # Wait for this round's scheduled start (starts at once if overdue)
+                wait = self._t0 + self.round * self.plan.interval - time.perf_counter()
+                if wait > 0 and self._stop_event.wait(wait):
+                    break
+                if self.round > 0: # re-plan from wherever the stage is now
+                    with device_lock(self.hw.stages):
+                        start = (float(self.hw.stages.x.position), float(self.hw.stages.y.position))
+                    self._order = plan_route([(p.x, p.y) for p in self.plan.positions], start)
+                for index in self._order:
+                    if self._stop_event.is_set():
+                        return
+                    self._visit(self.round, index)
+                self.round += 1
+        finally:
+            self._publish(None) # publish the sentinel
+
+    def stop(self, blocking: bool = False, propagate: bool = True):
+        self._stop_event.set() # before looking for the child, see _visit
+        with self._lock:
+            child = self._running_child
+        if child is not None and child.is_alive():
+            child.stop()
+        autofocus = self._autofocus_acquisition
+        if autofocus is not None and autofocus.is_alive():
+            autofocus.stop()
+            autofocus.join(timeout=self.AUTOFOCUS_STOP_TIMEOUT)
+        super().stop(blocking, propagate)
+
+    @property
+    def statistics(self) -> dict:
+        with self._lock:
+            late = [v.late_by for v in self.behind_schedule]
+            return {
+                "rounds_completed": self.round,
+                "visits":           len(self.visits),
+                "late_visits":      len(late),
+                "max_late_s":       max(late) if late else 0.0,
+            }
+
+    def visit_log(self, frames_per_saved_frame: int = 1) -> list[dict]:
+        """Visits as dicts, with frame numbers as seen downstream of averaging."""
+        with self._lock:
+            return [{
+                "round":        v.round,
+                "position":     self.plan.positions[v.position].name,
+                "x":            self.plan.positions[v.position].x,
+                "y":            self.plan.positions[v.position].y,
+                "z":            self.plan.positions[v.position].z,
+                "started_s":    v.started,
+                "late_by_s":    v.late_by,
+                "first_frame":  v.first_frame // frames_per_saved_frame,
+                "frames":       v.frames // frames_per_saved_frame,
+                "direction":    v.direction,
+            } for v in self.visits]
+
+    @property
+    def digitizer_profile(self) -> DigitizerProfile:
+        return self.hw.digitizer.profile
+
+    @property
+    def runtime_info(self) -> LineAcquisitionRuntimeInfo:
+        return self._runtime_info
@@ -0,0 +1,281 @@
+from typing import Optional
+import time
+
+from dirigo import units
+from dirigo.sw_interfaces.acquisition import AcquisitionProduct
+from dirigo.plugins.acquisitions import StackAcquisitionSpec, StackAcquisition
+
+from dirigo_gui.hardware.device_lock import device_lock
+
+
+
+class RepeatedStackAcquisitionSpec(StackAcquisitionSpec):
+    """
+    Stack specification for one or more volumes. With alternate_direction,
+    every other volume is acquired from upper to lower, so no volume starts
+    with a return move to the lower limit.
+    """
+    def __init__(self,
+                 volumes: int = 1,
+                 alternate_direction: bool = False,
+                 **kwargs):
+        super().__init__(**kwargs)
+
+        self.volumes = int(volumes)
+        if self.volumes < 1:
+            raise ValueError("Number of volumes must be at least 1.")
+        self.alternate_direction = bool(alternate_direction)
+
+
+def volume_direction(volume: int, alternate: bool, first_direction: int = +1) -> int:
+    """Z direction of a volume: +1 lower to upper, -1 upper to lower."""
+    return -first_direction if alternate and volume % 2 else first_direction
+
+
+def sweep_velocity(spec: StackAcquisitionSpec, frame_period: float) -> float:
+    """Z velocity (m/s) that advances one depth spacing per saved-frame group."""
+    return float(spec.depth_spacing) / (max(spec._saved_frames_per_step, 1) * frame_period)
+
+
+def max_depth_spacing(spec: StackAcquisitionSpec, frame_period: float, max_velocity: float) -> float:
+    """Largest depth spacing (m) a sweep at max_velocity covers per saved-frame group."""
+    return max_velocity * max(spec._saved_frames_per_step, 1) * frame_period
+
+
+def stack_times(spec: StackAcquisitionSpec,
+                frame_period: float,
+                acceleration: Optional[float] = None) -> tuple[float, float]:
+    """
+    Estimated duration (s) of the stack(s) acquired step-and-settle vs. as a
+    continuous sweep.
+
+    Stepping spends the sacrificial frames of every depth (and of the start)
+    waiting for the motor. Sweeping spends only the saved frames, plus the
+    ramp up to sweep velocity if the motor acceleration is known. Return
+    moves between volumes are not included.
+    """
+    volumes = getattr(spec, 'volumes', 1)
+    depths = spec.depths_per_acquisition
+    saved = spec._saved_frames_per_step
+    sacrificial = spec._sacrificial_frames_per_step
+    step = volumes * frame_period * (depths * saved + depths * sacrificial)
+    sweep = volumes * frame_period * depths * max(saved, 1)
+    if acceleration:
+        sweep += volumes * sweep_velocity(spec, frame_period) / acceleration
+    return step, sweep
+
+
+class RepeatedStackAcquisition(StackAcquisition):
+    """
+    Step-and-settle z stack repeated for `spec.volumes` volumes.
+
+    The child FrameAcquisition runs for all volumes. With
+    `spec.alternate_direction` odd volumes run from upper to lower, so each
+    volume starts where the previous one ended; otherwise the motor returns
+    to the first depth between volumes.
+
+    first_direction sets the direction of the first volume, and
+    return_to_start whether the motor goes back to its original position at
+    the end (a time-lapse leaves it in place for the next visit).
+    """
+    Spec = RepeatedStackAcquisitionSpec
+
+    def __init__(self, hw, system_config, spec: StackAcquisitionSpec):
+        super().__init__(hw, system_config, spec)
+        self.first_direction = +1
+        self.return_to_start = True
+        self.volumes_completed = 0
+
+    @property
+    def volumes(self) -> int:
+        return getattr(self.spec, 'volumes', 1)
+
+    def direction(self, volume: int) -> int:
+        return volume_direction(
+            volume, getattr(self.spec, 'alternate_direction', False), self.first_direction
+        )
+
+    def _z_moving(self) -> bool:
+        """Whether the z motor is moving, under the lock shared with the GUI's poller."""
+        z_scanner = self.hw.preferred_z_motor
+        with device_lock(z_scanner):
+            return bool(z_scanner.moving)
+
+    def _discard_while_moving(self) -> None:
+        """Drop frames until the z motor has stopped."""
+        while True:
+            with self._receive_product(): pass
+            if not self._z_moving():
+                return
+
+    def _work(self):
+        z_scanner = self.hw.preferred_z_motor
+        with device_lock(z_scanner): # shared with the GUI's poller
+            z_scanner.move_to(self._depths[::self.direction(0)][0])
+
+        # spin until reach start position
+        time.sleep(units.Time('10 ms'))
+        while self._z_moving():
+            time.sleep(units.Time('10 ms'))
+
+        try:
+            self._frame_acquisition.start()
+
+            # Get sacrificial frames (don't pass them along)
+            for _ in range(self.spec._sacrificial_frames_per_step):
+                with self._receive_product(): pass
+
+            for volume in range(self.volumes):
+                depths = self._depths[::self.direction(volume)]
+                for i in range(len(depths)):
+                    for _ in range(self.spec._saved_frames_per_step):
+                        with self._receive_product() as product:
+                            self._publish(product)
+
+                    if i < len(depths) - 1:
+                        with device_lock(z_scanner):
+                            z_scanner.move_to(depths[i + 1])
+                    elif volume < self.volumes - 1:
+                        next_start = self._depths[::self.direction(volume + 1)][0]
+                        if next_start == depths[i]:
+                            continue # alternating: next volume starts here
+                        with device_lock(z_scanner):
+                            z_scanner.move_to(next_start) # return move
+                        self._discard_while_moving()
+                    else:
+                        continue
+
+                    # Wait for sacrificial frames
+                    for _ in range(self.spec._sacrificial_frames_per_step):
+                        with self._receive_product(): pass
+                self.volumes_completed += 1
+
+        finally:
+            self._frame_acquisition.stop()
+            self._publish(None) # publish the sentinel
+            if self.return_to_start:
+                with device_lock(z_scanner):
+                    z_scanner.move_to(self._original_z_position)
+
+
+class ContinuousStackAcquisition(RepeatedStackAcquisition):
+    """
+    Z stack acquired while the z motor moves at constant velocity.
+
+    Instead of stepping to each depth and discarding sacrificial frames while
+    the motor settles, the motor sweeps through the stack at the velocity
+    that covers one depth spacing per group of saved frames, starting far
+    enough outside the stack to be at speed when it enters. Frames are kept
+    once the motor has crossed the edge of the first depth slab, and each
+    published frame's z position is replaced by the z at the middle of its
+    exposure, so averaging the saved frames of a group gives the image
+    centred on the nominal depth.
+
+    Frames are sheared axially by the motion (one spacing per group of saved
+    frames); this mode trades that for removing the settle time.
+    """
+
+    def __init__(self, hw, system_config, spec: StackAcquisitionSpec):
+        super().__init__(hw, system_config, spec)
+
+        # Set by the child FrameAcquisition: one slow-axis period per frame
+        self.frame_period = float(1 / self.hw.slow_raster_scanner.frequency)
+        self.velocity = sweep_velocity(self.spec, self.frame_period)
+
+        z_scanner = self.hw.preferred_z_motor
+        with device_lock(z_scanner):
+            max_velocity = float(z_scanner.max_velocity)
+            try:
+                acceleration = float(z_scanner.acceleration)
+            except (AttributeError, NotImplementedError):
+                acceleration = 0.0
+        if self.velocity > max_velocity:
+            spacing = max_depth_spacing(self.spec, self.frame_period, max_velocity)
+            raise ValueError(
+                f"Continuous sweep needs {units.Velocity(self.velocity)}, above the z motor's "
+                f"maximum of {units.Velocity(max_velocity)}. Use a depth spacing of at most "
+                f"{units.Position(spacing).with_unit('μm')}, more saved frames per step, or Step mode."
+            )
+        # Distance covered while ramping up to velocity
+        self._ramp = self.velocity**2 / (2 * acceleration) if acceleration > 0 else 0.0
+
+    def _sweep_limits(self, direction: int) -> tuple[float, float]:
+        """(start, entry): where the motor starts and where the first slab begins."""
+        half_spacing = float(self.spec.depth_spacing) / 2
+        approach = self._ramp + self.velocity * self.frame_period
+        if direction > 0:
+            entry = float(self._depths[0]) - half_spacing
+        else:
+            entry = float(self._depths[-1]) + half_spacing
+        return entry - direction * approach, entry
+
+    def _frame_z(self, product: AcquisitionProduct, velocity: float, t_received: float) -> float:
+        """Z at the middle of a frame's exposure."""
+        positions = product.positions
+        if positions is not None and len(positions) in (1, 3):
+            z_end = float(positions[-1]) # read once the frame's buffer completed
+        else:
+            z_end = self._z_start + velocity * (t_received - self._t_start)
+        return z_end - velocity * self.frame_period / 2
+
+    @staticmethod
+    def _tag(product: AcquisitionProduct, z: float) -> None:
+        positions = product.positions
+        if positions is not None and len(positions) in (1, 3):
+            product.positions = (*positions[:-1], units.Position(z))
+        else:
+            product.positions = (units.Position(z),)
+
+    def _sweep(self, direction: int, n_frames: int) -> None:
+        z_scanner = self.hw.preferred_z_motor
+        _, entry = self._sweep_limits(direction)
+        velocity = direction * self.velocity
+        half_exposure = velocity * self.frame_period / 2
+
+        self._t_start = time.perf_counter()
+        with device_lock(z_scanner):
+            z_scanner.move_velocity(units.Velocity(velocity))
+
+        published = 0
+        while published < n_frames:
+            with self._receive_product() as product:
+                z = self._frame_z(product, velocity, time.perf_counter())
+                if published == 0 and direction * (z - half_exposure - entry) < -0.01 * abs(half_exposure):
+                    continue # exposure began before the first slab (or while ramping)
+                self._tag(product, z)
+                self._publish(product)
+                published += 1
+        with device_lock(z_scanner):
+            z_scanner.stop()
+
+    def _work(self):
+        z_scanner = self.hw.preferred_z_motor
+        n_frames = self.spec.depths_per_acquisition * max(self.spec._saved_frames_per_step, 1)
+
+        self._z_start, _ = self._sweep_limits(self.direction(0))
+        with device_lock(z_scanner):
+            z_scanner.move_to(units.Position(self._z_start))
+        time.sleep(units.Time('10 ms'))
+        while self._z_moving():
+            time.sleep(units.Time('10 ms'))
+
+        try:
+            self._frame_acquisition.start()
+            for volume in range(self.volumes):
+                if volume > 0:
+                    # Alternating: the motor overran to about the next start while stopping
+                    self._z_start, _ = self._sweep_limits(self.direction(volume))
+                    with device_lock(z_scanner):
+                        z_scanner.move_to(units.Position(self._z_start))
+                    self._discard_while_moving()
+                self._sweep(self.direction(volume), n_frames)
+                self.volumes_completed += 1
+
+        finally:
+            with device_lock(z_scanner):
+                z_scanner.stop()
+            self._frame_acquisition.stop()
+            self._publish(None) # publish the sentinel
+            if self.return_to_start:
+                with device_lock(z_scanner):
+                    z_scanner.move_to(self._original_z_position)
@@ -0,0 +1,225 @@
+"""
+Synthetic frame acquisition for the simulated rig.
+
+SimulatedFrameAcquisition publishes frames shaped like RasterFrameProcessor
+output, (lines, pixels, channels) int16, at the frame rate the scanners and
+frame spec would give. The image is a window onto a periodic, blob-like
+sample that moves with the simulated stage, is scaled by detector gain and
+laser power, and has noise added, so jogging the stage and changing gain or
+power is visible in the viewer. SimulatedFrameProcessor stands in for the
+raster frame processor (resampling), copying each frame into its own pool.
+"""
+from dataclasses import dataclass, asdict
+from typing import Optional
+import time
+
+import numpy as np
+
+from dirigo import units
+from dirigo.components.hardware import NotConfiguredError
+from dirigo.hw_interfaces.digitizer import Digitizer
+from dirigo.hw_interfaces.scanner import FastRasterScanner, SlowRasterScanner
+from dirigo.sw_interfaces.acquisition import Acquisition, AcquisitionProduct
+from dirigo.sw_interfaces.processor import Processor
+from dirigo.sw_interfaces.worker import EndOfStream
+from dirigo.plugins.acquisitions import FrameAcquisition, FrameAcquisitionSpec
+
+from dirigo_gui.simulation.hardware import SimulationConfig
+
+
+
+@dataclass
+class SimulatedRuntimeInfo:
+    digitizer_bit_depth: int
+    n_channels: int
+    frame_rate: float # fps
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def periodic_sample(shape: tuple[int, int],
+                    nchannels: int,
+                    rng: np.random.Generator,
+                    feature_size: float = 12.0) -> np.ndarray:
+    """
+    Band-limited random texture, (Y, X, C) float32 in [0, 1]. Being built in
+    the Fourier domain it tiles seamlessly, so any window of a 2x2 tiling is
+    a valid view.
+    """
+    ny, nx = shape
+    fy = np.fft.fftfreq(ny)[:, None]
+    fx = np.fft.rfftfreq(nx)[None, :]
+    f = np.sqrt(fx**2 + fy**2) * feature_size
+    band = np.exp(-(f - 1)**2 / 0.1) # emphasize features about feature_size pixels across
+    sample = np.empty((ny, nx, nchannels), np.float32)
+    for c in range(nchannels):
+        spectrum = np.fft.rfft2(rng.standard_normal(shape)) * band
+        texture = np.fft.irfft2(spectrum, s=shape)
+        texture = np.clip(texture / (3 * texture.std()), 0, None) # sparse, bright features
+        sample[:, :, c] = np.minimum(texture, 1)
+    return sample
+
+
+class SimulatedFrameAcquisition(Acquisition):
+    required_resources = [Digitizer, FastRasterScanner, SlowRasterScanner]
+    optional_resources = []
+    spec_location = FrameAcquisition.spec_location
+    Spec = FrameAcquisitionSpec
+
+    BUFFERS = 8
+    DEFAULT_SPEC = { # used when there is no saved frame spec, e.g. on a CI machine
+        "bidirectional_scanning":   True,
+        "line_width":               "400 μm",
+        "frame_height":             "400 μm",
+        "pixel_size":               "1 μm",
+        "line_duty_cycle":          0.8,
+        "frames_per_acquisition":   100,
+    }
+    SIGNAL_MAX = 0.6        # full-scale fraction at full gain and full laser power
+    BRIGHTNESS_INTERVAL = 0.25 # s between re-reading detector gains and laser power
+
+    def __init__(self, hw, system_config, spec: FrameAcquisitionSpec, config: SimulationConfig):
+        super().__init__(hw, system_config, spec, thread_name="acquisition")
+        self.spec: FrameAcquisitionSpec
+        self.config = config
+        self._rng = np.random.default_rng(config.seed)
+
+        self._channels = [c.index for c in self.hw.digitizer.channels if c.enabled]
+        self._shape = (self.spec.lines_per_frame, self.spec.pixels_per_line, len(self._channels))
+        self._init_product_pool(self.BUFFERS, self._shape, np.int16)
+
+        self.frames_acquired = 0
+        self.frames_dropped = 0 # no free buffer when the frame was due: downstream fell behind
+
+    @property
+    def frame_rate(self) -> float:
+        if self.config.frame_rate is not None:
+            return self.config.frame_rate
+        line_period = 1 / float(self.hw.fast_raster_scanner.frequency)
+        flyback_lines = round(float(self.hw.slow_raster_scanner.flyback_time) / line_period)
+        lines = self.spec.lines_per_frame
+        if self.spec.bidirectional_scanning:
+            lines //= 2
+        return 1 / ((lines + flyback_lines) * line_period)
+
+    @property
+    def digitizer_profile(self):
+        return self.hw.digitizer.profile
+
+    @property
+    def runtime_info(self) -> SimulatedRuntimeInfo:
+        return SimulatedRuntimeInfo(
+            digitizer_bit_depth = self.hw.digitizer.bit_depth,
+            n_channels          = len(self._channels),
+            frame_rate          = self.frame_rate,
+        )
+
+    def _stage_axes(self) -> list:
+        try:
+            axes = [self.hw.stages.x, self.hw.stages.y]
+        except NotConfiguredError:
+            return []
+        try:
+            axes.append(self.hw.stages.z)
+        except NotImplementedError:
+            pass
+        return axes
+
+    def _brightness(self) -> np.ndarray:
+        """Signal scale per channel, from detector gain and laser power."""
+        scale = np.full(len(self._channels), self.SIGNAL_MAX)
+        try:
+            scale *= self.hw.beam_attenuator.true_fraction()
+        except NotConfiguredError:
+            pass
+        try:
+            detectors = self.hw.detectors
+            scale *= [detectors[i].true_signal() for i in self._channels]
+        except NotConfiguredError:
+            pass
+        return scale
+
+    def _work(self):
+        ny, nx, nc = self._shape
+        full_scale = 2**(self.hw.digitizer.bit_depth - 1) - 1
+        texture = np.tile(periodic_sample((ny, nx), nc, self._rng), (2, 2, 1))
+        noise = self._rng.normal(0, self.config.noise, (2 * ny, 2 * nx, nc)).astype(np.int16)
+        axes = self._stage_axes()
+
+        scaled = np.empty(texture.shape, np.int16)
+        brightness: Optional[np.ndarray] = None
+        brightness_read = -np.inf
+        n_frames = self.spec.buffers_per_acquisition # -1 codes for infinite
+        period = 1 / self.frame_rate
+        t0 = time.perf_counter()
+        due = t0
+        try:
+            while not self._stop_event.is_set():
+                if n_frames != -1 and self.frames_acquired >= n_frames:
+                    break
+                due += period
+                if self._stop_event.wait(max(due - time.perf_counter(), 0)):
+                    break
+                if self._product_pool.empty():
+                    self.frames_dropped += 1 # like a digitizer overrun, the frame is lost
+                    continue
+
+                now = time.perf_counter()
+                if now - brightness_read > self.BRIGHTNESS_INTERVAL:
+                    brightness_read = now
+                    new_brightness = self._brightness()
+                    if brightness is None or not np.array_equal(brightness, new_brightness):
+                        brightness = new_brightness
+                        np.multiply(texture, brightness * full_scale, out=scaled, casting="unsafe")
+
+                positions = [axis.true_position() for axis in axes]
+                ox = round(positions[0] / float(self.spec.pixel_size)) % nx if positions else 0
+                oy = round(positions[1] / float(self.spec.pixel_height)) % ny if positions else 0
+                jx, jy = self._rng.integers(nx), self._rng.integers(ny)
+
+                product: AcquisitionProduct = self._get_free_product()
+                np.add(scaled[oy:oy + ny, ox:ox + nx], noise[jy:jy + ny, jx:jx + nx],
+                       out=product.data)
+                product.timestamps = np.array([now - t0])
+                product.positions = np.array([positions]) if positions else None
+                self._publish(product)
+                self.frames_acquired += 1
+        finally:
+            self._publish(None) # publish the sentinel
+
+    @classmethod
+    def get_specification(cls, spec_name = "default") -> FrameAcquisitionSpec:
+        try:
+            return FrameAcquisition.get_specification(spec_name) # type: ignore
+        except FileNotFoundError:
+            return cls.Spec(**cls.DEFAULT_SPEC)
+
+
+class SimulatedFrameProcessor(Processor[Acquisition]):
+    """Copies each synthetic frame into its own pool, as resampling would."""
+    def __init__(self, upstream: SimulatedFrameAcquisition, bits_precision: int = 16):
+        super().__init__(upstream)
+        self._bits_precision = bits_precision
+        self._init_product_pool(n=4, shape=upstream.product_shape, dtype=np.int16)
+        self._frames_processed = 0
+
+    @property
+    def data_range(self) -> units.IntRange:
+        return units.IntRange(
+            min=-2**(self._bits_precision-1),
+            max=2**(self._bits_precision-1) - 1
+        )
+
+    def _work(self):
+        try:
+            while True:
+                with self._receive_product() as acquisition_product:
+                    processed = self._get_free_product()
+                    np.copyto(processed.data, acquisition_product.data)
+                    processed.timestamps = acquisition_product.timestamps
+                    processed.positions = acquisition_product.positions
+                    self._publish(processed)
+                    self._frames_processed += 1
+        except EndOfStream:
+            self._publish(None) # forward sentinel
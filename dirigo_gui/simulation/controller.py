@@ -0,0 +1,69 @@
+from typing import Any, Optional
+
+from dirigo.main import Dirigo, PluginError
+
+from dirigo_gui.simulation.hardware import SimulationConfig, SimulatedHardware
+from dirigo_gui.simulation.acquisition import (
+    SimulatedFrameAcquisition, SimulatedFrameProcessor
+)
+
+
+
+class SimulatedDirigo(Dirigo):
+    """
+    Dirigo controller for the simulated rig, for running the reference GUI
+    offline (development, demos, CI).
+
+    The raster frame acquisition and processor are replaced by their
+    simulated counterparts; every other processor, display and writer is the
+    installed plugin, working on synthetic frames. Routines that drive a real
+    FrameAcquisition internally (stacks, mosaics, time-lapses, autofocus) are
+    not simulated; the reference GUI disables their buttons.
+
+    Unlike Dirigo, this is not a singleton, so tests can build several.
+    """
+    SIMULATED: dict[tuple[str, str], type] = {
+        ("acquisition", "raster_frame"):    SimulatedFrameAcquisition,
+        ("processor", "raster_frame"):      SimulatedFrameProcessor,
+    }
+
+    def __new__(cls, *a, **k):
+        return object.__new__(cls)
+
+    def __init__(self, config: Optional[SimulationConfig] = None):
+        self.config = config or SimulationConfig()
+        self.system_config = self.config.to_system_config()
+        self.hw = SimulatedHardware(self.system_config)
+
+        self._init_args = {"simulation": self.config}
+        self._initialized = True
+
+    def make(self, group: str, name: str, **kw: Any):
+        cls = self.SIMULATED.get((group, name))
+        if cls is None:
+            if group == "acquisition":
+                raise PluginError(
+                    f"The '{name}' acquisition is not simulated. Available: "
+                    f"{ {n for g, n in self.SIMULATED if g == 'acquisition'} }"
+                )
+            return super().make(group, name, **kw)
+
+        if group == "acquisition":
+            spec = kw.pop("spec", None)
+            if isinstance(spec, str) or spec is None:
+                spec = cls.get_specification(spec_name=spec or "default")
+            obj = cls(self.hw, self.system_config, spec, config=self.config, **kw)
+        else:
+            upstream = kw.pop("upstream")
+            autostart = kw.pop("autostart", True)
+            autoconnect = kw.pop("autoconnect", True)
+
+            obj = cls(upstream, **kw)
+            if autoconnect:
+                upstream.add_subscriber(obj)
+            if autostart:
+                obj.start()
+
+        obj._dirigo_group = group
+        obj._dirigo_plugin = name
+        return obj
@@ -0,0 +1,368 @@
+"""
+Simulated devices for running the reference GUI without hardware.
+
+Each device blocks the caller for a configurable latency on every command
+and readback, like a call over a serial or USB link would, so the GUI's
+threading (dispatchers, pollers, the hardware mirror) is exercised the same
+way as on a real rig. Stage moves take time according to the axis velocity.
+
+Stages, detectors and the beam attenuator implement the dirigo hardware
+interfaces. The digitizer and raster scanners only provide the members the
+GUI and the simulated acquisition use; their dirigo interfaces describe
+board and waveform configuration that has no meaning here.
+"""
+from dataclasses import dataclass, asdict
+from typing import Optional
+import math
+import threading
+import time
+
+from dirigo import units
+from dirigo.hw_interfaces.stage import (
+    Stage, StageInfo, LinearStage, RotationStage, MultiAxisStage
+)
+from dirigo.hw_interfaces.detector import Detector
+from dirigo.hw_interfaces.beam_attenuator import BeamAttenuator
+
+
+
+def _wait(latency: float) -> None:
+    if latency > 0:
+        time.sleep(latency)
+
+
+class _SimulatedStage(Stage):
+    """
+    Constant-velocity motion, computed from the time of the last command so
+    no thread is needed. Positions and velocities are in SI units (m or rad).
+    """
+    QUANTITY: type[units.UnitQuantity]
+    VELOCITY: type[units.UnitQuantity]
+    ACCELERATION: type[units.UnitQuantity]
+
+    def __init__(self,
+                 axis: str,
+                 limits: dict,
+                 max_velocity: float,
+                 acceleration: float,
+                 position: float = 0.0,
+                 command_latency: float = 0.0, # s per command
+                 readback_latency: float = 0.0, # s per read
+                 **kwargs):
+        Stage.__init__(self, axis=axis)
+        self._validate_limits_dict(limits)
+        self._min, self._max = float(limits["min"]), float(limits["max"])
+        self._max_velocity = float(max_velocity)
+        self._acceleration = float(acceleration)
+        self.command_latency = command_latency
+        self.readback_latency = readback_latency
+
+        self._lock = threading.Lock()
+        self._start = float(position) # position when the current motion began
+        self._t0 = time.perf_counter()
+        self._velocity = 0.0        # signed, m/s or rad/s
+        self._target: Optional[float] = None # None for a velocity move
+        self._homed = False
+
+    def true_position(self) -> float:
+        """Position now, without readback latency (e.g. for an encoder)."""
+        with self._lock:
+            return self._position_at(time.perf_counter())
+
+    def _position_at(self, t: float) -> float:
+        position = self._start + self._velocity * (t - self._t0)
+        if self._target is not None:
+            if (self._velocity >= 0) == (position >= self._target):
+                return self._target
+            return position
+        return min(max(position, self._min), self._max)
+
+    def _begin(self, velocity: float, target: Optional[float]) -> None:
+        """Start a new motion from wherever the axis is now (lock held)."""
+        now = time.perf_counter()
+        self._start = self._position_at(now)
+        self._t0 = now
+        self._velocity = velocity
+        self._target = target
+
+    @property
+    def device_info(self) -> StageInfo:
+        return StageInfo(manufacturer="Dirigo", model="Simulated stage")
+
+    @property
+    def position(self):
+        _wait(self.readback_latency)
+        return self.QUANTITY(self.true_position())
+
+    @property
+    def moving(self) -> bool:
+        _wait(self.readback_latency)
+        with self._lock:
+            now = time.perf_counter()
+            if self._velocity == 0:
+                return False
+            position = self._position_at(now)
+            if self._target is not None:
+                return position != self._target
+            return self._min < position < self._max
+
+    def move_to(self, position, blocking: bool = False):
+        target = min(max(float(position), self._min), self._max)
+        _wait(self.command_latency)
+        with self._lock:
+            distance = target - self._position_at(time.perf_counter())
+            self._begin(math.copysign(self._max_velocity, distance), target)
+        if blocking:
+            self.wait_until_move_finished()
+
+    def move_velocity(self, velocity):
+        velocity = max(-self._max_velocity, min(float(velocity), self._max_velocity))
+        _wait(self.command_latency)
+        with self._lock:
+            self._begin(velocity, None)
+
+    def stop(self):
+        _wait(self.command_latency)
+        with self._lock:
+            self._begin(0.0, None)
+
+    def home(self, blocking: bool = False):
+        self.move_to(self._min, blocking)
+        self._homed = True
+
+    @property
+    def homed(self) -> bool:
+        return self._homed
+
+    @property
+    def max_velocity(self):
+        _wait(self.readback_latency)
+        return self.VELOCITY(self._max_velocity)
+
+    @max_velocity.setter
+    def max_velocity(self, value):
+        _wait(self.command_latency)
+        self._max_velocity = float(value)
+
+    @property
+    def acceleration(self):
+        _wait(self.readback_latency)
+        return self.ACCELERATION(self._acceleration)
+
+    @acceleration.setter
+    def acceleration(self, value):
+        _wait(self.command_latency)
+        self._acceleration = float(value)
+
+
+class SimulatedLinearStage(_SimulatedStage, LinearStage):
+    QUANTITY = units.Position
+    VELOCITY = units.Velocity
+    ACCELERATION = units.Acceleration
+
+    @property
+    def position_limits(self) -> units.PositionRange:
+        return units.PositionRange(min=self._min, max=self._max)
+
+
+class SimulatedRotationStage(_SimulatedStage, RotationStage):
+    QUANTITY = units.Angle
+    VELOCITY = units.AngularVelocity
+    ACCELERATION = units.AngularAcceleration
+    DEFAULT_LIMITS = {"min": 0.0, "max": 2 * math.pi}
+
+    def __init__(self,
+                 limits: Optional[dict] = None,
+                 max_velocity: float = math.radians(20), # rad/s
+                 acceleration: float = math.radians(100), # rad/s^2
+                 **kwargs):
+        kwargs.pop("axis", None)
+        limits = limits or self.DEFAULT_LIMITS
+        super().__init__("theta", limits, max_velocity, acceleration, **kwargs)
+        self._limits = units.AngleRange(**limits)
+
+    @property
+    def position_limits(self) -> units.AngleRange:
+        return self._limits
+
+
+class SimulatedStages(MultiAxisStage):
+    """X, Y and (optionally) Z axes, each configured by a dict of SimulatedLinearStage arguments."""
+    def __init__(self,
+                 x: dict,
+                 y: dict,
+                 z: Optional[dict] = None,
+                 init_latency: float = 0.0,
+                 **kwargs):
+        _wait(init_latency) # connecting to the controller
+        self._x = SimulatedLinearStage("x", **x)
+        self._y = SimulatedLinearStage("y", **y)
+        self._z = SimulatedLinearStage("z", **z) if z is not None else None
+
+    @property
+    def x(self) -> SimulatedLinearStage:
+        return self._x
+
+    @property
+    def y(self) -> SimulatedLinearStage:
+        return self._y
+
+    @property
+    def z(self) -> SimulatedLinearStage:
+        if self._z is None:
+            raise NotImplementedError("Simulated stages have no z axis")
+        return self._z
+
+
+class SimulatedDetector(Detector):
+    DEFAULT_GAIN_RANGE = {"min": 0, "max": 100}
+
+    def __init__(self,
+                 gain: int = 50,
+                 gain_range: Optional[dict] = None,
+                 enabled: bool = True,
+                 bandwidth: str = "80 MHz",
+                 command_latency: float = 0.0,
+                 readback_latency: float = 0.0,
+                 init_latency: float = 0.0,
+                 **kwargs): # fast_scanner is passed by Hardware, unused
+        super().__init__()
+        _wait(init_latency)
+        self._gain = int(gain)
+        self._gain_range = units.IntRange(**(gain_range or self.DEFAULT_GAIN_RANGE))
+        self._enabled = enabled
+        self._bandwidth = units.Frequency(bandwidth)
+        self.command_latency = command_latency
+        self.readback_latency = readback_latency
+
+    @property
+    def enabled(self) -> bool:
+        _wait(self.readback_latency)
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, state: bool):
+        _wait(self.command_latency)
+        self._enabled = bool(state)
+
+    @property
+    def gain(self) -> int:
+        _wait(self.readback_latency)
+        return self._gain
+
+    @gain.setter
+    def gain(self, value: int):
+        if not self._gain_range.within_range(int(value)):
+            raise ValueError(f"Gain {value} outside of range {self._gain_range}")
+        _wait(self.command_latency)
+        self._gain = int(value)
+
+    @property
+    def gain_range(self) -> units.IntRange:
+        return self._gain_range
+
+    @property
+    def bandwidth(self) -> units.Frequency:
+        return self._bandwidth
+
+    @bandwidth.setter
+    def bandwidth(self, value: units.Frequency):
+        raise NotImplementedError("Simulated detectors have a fixed bandwidth")
+
+    def true_signal(self) -> float:
+        """Relative signal scale (0-1) for the simulated acquisition, without latency."""
+        if not self._enabled:
+            return 0.0
+        return (self._gain - self._gain_range.min) / max(self._gain_range.max - self._gain_range.min, 1)
+
+
+class SimulatedBeamAttenuator(BeamAttenuator):
+    """
+    Half-wave plate and polarizer: the plate angle θ, set by the rotation
+    stage, transmits sin²(2θ). set_fraction returns once the command is sent;
+    the fraction reads back the plate's current angle, so it lags while the
+    stage rotates.
+    """
+    def __init__(self,
+                 rotation_stage: SimulatedRotationStage,
+                 limits: Optional[dict] = None,
+                 fraction: float = 0.1,
+                 **kwargs):
+        super().__init__(limits=limits)
+        self._rotation_stage = rotation_stage
+        self._rotation_stage.move_to(self._angle(fraction), blocking=True)
+
+    @staticmethod
+    def _angle(fraction: float) -> units.Angle:
+        return units.Angle(math.asin(math.sqrt(fraction)) / 2)
+
+    @property
+    def fraction(self) -> float:
+        return math.sin(2 * float(self._rotation_stage.position)) ** 2
+
+    def true_fraction(self) -> float:
+        """Transmission now, without readback latency."""
+        return math.sin(2 * self._rotation_stage.true_position()) ** 2
+
+    def set_fraction(self, fraction: float, blocking: bool = False) -> None:
+        if not self.fraction_limits.within_range(fraction):
+            raise ValueError(f"Fraction {fraction} outside of limits {self.fraction_limits}")
+        self._rotation_stage.move_to(self._angle(fraction), blocking)
+
+
+class SimulatedFastScanner:
+    def __init__(self,
+                 axis: str = "x",
+                 frequency: float = 7910.0, # Hz
+                 init_latency: float = 0.0,
+                 **kwargs):
+        _wait(init_latency)
+        self.axis = axis
+        self.frequency = units.Frequency(frequency)
+
+
+class SimulatedSlowScanner:
+    def __init__(self,
+                 axis: str = "y",
+                 flyback_time: float = 1e-3, # s
+                 init_latency: float = 0.0,
+                 **kwargs): # fast_scanner is passed by Hardware, unused
+        _wait(init_latency)
+        self.axis = axis
+        self.flyback_time = units.Time(flyback_time)
+
+
+@dataclass
+class SimulatedChannel:
+    index: int
+    enabled: bool = True
+
+
+@dataclass
+class SimulatedDigitizerProfile:
+    """What the TIFF writers record as the digitizer profile."""
+    bit_depth: int
+    channels: list[SimulatedChannel]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class SimulatedDigitizer:
+    """Channels and bit depth only: frames come from SimulatedFrameAcquisition."""
+    def __init__(self,
+                 channels: int = 2,
+                 bit_depth: int = 16,
+                 init_latency: float = 0.0,
+                 **kwargs):
+        _wait(init_latency) # loading the board
+        self.channels = [SimulatedChannel(i) for i in range(channels)]
+        self.bit_depth = bit_depth
+
+    @property
+    def data_range(self) -> units.IntRange:
+        return units.IntRange(min=-2**(self.bit_depth - 1), max=2**(self.bit_depth - 1) - 1)
+
+    @property
+    def profile(self) -> SimulatedDigitizerProfile:
+        return SimulatedDigitizerProfile(self.bit_depth, self.channels)
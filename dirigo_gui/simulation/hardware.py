@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+import math
+
+from dirigo.components.hardware import Hardware, PluginNotFoundError, PluginInitError
+from dirigo.components.io import SystemConfig
+
+from dirigo_gui.simulation.devices import (
+    SimulatedDigitizer, SimulatedFastScanner, SimulatedSlowScanner, SimulatedDetector,
+    SimulatedStages, SimulatedRotationStage, SimulatedBeamAttenuator
+)
+
+
+
+@dataclass
+class SimulationConfig:
+    """The simulated rig: channels, frame timing, and device latencies."""
+    channels: int = 2
+    line_frequency: float = 7910.0          # Hz, fast scanner frequency
+    flyback_time: float = 1e-3              # s, slow scanner flyback
+    frame_rate: Optional[float] = None      # fps; None to derive it from the scanners and frame spec
+    noise: float = 300.0                    # standard deviation of the additive noise (counts)
+    xy_velocity: float = 5e-3               # m/s
+    z_velocity: float = 1e-3                # m/s
+    z_axis: bool = True
+    stage_command_latency: float = 10e-3    # s per stage command
+    stage_readback_latency: float = 5e-3    # s per stage read
+    device_command_latency: float = 20e-3   # s per detector/attenuator command
+    device_readback_latency: float = 5e-3   # s per detector/attenuator read
+    init_latency: float = 0.5               # s to initialize each device
+    seed: Optional[int] = None              # for the synthetic sample
+
+    def to_system_config(self) -> SystemConfig:
+        """A system configuration naming the simulated devices."""
+        stage_latencies = {
+            "command_latency":  self.stage_command_latency,
+            "readback_latency": self.stage_readback_latency,
+        }
+        device_latencies = {
+            "command_latency":  self.device_command_latency,
+            "readback_latency": self.device_readback_latency,
+        }
+        xy_axis = {
+            "limits":       {"min": -25e-3, "max": 25e-3},
+            "max_velocity": self.xy_velocity,
+            "acceleration": 10 * self.xy_velocity,
+            **stage_latencies,
+        }
+        stages: dict[str, Any] = {
+            "type":         "simulated_stages",
+            "init_latency": self.init_latency,
+            "x":            xy_axis,
+            "y":            dict(xy_axis),
+        }
+        if self.z_axis:
+            stages["z"] = {
+                "limits":       {"min": -5e-3, "max": 5e-3},
+                "max_velocity": self.z_velocity,
+                "acceleration": 10 * self.z_velocity,
+                **stage_latencies,
+            }
+        return SystemConfig({
+            "digitizer": {
+                "type":         "simulated_digitizer",
+                "channels":     self.channels,
+                "init_latency": self.init_latency,
+            },
+            "fast_raster_scanner": {
+                "type":         "simulated_fast_scanner",
+                "axis":         "x",
+                "frequency":    self.line_frequency,
+                "init_latency": self.init_latency,
+            },
+            "slow_raster_scanner": {
+                "type":         "simulated_slow_scanner",
+                "axis":         "y",
+                "flyback_time": self.flyback_time,
+            },
+            "detectors": {
+                f"detector{i}": {
+                    "type":         "simulated_detector",
+                    "init_latency": self.init_latency / self.channels,
+                    **device_latencies,
+                } for i in range(self.channels)
+            },
+            "stages": stages,
+            "rotation_stage": {
+                "type":         "simulated_rotation_stage",
+                "max_velocity": math.radians(45),
+                **device_latencies,
+            },
+            "beam_attenuator": {
+                "type":         "simulated_beam_attenuator",
+                "limits":       {"min": 0.0, "max": 1.0},
+            },
+        })
+
+
+class SimulatedHardware(Hardware):
+    """
+    Hardware that loads the simulated devices by type name instead of from
+    installed entry points. Devices are still initialized lazily, one
+    property at a time, so HardwareInitializer works unchanged.
+    """
+    DEVICES: dict[str, type] = {
+        "simulated_digitizer":          SimulatedDigitizer,
+        "simulated_fast_scanner":       SimulatedFastScanner,
+        "simulated_slow_scanner":       SimulatedSlowScanner,
+        "simulated_detector":           SimulatedDetector,
+        "simulated_stages":             SimulatedStages,
+        "simulated_rotation_stage":     SimulatedRotationStage,
+        "simulated_beam_attenuator":    SimulatedBeamAttenuator,
+    }
+
+    def _load(self, group: str, type_name: str, **kw):
+        try:
+            cls = self.DEVICES[type_name]
+        except KeyError as e:
+            raise PluginNotFoundError(group, type_name, available=list(self.DEVICES)) from e
+        try:
+            return cls(**kw)
+        except TypeError as e:
+            raise PluginInitError(cls, kwargs=kw) from e
@@ -213,33 +213,66 @@ class ImageViewer(ctk.CTkFrame):
 
 
 class LiveViewer(ImageViewer):
-    """Viewer widget with polling for automatic image updates."""
+    """
+    Viewer widget with polling for automatic image updates.
+
+    The DisplayProduct on screen is held (not released) until a newer frame
+    replaces it, because _native_frame refers to its buffer for redraws
+    (e.g. on zoom). When the stream ends, the frame is copied so the buffer
+    can go back to its pool; while frames are arriving nothing is copied.
+    """
     POLLING_INTERVAL_MS = 16
 
     def __init__(self, parent, width: int, height: int, *, bg: str = "black"):
         super().__init__(parent, width, height, bg=bg)
         self._inbox = queue.Queue()   # provides inbox for Workers to publish to
+        self._held: Optional[DisplayProduct] = None # product whose buffer is _native_frame
+        self.frames_shown = 0
+        self.frames_superseded = 0    # replaced in the inbox by a newer frame before being shown
 
         # Start polling
         self.poll_queue()
 
+    def show(self, frame: np.ndarray) -> None:
+        super().show(frame)
+        if self._held is not None and self._held.data is not frame:
+            self._release_held() # no longer on screen
+
+    def _release_held(self, keep_frame: bool = False) -> None:
+        """Return the held product to its pool, first copying the frame if it is still needed."""
+        if self._held is None:
+            return
+        if keep_frame and self._native_frame is self._held.data:
+            self._native_frame = self._native_frame.copy()
+        self._held._release()
+        self._held = None
+
     def poll_queue(self):
         disp_product: Optional[DisplayProduct] = None
+        ended = False
         while True:
             try:
-                if disp_product is not None:
-                    disp_product._release()
-                disp_product = self._inbox.get_nowait() # TODO, Worker class has method to recieve product, recerate here?
+                product = self._inbox.get_nowait() # TODO, Worker class has method to recieve product, recerate here?
             except queue.Empty:
                 break # queue drained
+            if product is None: # end of stream
+                ended = True
+                continue
+            ended = False # a new stream
+            if disp_product is not None:
+                disp_product._release()
+                self.frames_superseded += 1
+            disp_product = product
 
         if disp_product is not None:
-            #t0 = time.perf_counter()
             self.show(disp_product.data)
-            #t1 = time.perf_counter()
-            #print(f"TK DISP: {1000*(t1-t0):.3f}")
+            self._held = disp_product
+            self.frames_shown += 1
+        if ended:
+            self._release_held(keep_frame=True)
 
-        #T = max(self.POLLING_INTERVAL_MS - int(1000*(t1-t0)), 0)
-        #print("DELAY TIME (ms):", T)
-        
         self.after(self.POLLING_INTERVAL_MS, self.poll_queue)
+
+    def destroy(self):
+        self._release_held()
+        super().destroy()
@@ -0,0 +1,83 @@
+from pathlib import Path
+from tkinter import filedialog
+import time
+
+import customtkinter as ctk
+
+from dirigo_gui.hardware.io_profiler import IOProfiler
+
+
+
+def _ms(seconds: float) -> str:
+    return f"{1000 * seconds:8.2f}"
+
+
+class IOProfileWindow(ctk.CTkToplevel):
+    """
+    Live table of device call latencies recorded by an IOProfiler, one row
+    per call site, plus the slowest calls made on the Tk thread.
+    """
+    REFRESH_INTERVAL_MS = 1000
+    MAX_ROWS = 40
+
+    def __init__(self, parent, profiler: IOProfiler):
+        super().__init__(parent)
+        self.title("Hardware I/O Profile")
+        self._profiler = profiler
+
+        font = ctk.CTkFont(family="Courier", size=12)
+        self.table = ctk.CTkTextbox(self, width=900, height=360, font=font, wrap="none")
+        self.table.pack(fill="both", expand=True, padx=10, pady=(10, 4))
+
+        ctk.CTkLabel(
+            self, text=f"Tk-thread calls over {1000 * profiler.slow_threshold:.0f} ms:", anchor="w"
+        ).pack(fill="x", padx=10)
+        self.slow_table = ctk.CTkTextbox(self, width=900, height=140, font=font, wrap="none")
+        self.slow_table.pack(fill="both", expand=True, padx=10, pady=(0, 4))
+
+        controls = ctk.CTkFrame(self, fg_color="transparent")
+        controls.pack(fill="x", padx=10, pady=(0, 10))
+        ctk.CTkButton(controls, text="Export...", width=80,
+                      command=self._export).pack(side=ctk.RIGHT)
+        ctk.CTkButton(controls, text="Reset", width=60,
+                      command=self._profiler.reset).pack(side=ctk.RIGHT, padx=8)
+
+        self._refresh()
+
+    def _refresh(self) -> None:
+        if not self.winfo_exists():
+            return
+        lines = [f"{'device.member':<36} {'kind':<4} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} "
+                 f"{'max ms':>8} {'total ms':>9} {'Tk':>5} {'slow':>5}  call site"]
+        for s in self._profiler.stats()[:self.MAX_ROWS]:
+            lines.append(
+                f"{(s.device + '.' + s.member)[-36:]:<36} {s.kind:<4} {s.count:>7} "
+                f"{_ms(s.percentile(50))} {_ms(s.percentile(95))} {_ms(s.max)} "
+                f"{1000 * s.total:9.1f} {s.tk_thread:>5} {s.slow_tk:>5}  {s.site}"
+            )
+        self._set_text(self.table, "\n".join(lines))
+
+        slow = sorted(self._profiler.slow_calls, key=lambda c: c.duration, reverse=True)
+        self._set_text(self.slow_table, "\n".join(
+            f"{time.strftime('%H:%M:%S', time.localtime(c.wall_time))} {_ms(c.duration)} ms  "
+            f"{c.device}.{c.member} ({c.kind})  {c.site}"
+            for c in slow[:self.MAX_ROWS]
+        ))
+        self.after(self.REFRESH_INTERVAL_MS, self._refresh)
+
+    @staticmethod
+    def _set_text(box: ctk.CTkTextbox, text: str) -> None:
+        box.configure(state="normal")
+        box.delete("1.0", ctk.END)
+        box.insert("1.0", text)
+        box.configure(state="disabled")
+
+    def _export(self) -> None:
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="io_profile.json",
+        )
+        if path:
+            self._profiler.export(Path(path))
@@ -0,0 +1,157 @@
+from typing import Callable, Optional
+import queue
+
+import customtkinter as ctk
+import numpy as np
+
+from dirigo.sw_interfaces.display import DisplayProduct
+from dirigo_gui.widgets.image_display import ImageViewer
+from dirigo_gui.workers.tile_pyramid import TilePyramid
+
+
+
+class OverviewFeed:
+    """
+    Display subscriber that paints displayed frames into a TilePyramid.
+
+    position_source(n) is called on the Tk thread for the n-th frame since
+    reset() and returns the stage (x, y) of the frame center in meters, or
+    None to skip the frame (e.g. while the stage is moving). Only the newest
+    queued frame is painted per poll.
+    """
+    POLLING_INTERVAL_MS = 100
+
+    def __init__(self, widget: ctk.CTkBaseClass, pyramid: TilePyramid):
+        self.pyramid = pyramid
+        self._widget = widget # for Tk after() scheduling
+        self._inbox = queue.Queue() # provides inbox for Workers to publish to
+        self.position_source: Optional[Callable[[int], Optional[tuple[float, float]]]] = None
+        self.pixel_size = (1e-6, 1e-6) # (width, height) of a frame pixel (m)
+        self.frames_received = 0
+        self.poll_queue()
+
+    def reset(self, pixel_size: tuple[float, float],
+              position_source: Callable[[int], Optional[tuple[float, float]]]) -> None:
+        """Call at the start of each acquisition."""
+        self.pixel_size = pixel_size
+        self.position_source = position_source
+        self.frames_received = 0
+
+    def poll_queue(self):
+        latest: Optional[tuple[int, np.ndarray]] = None
+        while True:
+            try:
+                product: Optional[DisplayProduct] = self._inbox.get_nowait()
+            except queue.Empty:
+                break
+            if product is None: # end of stream
+                continue
+            n = self.frames_received
+            self.frames_received += 1
+            if self.position_source is None:
+                product._release()
+                continue
+            position = self.position_source(n)
+            if position is not None:
+                latest = (position, np.array(product.data)) # copy before release
+            product._release()
+
+        if latest is not None:
+            (x, y), frame = latest
+            self.pyramid.insert(frame, x, y, *self.pixel_size)
+
+        self._widget.after(self.POLLING_INTERVAL_MS, self.poll_queue)
+
+
+class OverviewWindow(ctk.CTkToplevel):
+    """
+    Overview map of where the sample has been imaged, in stage coordinates.
+    Scroll to zoom, click to move the stage to that point.
+    """
+    REFRESH_INTERVAL_MS = 200
+    VIEW_SIZE = (480, 480)
+    ZOOM_STEP = 1.5
+
+    def __init__(self, parent,
+                 pyramid: TilePyramid,
+                 stage_position: Callable[[], Optional[tuple[float, float]]],
+                 move_stage: Callable[[float, float], None],
+                 field_size: Callable[[], tuple[float, float]]):
+        super().__init__(parent)
+        self.title("Overview")
+        self._pyramid = pyramid
+        self._stage_position = stage_position
+        self._move_stage = move_stage
+        self._field_size = field_size
+
+        self.view_pixel_size = 10e-6 # m per screen pixel
+        self.center: Optional[tuple[float, float]] = stage_position()
+
+        width, height = self.VIEW_SIZE
+        self.viewer = ImageViewer(self, width=width, height=height)
+        self.viewer.pack(expand=True, padx=10, pady=(10, 4))
+
+        controls = ctk.CTkFrame(self, fg_color="transparent")
+        controls.pack(fill="x", padx=10, pady=(0, 10))
+        self._follow_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(controls, text="Follow stage", variable=self._follow_var).pack(side=ctk.LEFT)
+        ctk.CTkButton(controls, text="Clear", width=60,
+                      command=self._clear).pack(side=ctk.RIGHT)
+        self.scale_label = ctk.CTkLabel(controls, text="")
+        self.scale_label.pack(side=ctk.RIGHT, padx=8)
+
+        canvas = self.viewer._canvas
+        canvas.bind("<Button-1>", self._on_click)
+        canvas.bind("<MouseWheel>", lambda e: self._zoom(-1 if e.delta > 0 else +1))
+        canvas.bind("<Button-4>", lambda e: self._zoom(-1)) # X11 scroll up
+        canvas.bind("<Button-5>", lambda e: self._zoom(+1))
+
+        self._refresh()
+
+    def _zoom(self, direction: int) -> None:
+        self.view_pixel_size *= self.ZOOM_STEP ** direction
+        self._render()
+
+    def _clear(self) -> None:
+        self._pyramid.clear()
+        self._render()
+
+    def _to_stage(self, px: float, py: float) -> tuple[float, float]:
+        cx, cy = self.center or (0.0, 0.0)
+        width, height = self.VIEW_SIZE
+        return (cx + (px - width / 2) * self.view_pixel_size,
+                cy + (py - height / 2) * self.view_pixel_size)
+
+    def _to_view(self, x: float, y: float) -> tuple[float, float]:
+        cx, cy = self.center or (0.0, 0.0)
+        width, height = self.VIEW_SIZE
+        return ((x - cx) / self.view_pixel_size + width / 2,
+                (y - cy) / self.view_pixel_size + height / 2)
+
+    def _on_click(self, event) -> None:
+        self._follow_var.set(True)
+        self._move_stage(*self._to_stage(event.x, event.y))
+
+    def _refresh(self) -> None:
+        if not self.winfo_exists():
+            return
+        if self._follow_var.get():
+            position = self._stage_position()
+            if position is not None:
+                self.center = position
+        self._render()
+        self.after(self.REFRESH_INTERVAL_MS, self._refresh)
+
+    def _render(self) -> None:
+        width, height = self.VIEW_SIZE
+        cx, cy = self.center or (0.0, 0.0)
+        self.viewer.show(self._pyramid.render(cx, cy, self.view_pixel_size, width, height))
+
+        # Current field of view
+        position = self._stage_position()
+        if position is not None:
+            fw, fh = self._field_size()
+            x0, y0 = self._to_view(position[0] - fw / 2, position[1] - fh / 2)
+            x1, y1 = self._to_view(position[0] + fw / 2, position[1] + fh / 2)
+            self.viewer.add_overlay("fov", "rect", x0=x0, y0=y0, x1=x1, y1=y1)
+        self.scale_label.configure(text=f"{1e3 * width * self.view_pixel_size:.2f} mm across")
@@ -0,0 +1,165 @@
+from pathlib import Path
+from typing import Callable, Optional
+import time
+
+import customtkinter as ctk
+import numpy as np
+
+from dirigo_gui.widgets.image_display import ImageViewer
+from dirigo_gui.workers.series_reader import SeriesReader, FrameCache
+
+
+
+class PlaybackViewer(ImageViewer):
+    """
+    Viewer for reviewing a saved series. Frames are read lazily from disk,
+    held in an LRU cache and prefetched ahead of the playhead.
+    """
+    COLORS = np.array([   # channel -> RGB weight
+        [0.0, 1.0, 1.0],  # cyan
+        [1.0, 0.0, 1.0],  # magenta
+        [1.0, 1.0, 0.0],  # yellow
+        [1.0, 1.0, 1.0],  # gray
+    ], dtype=np.float32)
+    DEFAULT_FRAME_PERIOD = 0.1 # seconds, if the series has no timestamps
+
+    def __init__(self, parent, reader: SeriesReader, *,
+                 on_index_change: Optional[Callable[[int], None]] = None,
+                 bg: str = "black"):
+        first = reader.read(0)
+        super().__init__(parent, width=first.shape[1], height=first.shape[0], bg=bg)
+        self._reader = reader
+        self._cache = FrameCache(reader)
+        self._on_index_change = on_index_change
+
+        # Display range per channel from the first frame
+        flat = first.reshape(-1, first.shape[2]).astype(np.float32)
+        self._lo = np.percentile(flat, 0.1, axis=0)
+        self._hi = np.maximum(np.percentile(flat, 99.9, axis=0), self._lo + 1)
+        self._colors = self.COLORS[np.arange(first.shape[2]) % len(self.COLORS)]
+
+        self.frame_period = reader.frame_period or self.DEFAULT_FRAME_PERIOD
+        self.index = 0
+        self._direction = +1
+        self._playing = False
+        self._play_origin = (0.0, 0) # (wall time, index) when play started
+
+        self.seek(0)
+
+    @property
+    def nframes(self) -> int:
+        return self._reader.nframes
+
+    @property
+    def playing(self) -> bool:
+        return self._playing
+
+    def seek(self, index: int) -> None:
+        """Show frame `index` and prefetch in the current play direction."""
+        self.index = int(np.clip(index, 0, self.nframes - 1))
+        self.show(self._render(self._cache.get(self.index)))
+        self._cache.request(self.index, self._direction)
+        if self._on_index_change:
+            self._on_index_change(self.index)
+
+    def play(self, direction: int = +1) -> None:
+        self._direction = +1 if direction >= 0 else -1
+        self._play_origin = (time.perf_counter(), self.index)
+        if not self._playing:
+            self._playing = True
+            self._tick()
+
+    def pause(self) -> None:
+        self._playing = False
+
+    def _tick(self) -> None:
+        if not self._playing:
+            return
+        # Index follows the wall clock so playback keeps the original frame
+        # rate; frames are skipped rather than slowing down if rendering lags.
+        t0, i0 = self._play_origin
+        elapsed_frames = int((time.perf_counter() - t0) / self.frame_period)
+        target = i0 + self._direction * elapsed_frames
+        if not 0 <= target < self.nframes:
+            self._playing = False
+            target = int(np.clip(target, 0, self.nframes - 1))
+        if target != self.index:
+            self.seek(target)
+
+        if self._playing:
+            delay_ms = max(1, int(1000 * self.frame_period / 2))
+            self.after(delay_ms, self._tick)
+
+    def _render(self, frame: np.ndarray) -> np.ndarray:
+        """Map a (Y, X, C) frame of raw values to 8-bit RGB."""
+        norm = (frame.astype(np.float32) - self._lo) / (self._hi - self._lo)
+        np.clip(norm, 0, 1, out=norm)
+        rgb = np.tensordot(norm, self._colors, axes=([2], [0]))
+        np.clip(rgb, 0, 1, out=rgb)
+        return (255 * rgb).astype(np.uint8)
+
+    def close(self) -> None:
+        self._playing = False
+        self._cache.stop()
+        self._reader.close()
+
+
+class PlaybackWindow(ctk.CTkToplevel):
+    """Review window for a saved series."""
+    def __init__(self, parent, path: Path | str):
+        super().__init__(parent)
+        reader = SeriesReader(path)
+        self.title(f"Review: {reader.basename}")
+
+        self.viewer = PlaybackViewer(self, reader, on_index_change=self._index_changed)
+        self.viewer.pack(expand=True, padx=10, pady=10)
+
+        controls = ctk.CTkFrame(self, fg_color="transparent")
+        controls.pack(fill="x", padx=10, pady=(0, 10))
+
+        font = ctk.CTkFont(weight="bold")
+        ctk.CTkButton(controls, text="◀", font=font, width=30,
+                      command=lambda: self.viewer.play(-1)).pack(side=ctk.LEFT, padx=2)
+        ctk.CTkButton(controls, text="❚❚", font=font, width=30,
+                      command=self.viewer.pause).pack(side=ctk.LEFT, padx=2)
+        ctk.CTkButton(controls, text="▶", font=font, width=30,
+                      command=lambda: self.viewer.play(+1)).pack(side=ctk.LEFT, padx=2)
+
+        self.slider = ctk.CTkSlider(
+            controls,
+            from_=0,
+            to=max(self.viewer.nframes - 1, 1),
+            number_of_steps=max(self.viewer.nframes - 1, 1),
+            command=lambda value: self._slider_moved(value)
+        )
+        self.slider.pack(side=ctk.LEFT, expand=True, fill="x", padx=5)
+
+        self.position_label = ctk.CTkLabel(controls, text="", width=110)
+        self.position_label.pack(side=ctk.LEFT, padx=2)
+        self._index_changed(self.viewer.index)
+
+        self.bind("<Left>", lambda e: self.viewer.seek(self.viewer.index - 1))
+        self.bind("<Right>", lambda e: self.viewer.seek(self.viewer.index + 1))
+        self.bind("<space>", lambda e: self._toggle_play())
+        self.bind("<Control-equal>", lambda e: self.viewer.cycle_zoom(+1))
+        self.bind("<Control-minus>", lambda e: self.viewer.cycle_zoom(-1))
+        self.protocol("WM_DELETE_WINDOW", self.on_close_request)
+
+    def _slider_moved(self, value):
+        self.viewer.pause()
+        self.viewer.seek(int(round(value)))
+
+    def _toggle_play(self):
+        if self.viewer.playing:
+            self.viewer.pause()
+        else:
+            self.viewer.play(+1)
+
+    def _index_changed(self, index: int):
+        if hasattr(self, "slider"):
+            self.slider.set(index)
+            self.position_label.configure(text=f"{index + 1} / {self.viewer.nframes}")
+
+    def on_close_request(self):
+        self.viewer.close()
+        self.destroy()
@@ -0,0 +1,68 @@
+import customtkinter as ctk
+
+from dirigo_gui.hardware.initializer import HardwareInitializer
+
+
+
+class StartupSplash(ctk.CTkToplevel):
+    """
+    Per-device progress of a HardwareInitializer: state and time taken.
+    Closes itself shortly after every device has settled, unless one failed.
+    """
+    POLL_INTERVAL_MS = 50
+    CLOSE_DELAY_MS = 800
+
+    _COLORS = {
+        "waiting":      "gray50",
+        "queued":       "gray50",
+        "initializing": "orange",
+        "ready":        "green",
+        "absent":       "gray50",
+        "failed":       "red",
+    }
+
+    def __init__(self, parent, initializer: HardwareInitializer):
+        super().__init__(parent)
+        self.title("Starting Dirigo")
+        self.resizable(False, False)
+        self.transient(parent)
+        self._initializer = initializer
+
+        ctk.CTkLabel(
+            self, text="Initializing hardware", font=ctk.CTkFont(size=16, weight="bold")
+        ).grid(row=0, column=0, columnspan=3, padx=10, pady=(10, 4), sticky="w")
+
+        self._rows: dict[str, tuple[ctk.CTkLabel, ctk.CTkLabel]] = {}
+        for r, name in enumerate(initializer.tasks, start=1):
+            ctk.CTkLabel(self, text=name, anchor="w").grid(row=r, column=0, padx=10, sticky="w")
+            state = ctk.CTkLabel(self, text="", width=90, anchor="w")
+            state.grid(row=r, column=1, padx=5, sticky="w")
+            elapsed = ctk.CTkLabel(self, text="", width=70, anchor="e")
+            elapsed.grid(row=r, column=2, padx=10, sticky="e")
+            self._rows[name] = (state, elapsed)
+
+        self._error = ctk.CTkLabel(self, text="", text_color="red", anchor="w", justify="left",
+                                   wraplength=320)
+        self._error.grid(row=len(self._rows) + 1, column=0, columnspan=3, padx=10, pady=(4, 10),
+                         sticky="w")
+        self._poll()
+
+    def _poll(self) -> None:
+        if not self.winfo_exists():
+            return
+        errors = []
+        for name, (state, elapsed) in self._rows.items():
+            task = self._initializer[name]
+            state.configure(text=task.state, text_color=self._COLORS[task.state])
+            if task.elapsed is not None:
+                elapsed.configure(text=f"{task.elapsed:.2f} s")
+            elif task.started is not None: # still running
+                elapsed.configure(text="...")
+            if task.error is not None:
+                errors.append(f"{name}: {task.error}")
+        self._error.configure(text="\n".join(errors))
+
+        if not self._initializer.done:
+            self.after(self.POLL_INTERVAL_MS, self._poll)
+        elif not errors:
+            self.after(self.CLOSE_DELAY_MS, self.destroy)
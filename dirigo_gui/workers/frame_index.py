@@ -0,0 +1,153 @@
+"""
+Frame index sidecar: a small binary file written next to a saved series that
+maps each global frame number to where its pixels live, so readers can seek
+to any frame without walking TIFF IFD chains.
+
+Layout: one 64-byte header followed by fixed-size records, so record i is at
+byte HEADER_DTYPE.itemsize + i * RECORD_DTYPE.itemsize. Records are appended
+as frames are written and flushed periodically; after the GUI crashes the
+file holds every record up to the last flush. The file is only synced to
+disk (fsync) when it is closed, to keep disk stalls off the writer thread.
+
+A frame's channels are interleaved (Y, X, C), so one record covers all
+`channels` of the frame.
+"""
+from pathlib import Path
+from typing import Optional
+import os
+import time
+
+import numpy as np
+
+
+MAGIC = b"DGFIDX01"
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ("magic",       "S8"),
+    ("version",     "<u4"),
+    ("record_size", "<u4"),
+    ("dtype",       "S8"),       # numpy dtype string of the pixel data, e.g. '<i2'
+    ("shape",       "<u4", (3,)), # frame shape (Y, X, C)
+    ("_reserved",   "V28"),
+])
+
+RECORD_DTYPE = np.dtype([
+    ("frame",       "<u8"), # global frame number
+    ("file",        "<u4"), # index of the file in the series (<basename>_<file>.tif)
+    ("channels",    "<u2"), # number of interleaved channels in the frame
+    ("_pad",        "V2"),
+    ("offset",      "<u8"), # byte offset of the frame's pixel data within the file
+    ("nbytes",      "<u8"), # size of the frame's pixel data
+    ("z",           "<f8"), # z position (m), NaN if unknown
+    ("timestamp",   "<f8"), # acquisition timestamp (s), NaN if unknown
+])
+
+
+def index_path(save_path: Path, basename: str) -> Path:
+    return Path(save_path) / f"{basename}_index.bin"
+
+
+class FrameIndexWriter:
+    """Appends frame records to an index sidecar, flushing in blocks."""
+    def __init__(self,
+                 path: Path,
+                 frame_dtype,
+                 frame_shape: tuple[int, ...],
+                 flush_every: int = 64,
+                 flush_interval: float = 1.0):
+        self.path = Path(path)
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["record_size"] = RECORD_DTYPE.itemsize
+        header["dtype"] = np.dtype(frame_dtype).str.encode()
+        shape = tuple(frame_shape) + (1,) * (3 - len(frame_shape))
+        header["shape"] = shape[:3]
+
+        self._file = open(self.path, "wb")
+        self._file.write(header.tobytes())
+
+        self._block = np.zeros(flush_every, dtype=RECORD_DTYPE)
+        self._n_pending = 0
+        self._last_flush = time.perf_counter()
+        self.frames_indexed = 0
+
+    def append(self,
+               file_index: int,
+               offset: int,
+               nbytes: int,
+               channels: int,
+               z: float = np.nan,
+               timestamp: float = np.nan) -> None:
+        record = self._block[self._n_pending]
+        record["frame"] = self.frames_indexed
+        record["file"] = file_index
+        record["channels"] = channels
+        record["offset"] = offset
+        record["nbytes"] = nbytes
+        record["z"] = z
+        record["timestamp"] = timestamp
+        self._n_pending += 1
+        self.frames_indexed += 1
+
+        if (self._n_pending == self._flush_every
+            or time.perf_counter() - self._last_flush > self._flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending records and hand them to the OS (no fsync)."""
+        if self._n_pending:
+            self._file.write(self._block[:self._n_pending].tobytes())
+            self._n_pending = 0
+        self._file.flush()
+        self._last_flush = time.perf_counter()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+class FrameIndex:
+    """Read-only, memory-mapped view of an index sidecar."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if header.size != 1 or header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a frame index file: {self.path}")
+        if header["record_size"][0] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Unsupported frame index record size in {self.path}")
+
+        self.frame_dtype = np.dtype(header["dtype"][0].decode())
+        shape = tuple(int(n) for n in header["shape"][0])
+        self.frame_shape = shape
+
+        # Ignore a partially written trailing record (e.g. after a crash)
+        n = (self.path.stat().st_size - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+        if n > 0:
+            self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r",
+                                     offset=HEADER_DTYPE.itemsize, shape=(n,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self) -> int:
+        return self.records.shape[0]
+
+    def __getitem__(self, frame: int) -> np.void:
+        return self.records[frame]
+
+    @classmethod
+    def find(cls, save_path: Path, basename: str) -> Optional["FrameIndex"]:
+        """Return the index for a series, or None if it has none."""
+        path = index_path(save_path, basename)
+        if path.exists():
+            try:
+                return cls(path)
+            except ValueError:
+                return None
+        return None
@@ -0,0 +1,123 @@
+"""
+Per-frame metadata stream: a structured NumPy array saved next to a series,
+one row per frame, holding when the frame was taken and the hardware state
+at that moment.
+
+The file is a standard .npy file (np.load(path, mmap_mode='r') works). Rows
+are appended in blocks and the header's row count is rewritten on every
+flush, so after the GUI crashes the file is still valid up to the last
+flush. It is only synced to disk (fsync) when closed, to keep disk stalls off
+the writer thread.
+"""
+from pathlib import Path
+from typing import Optional
+import os
+import struct
+import time
+
+import numpy as np
+
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def metadata_dtype(n_detectors: int) -> np.dtype:
+    fields = [
+        ("frame",           "<u8"),
+        ("timestamp",       "<f8"), # acquisition timestamp (s), NaN if not provided
+        ("host_time",       "<f8"), # host wall-clock time when the frame was written (s)
+        ("stage_x",         "<f8"), # m
+        ("stage_y",         "<f8"), # m
+        ("z",               "<f8"), # m
+        ("laser_fraction",  "<f8"),
+    ]
+    if n_detectors:
+        fields.append(("detector_gains", "<f8", (n_detectors,)))
+    return np.dtype(fields)
+
+
+def metadata_path(save_path: Path, basename: str) -> Path:
+    return Path(save_path) / f"{basename}_metadata.npy"
+
+
+class MetadataStreamWriter:
+    """Appends per-frame metadata rows to a .npy file in blocks."""
+    def __init__(self,
+                 path: Path,
+                 n_detectors: int,
+                 block_size: int = 64,
+                 flush_interval: float = 1.0):
+        self.path = Path(path)
+        self.dtype = metadata_dtype(n_detectors)
+        self._n_detectors = n_detectors
+        self._flush_interval = flush_interval
+
+        # Fixed header size (room for the largest row count) so it can be rewritten in place
+        longest = self._header_dict(2**63)
+        self._header_size = 64 * ((len(NPY_MAGIC) + 2 + len(longest) + 1) // 64 + 1)
+
+        self._block = np.zeros(block_size, dtype=self.dtype)
+        self._n_pending = 0
+        self.rows_written = 0
+
+        self._file = open(self.path, "wb")
+        self._write_header()
+        self._last_flush = time.perf_counter()
+
+    def _header_dict(self, nrows: int) -> bytes:
+        descr = np.lib.format.dtype_to_descr(self.dtype)
+        return repr({"descr": descr, "fortran_order": False, "shape": (nrows,)}).encode("latin1")
+
+    def _write_header(self) -> None:
+        header = self._header_dict(self.rows_written)
+        pad = self._header_size - len(NPY_MAGIC) - 2 - len(header) - 1
+        self._file.seek(0)
+        self._file.write(NPY_MAGIC + struct.pack("<H", self._header_size - len(NPY_MAGIC) - 2))
+        self._file.write(header + b" " * pad + b"\n")
+        self._file.seek(0, os.SEEK_END)
+
+    def append(self, frame: int, timestamp: float, state: dict) -> None:
+        """
+        Add a row. `state` holds cached hardware values with keys stage_x,
+        stage_y, z, laser_fraction and detector_gains; missing values are NaN.
+        """
+        row = self._block[self._n_pending]
+        row["frame"] = frame
+        row["timestamp"] = timestamp
+        row["host_time"] = time.time()
+        for key in ("stage_x", "stage_y", "z", "laser_fraction"):
+            value = state.get(key)
+            row[key] = np.nan if value is None else value
+        if self._n_detectors:
+            gains = state.get("detector_gains") or ()
+            values = np.full(self._n_detectors, np.nan)
+            values[:min(len(gains), self._n_detectors)] = gains[:self._n_detectors]
+            row["detector_gains"] = values
+        self._n_pending += 1
+
+        if (self._n_pending == self._block.size
+            or time.perf_counter() - self._last_flush > self._flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._n_pending:
+            self._file.write(self._block[:self._n_pending].tobytes())
+            self.rows_written += self._n_pending
+            self._n_pending = 0
+            self._write_header()
+        self._file.flush()
+        self._last_flush = time.perf_counter()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def load_metadata(save_path: Path, basename: str) -> Optional[np.ndarray]:
+    """Memory-map the metadata stream of a series, or None if it has none."""
+    path = metadata_path(save_path, basename)
+    if not path.exists():
+        return None
+    return np.load(path, mmap_mode="r")
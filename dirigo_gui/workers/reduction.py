@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from dirigo import units
+from dirigo.sw_interfaces.worker import EndOfStream
+from dirigo.sw_interfaces.processor import Processor, ProcessorProduct
+
+
+BIT_DEPTHS = ("Native", "12-bit packed", "8-bit")
+BINNINGS = (1, 2, 4)
+
+
+@dataclass
+class ReductionSpec:
+    """
+    Settings for the on-the-fly reduction stage placed in front of the writer.
+
+    crop is (x0, y0, width, height) in pixels of the incoming frame.
+    value_range is the (min, max) of the values to preserve when downcasting;
+    None uses the full upstream data range.
+    """
+    binning: int = 1
+    crop: Optional[tuple[int, int, int, int]] = None
+    decimation: int = 1
+    bit_depth: str = "Native"
+    value_range: Optional[tuple[int, int]] = None
+
+    def __post_init__(self):
+        if self.binning not in BINNINGS:
+            raise ValueError(f"Binning must be one of {BINNINGS}, got {self.binning}")
+        if not isinstance(self.decimation, int) or self.decimation < 1:
+            raise ValueError("Decimation must be an integer >= 1.")
+        if self.bit_depth not in BIT_DEPTHS:
+            raise ValueError(f"Unsupported bit depth: {self.bit_depth}")
+        if self.value_range is not None and self.value_range[1] <= self.value_range[0]:
+            raise ValueError("Value range max must be greater than min.")
+
+    @property
+    def active(self) -> bool:
+        """True if this spec changes the data in any way."""
+        return (self.binning > 1 or self.crop is not None
+                or self.decimation > 1 or self.bit_depth != "Native")
+
+
+def pack_12bit(values: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Pack pairs of 12-bit values (held in a wider integer array) into 3 bytes.
+
+    values must have an even number of elements, out must be uint8 with
+    3/2 as many elements. Byte layout per pair (a, b):
+        [a & 0xFF, (a >> 8) | (b & 0xF) << 4, b >> 4]
+    """
+    v = values.reshape(-1)
+    o = out.reshape(-1)
+    a = v[0::2]
+    b = v[1::2]
+    np.bitwise_and(a, 0xFF, out=o[0::3], casting="unsafe")
+    np.bitwise_or(a >> 8, (b & 0xF) << 4, out=o[1::3], casting="unsafe")
+    np.right_shift(b, 4, out=o[2::3], casting="unsafe")
+    return out
+
+
+def unpack_12bit(packed: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Inverse of pack_12bit. Returns a flat uint16 array."""
+    p = packed.reshape(-1).astype(np.uint16)
+    if out is None:
+        out = np.empty(2 * (p.size // 3), dtype=np.uint16)
+    out[0::2] = p[0::3] | ((p[1::3] & 0xF) << 8)
+    out[1::2] = (p[1::3] >> 4) | (p[2::3] << 4)
+    return out
+
+
+class ReductionProcessor(Processor[Processor]):
+    """
+    Reduces frames between the averager and the writer: crop to an ROI, bin
+    spatially, decimate in time, and downcast to fewer bits per sample.
+
+    All steps work in-place on preallocated buffers. The applied scaling is
+    available from `metadata` so saved values can be mapped back to the
+    original units: original = offset + scale * saved.
+    """
+    def __init__(self, upstream: Processor, spec: Optional[ReductionSpec] = None):
+        super().__init__(upstream)
+        self.spec = spec if spec is not None else ReductionSpec()
+        self._upstream_range: units.IntRange = upstream.data_range
+
+        height, width, nchannels = upstream.product_shape
+        b = self.spec.binning
+
+        # Crop (trimmed so that it divides evenly into bins)
+        if self.spec.crop is not None:
+            x0, y0, crop_width, crop_height = self.spec.crop
+            if (x0 < 0 or y0 < 0 or crop_width < b or crop_height < b
+                or x0 + crop_width > width or y0 + crop_height > height):
+                raise ValueError(f"Crop {self.spec.crop} outside of frame {width}x{height}")
+        else:
+            x0, y0, crop_width, crop_height = 0, 0, width, height
+        crop_width -= crop_width % b
+        crop_height -= crop_height % b
+        binned_width = crop_width // b
+        if self.spec.bit_depth == "12-bit packed" and (binned_width * nchannels) % 2:
+            # packing works on pairs of samples per row; drop the last column
+            binned_width -= 1
+            crop_width -= b
+        self._rows = slice(y0, y0 + crop_height)
+        self._cols = slice(x0, x0 + crop_width)
+        self._binned_shape = (crop_height // b, binned_width, nchannels)
+
+        # Scratch buffers
+        self._accumulator = np.zeros(self._binned_shape, dtype=np.int32)
+
+        # Downcasting
+        lo, hi = self.spec.value_range or (self._upstream_range.min, self._upstream_range.max)
+        self._offset = int(lo)
+        span = int(hi) - int(lo)
+        if self.spec.bit_depth == "8-bit":
+            self._scale = span / 255
+            self._shift = 0
+            out_shape = self._binned_shape
+            out_dtype = np.uint8
+        elif self.spec.bit_depth == "12-bit packed":
+            self._shift = max(0, span.bit_length() - 12)
+            self._scale = float(2 ** self._shift)
+            row_bytes = (binned_width * nchannels * 3) // 2
+            out_shape = (self._binned_shape[0], row_bytes, 1)
+            out_dtype = np.uint8
+        else:
+            self._scale = 1.0
+            self._shift = 0
+            out_shape = self._binned_shape
+            out_dtype = upstream.product_dtype
+        self._span = max(span, 1)
+
+        self._frame_counter = 0
+        self._init_product_pool(n=4, shape=out_shape, dtype=out_dtype)
+
+    def _receive_product(self,
+                         block: bool = True,
+                         timeout: float | None = None) -> ProcessorProduct:
+        return super()._receive_product(block, timeout) # type: ignore
+
+    def _work(self):
+        try:
+            while True:
+                with self._receive_product() as in_product:
+                    keep = (self._frame_counter % self.spec.decimation) == 0
+                    self._frame_counter += 1
+                    if not keep:
+                        continue
+
+                    out_product = self._get_free_product()
+                    self.reduce(in_product.data, out_product.data)
+                    out_product.timestamps = in_product.timestamps
+                    out_product.positions = in_product.positions
+                    self._publish(out_product)
+
+        except EndOfStream:
+            self._publish(None)
+
+    def reduce(self, frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Apply crop, binning and downcasting to `frame`, writing into `out`."""
+        acc = self._accumulator
+        b = self.spec.binning
+        cropped = frame[self._rows, self._cols]
+
+        if b > 1:
+            ny, nx, nc = self._binned_shape
+            blocks = cropped[:, :nx * b].reshape(ny, b, nx, b, nc)
+            np.sum(blocks, axis=(1, 3), dtype=np.int32, out=acc)
+            np.floor_divide(acc, b * b, out=acc)
+        else:
+            np.copyto(acc, cropped[:, :acc.shape[1]], casting="unsafe")
+
+        if self.spec.bit_depth == "8-bit":
+            np.subtract(acc, self._offset, out=acc)
+            np.multiply(acc, 255, out=acc)
+            np.floor_divide(acc, self._span, out=acc)
+            np.clip(acc, 0, 255, out=acc)
+            np.copyto(out, acc, casting="unsafe")
+        elif self.spec.bit_depth == "12-bit packed":
+            np.subtract(acc, self._offset, out=acc)
+            np.right_shift(acc, self._shift, out=acc)
+            np.clip(acc, 0, 0xFFF, out=acc)
+            pack_12bit(acc, out)
+        else:
+            np.copyto(out, acc, casting="unsafe")
+        return out
+
+    @property
+    def metadata(self) -> dict:
+        """Describes the applied reduction, for saving alongside the data."""
+        return {
+            "binning":      self.spec.binning,
+            "crop":         [self._cols.start, self._rows.start,
+                             self._cols.stop - self._cols.start,
+                             self._rows.stop - self._rows.start],
+            "decimation":   self.spec.decimation,
+            "bit_depth":    self.spec.bit_depth,
+            "offset":       self._offset,
+            "scale":        self._scale,
+            "shape":        list(self._binned_shape),
+        }
+
+    @property
+    def data_range(self) -> units.IntRange:
+        if self.spec.bit_depth == "8-bit":
+            return units.IntRange(min=0, max=255)
+        elif self.spec.bit_depth == "12-bit packed":
+            return units.IntRange(min=0, max=0xFFF)
+        return self._upstream_range
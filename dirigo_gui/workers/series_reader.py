@@ -0,0 +1,231 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import json
+import re
+import struct
+import threading
+
+import numpy as np
+import tifffile
+
+from dirigo.plugins.writers import TiffWriter
+from dirigo_gui.workers.frame_index import FrameIndex
+from dirigo_gui.workers.reduction import unpack_12bit
+
+
+
+class SeriesReader:
+    """
+    Lazy random-access reader for a saved TIFF series.
+
+    A series is either a single file or the numbered files `<basename>_<n>.tif`
+    written by the rollover writer. If the series has a frame index sidecar,
+    frames are located through it in constant time. Otherwise files are opened
+    only when a frame from them is requested, and contiguous files are
+    memory-mapped so reading a frame does not walk the IFD chain.
+    """
+    def __init__(self, path: Path | str):
+        path = Path(path)
+        match = re.match(r"(.+)_(\d+)$", path.stem)
+        if match:
+            basename = match.group(1)
+            pattern = re.compile(rf"{re.escape(basename)}_(\d+)\.tif$")
+            numbered = [
+                (int(m.group(1)), p) for p in path.parent.glob(f"{basename}_*.tif")
+                if (m := pattern.match(p.name))
+            ]
+            self.paths = [p for _, p in sorted(numbered)]
+        else:
+            basename = path.stem
+            self.paths = [path]
+        self.basename = basename
+        self.directory = path.parent
+
+        self._lock = threading.Lock()
+        self._files: dict[int, tifffile.TiffFile] = {}
+        self._arrays: dict[int, np.ndarray] = {}
+        self._reduction = self._load_reduction_metadata()
+
+        # With a frame index sidecar every frame is located directly
+        self._index = FrameIndex.find(self.directory, basename)
+        if self._index is not None and len(self._index) > 0:
+            self._frame_shape = self._index.frame_shape
+            self.nframes = len(self._index)
+            self.frame_period = self._index_frame_period()
+            return
+
+        # Otherwise take the frame shape from the first file; every file but
+        # the last holds the same number of frames, so only the first and last
+        # need opening
+        self._index = None
+        series = self._open(0).series[0]
+        if series.axes[0] in "TZ" and len(series.shape) > 2:
+            self._frame_shape = tuple(series.shape[1:])
+        else:
+            self._frame_shape = tuple(series.shape)
+        self._frames_per_file = self._frames_in_file(0)
+        self.nframes = self._frames_per_file * (len(self.paths) - 1) \
+            + self._frames_in_file(len(self.paths) - 1)
+        self.frame_period = self._estimate_frame_period()
+
+    def _open(self, file_index: int) -> tifffile.TiffFile:
+        with self._lock:
+            tif = self._files.get(file_index)
+            if tif is None:
+                tif = tifffile.TiffFile(self.paths[file_index])
+                self._files[file_index] = tif
+                series = tif.series[0]
+                if series.dataoffset is not None:
+                    self._arrays[file_index] = np.memmap(
+                        self.paths[file_index], dtype=series.dtype, mode="r",
+                        offset=series.dataoffset, shape=series.shape,
+                    )
+                else:
+                    # Not contiguous (e.g. written by another tool): decode the file once
+                    self._arrays[file_index] = series.asarray()
+            return tif
+
+    def _frames_in_file(self, file_index: int) -> int:
+        series = self._open(file_index).series[0]
+        return int(np.prod(series.shape)) // int(np.prod(self._frame_shape))
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        if not 0 <= index < self.nframes:
+            raise IndexError(f"Frame {index} out of range [0, {self.nframes})")
+        return divmod(index, self._frames_per_file)
+
+    def _raw(self, file_index: int) -> np.ndarray:
+        """Whole file mapped as bytes, for reads located by the frame index."""
+        with self._lock:
+            raw = self._arrays.get(file_index)
+            if raw is None:
+                raw = np.memmap(self.paths[file_index], dtype=np.uint8, mode="r")
+                self._arrays[file_index] = raw
+            return raw
+
+    def read(self, index: int) -> np.ndarray:
+        """Return a copy of frame `index` (Y, X, C)."""
+        if self._index is not None:
+            record = self._index[index]
+            start = int(record["offset"])
+            data = self._raw(int(record["file"]))[start:start + int(record["nbytes"])]
+            frame = np.array(data.view(self._index.frame_dtype).reshape(self._frame_shape))
+        else:
+            file_index, local_index = self._locate(index)
+            self._open(file_index)
+            frames = self._arrays[file_index].reshape((-1,) + self._frame_shape)
+            frame = np.array(frames[local_index])
+        if frame.ndim == 2:
+            frame = frame[:, :, np.newaxis]
+        return self._unpack(frame)
+
+    def _unpack(self, frame: np.ndarray) -> np.ndarray:
+        if not self._reduction or self._reduction.get("bit_depth") != "12-bit packed":
+            return frame
+        values = unpack_12bit(frame)
+        return values.reshape(self._reduction["shape"])
+
+    def _load_reduction_metadata(self) -> Optional[dict]:
+        path = self.directory / f"{self.basename}_reduction.json"
+        if path.exists():
+            with open(path, "r") as file:
+                return json.load(file)
+        return None
+
+    def _index_frame_period(self) -> Optional[float]:
+        """Median frame period (s) from the timestamps in the frame index."""
+        stamps = np.asarray(self._index.records["timestamp"][:1000]) # type: ignore
+        stamps = stamps[np.isfinite(stamps)]
+        if stamps.size < 2:
+            return None
+        period = float(np.median(np.diff(stamps)))
+        return period if period > 0 else None
+
+    def _estimate_frame_period(self) -> Optional[float]:
+        """Median frame period (s) from the first file's timestamp tag, if any."""
+        tif = self._open(0)
+        tag = tif.pages[0].tags.get(TiffWriter.TIMESTAMPS_TAG)
+        if tag is None or len(tag.value) <= 8:
+            return None
+        raw = bytes(tag.value)
+        ndims = struct.unpack_from("<Q", raw, 0)[0]
+        shape = struct.unpack_from(f"<{ndims}Q", raw, 8)
+        stamps = np.frombuffer(raw, dtype="<f8", offset=8 * (1 + ndims))
+        per_frame = stamps.reshape((-1,) + tuple(shape))
+        starts = per_frame.reshape(per_frame.shape[0], -1)[:, 0]
+        if starts.size < 2:
+            return None
+        period = float(np.median(np.diff(starts)))
+        return period if period > 0 else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._arrays.clear()
+            for tif in self._files.values():
+                tif.close()
+            self._files.clear()
+
+
+class FrameCache:
+    """
+    LRU cache of decoded frames with a background prefetcher.
+
+    Call request(index, direction) whenever the playhead moves; the worker
+    thread then fills the cache ahead of the playhead in that direction.
+    """
+    def __init__(self, reader: SeriesReader, capacity: int = 64, lookahead: int = 16):
+        self._reader = reader
+        self._capacity = capacity
+        self._lookahead = min(lookahead, capacity // 2)
+        self._frames: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._target = (0, +1) # (playhead index, direction)
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._prefetch, name="Prefetch", daemon=True)
+        self._thread.start()
+
+    def get(self, index: int) -> np.ndarray:
+        """Return frame `index`, decoding it on the calling thread on a miss."""
+        with self._lock:
+            frame = self._frames.get(index)
+            if frame is not None:
+                self._frames.move_to_end(index)
+                return frame
+        frame = self._reader.read(index)
+        self._insert(index, frame)
+        return frame
+
+    def request(self, index: int, direction: int = +1) -> None:
+        self._target = (index, +1 if direction >= 0 else -1)
+        self._wake.set()
+
+    def _insert(self, index: int, frame: np.ndarray) -> None:
+        with self._lock:
+            self._frames[index] = frame
+            self._frames.move_to_end(index)
+            while len(self._frames) > self._capacity:
+                self._frames.popitem(last=False)
+
+    def _prefetch(self):
+        while not self._stop_event.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            index, direction = self._target
+            for step in range(1, self._lookahead + 1):
+                if self._wake.is_set() or self._stop_event.is_set():
+                    break # playhead moved, restart from the new position
+                i = index + direction * step
+                if not 0 <= i < self._reader.nframes:
+                    break
+                with self._lock:
+                    cached = i in self._frames
+                if not cached:
+                    self._insert(i, self._reader.read(i))
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        self._thread.join()
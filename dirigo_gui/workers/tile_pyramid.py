@@ -0,0 +1,138 @@
+"""
+Sparse tile pyramid for a stage-registered overview map.
+
+The map is stored as fixed-size RGB tiles at several levels of detail; level
+L has a pixel size of base_pixel_size * 2**L (m). Only tiles that have been
+painted exist, and the least recently used tiles are evicted past
+`capacity`, so memory stays bounded however much area is covered. Because
+every insert touches the coarse levels, those are the last to be evicted.
+"""
+from collections import OrderedDict
+import math
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+
+class TilePyramid:
+    def __init__(self,
+                 base_pixel_size: float = 2e-6,
+                 tile_size: int = 128,
+                 levels: int = 8,
+                 capacity: int = 1024):
+        self.base_pixel_size = base_pixel_size
+        self.tile_size = tile_size
+        self.levels = levels
+        self.capacity = capacity # tiles, ~48 kB each at the default size
+        self._tiles: "OrderedDict[tuple[int, int, int], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pixel_size(self, level: int) -> float:
+        return self.base_pixel_size * 2**level
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._tiles) * self.tile_size**2 * 3
+
+    def insert(self,
+               frame: np.ndarray,
+               x: float,
+               y: float,
+               pixel_width: float,
+               pixel_height: float) -> None:
+        """
+        Paint an RGB frame (Y, X, 3) centered on stage position (x, y) into
+        every level of the pyramid. Sampling is nearest-neighbour.
+        """
+        height, width = frame.shape[:2]
+        left = x - width * pixel_width / 2
+        top = y - height * pixel_height / 2
+        for level in range(self.levels):
+            ps = self.pixel_size(level)
+            # Map pixels covered by the frame at this level
+            c0, c1 = math.floor(left / ps), math.ceil((left + width * pixel_width) / ps)
+            r0, r1 = math.floor(top / ps), math.ceil((top + height * pixel_height) / ps)
+            cols = ((np.arange(c0, c1) + 0.5) * ps - left) / pixel_width
+            rows = ((np.arange(r0, r1) + 0.5) * ps - top) / pixel_height
+            col_ok = (cols >= 0) & (cols < width)
+            row_ok = (rows >= 0) & (rows < height)
+            if not col_ok.any() or not row_ok.any():
+                continue
+            c_first, c_last = np.flatnonzero(col_ok)[[0, -1]]
+            r_first, r_last = np.flatnonzero(row_ok)[[0, -1]]
+            sampled = frame[
+                rows[r_first:r_last + 1].astype(np.intp)[:, None],
+                cols[c_first:c_last + 1].astype(np.intp)[None, :],
+            ]
+            self._paste(level, r0 + r_first, c0 + c_first, sampled)
+
+    def _paste(self, level: int, row: int, col: int, image: np.ndarray) -> None:
+        T = self.tile_size
+        with self._lock:
+            for ty in range(row // T, (row + image.shape[0] - 1) // T + 1):
+                for tx in range(col // T, (col + image.shape[1] - 1) // T + 1):
+                    key = (level, ty, tx)
+                    tile = self._tiles.get(key)
+                    if tile is None:
+                        tile = np.zeros((T, T, 3), dtype=np.uint8)
+                        self._tiles[key] = tile
+                    self._tiles.move_to_end(key)
+                    # Overlap of the image with this tile, in map pixels
+                    y0, y1 = max(row, ty * T), min(row + image.shape[0], (ty + 1) * T)
+                    x0, x1 = max(col, tx * T), min(col + image.shape[1], (tx + 1) * T)
+                    tile[y0 - ty * T:y1 - ty * T, x0 - tx * T:x1 - tx * T] = \
+                        image[y0 - row:y1 - row, x0 - col:x1 - col]
+            while len(self._tiles) > self.capacity:
+                self._tiles.popitem(last=False)
+
+    def render(self,
+               center_x: float,
+               center_y: float,
+               view_pixel_size: float,
+               width: int,
+               height: int) -> np.ndarray:
+        """RGB image (height, width, 3) of the map around (center_x, center_y)."""
+        # Finest level that is not finer than the view
+        level = int(np.clip(math.floor(math.log2(max(view_pixel_size / self.base_pixel_size, 1))),
+                            0, self.levels - 1))
+        ps = self.pixel_size(level)
+        T = self.tile_size
+
+        left = center_x - width * view_pixel_size / 2
+        top = center_y - height * view_pixel_size / 2
+        c0 = math.floor(left / ps)
+        r0 = math.floor(top / ps)
+        c1 = math.ceil((left + width * view_pixel_size) / ps)
+        r1 = math.ceil((top + height * view_pixel_size) / ps)
+
+        canvas = np.zeros((r1 - r0, c1 - c0, 3), dtype=np.uint8)
+        with self._lock:
+            for ty in range(r0 // T, (r1 - 1) // T + 1):
+                for tx in range(c0 // T, (c1 - 1) // T + 1):
+                    tile = self._tiles.get((level, ty, tx))
+                    if tile is None:
+                        continue
+                    y0, y1 = max(r0, ty * T), min(r1, (ty + 1) * T)
+                    x0, x1 = max(c0, tx * T), min(c1, (tx + 1) * T)
+                    canvas[y0 - r0:y1 - r0, x0 - c0:x1 - c0] = \
+                        tile[y0 - ty * T:y1 - ty * T, x0 - tx * T:x1 - tx * T]
+
+        # Crop the sub-pixel margin and scale to the requested size
+        scale = ps / view_pixel_size
+        crop_x = (left / ps - c0)
+        crop_y = (top / ps - r0)
+        image = Image.fromarray(canvas, mode="RGB").resize(
+            (width, height),
+            resample=Image.Resampling.NEAREST,
+            box=(crop_x, crop_y, crop_x + width / scale, crop_y + height / scale),
+        )
+        return np.asarray(image)
@@ -0,0 +1,313 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Callable, Optional
+import json
+import time
+
+import numpy as np
+import tifffile
+
+from dirigo.sw_interfaces.processor import ProcessorProduct
+from dirigo.sw_interfaces.acquisition import AcquisitionProduct
+from dirigo.plugins.acquisitions import SampleAcquisitionSpec
+from dirigo.plugins.writers import TiffWriter, serialize_float64_list
+
+from dirigo_gui.workers.frame_index import FrameIndexWriter, index_path
+from dirigo_gui.workers.metadata_stream import MetadataStreamWriter, metadata_path
+from dirigo_gui.routines.zstack import volume_direction
+
+
+def _first_value(values, column: int | None = None) -> float:
+    """First timestamp (or position component) carried by a product, else NaN."""
+    if values is None:
+        return np.nan
+    array = np.asarray(values, dtype=np.float64)
+    if array.size == 0:
+        return np.nan
+    if column is None:
+        return float(array.reshape(-1)[0])
+    array = array.reshape(-1, array.shape[-1]) if array.ndim > 1 else array.reshape(1, -1)
+    if array.shape[1] <= column:
+        return np.nan
+    return float(array[0, column])
+
+
+class RolloverTiffWriter(TiffWriter):
+    """
+    TiffWriter that keeps file rollover out of the write loop.
+
+    The next file of the series is created on a background thread while the
+    current one fills, so switching files is a reference swap. Closing the
+    finished file and patching its timestamp/position tags also happens in
+    the background.
+
+    frames_per_file may be float('inf') to write a single unbounded file.
+
+    In t-series mode a frame index sidecar (see frame_index) is written next
+    to the series so readers can seek to any frame in constant time.
+
+    If metadata_source is set, it is called once per frame and its result
+    (cached hardware state, see metadata_stream) is saved as a row of the
+    per-frame metadata stream. It must not block on device I/O.
+
+    If tiles is set (a mosaic, in acquisition order), each group of
+    frames_per_tile frames is attributed to the next tile and a
+    `<basename>_tiles.json` index of grid position, stage position, file and
+    frame number is written when the series closes. If the frames are
+    decimated upstream (ReductionProcessor keeps every decimation-th frame),
+    set decimation so they are attributed to the right tiles.
+
+    In z-stack mode, repeated volumes are written one after another along Z,
+    each from lower to upper: volumes acquired upper to lower (alternating
+    direction) are put back in order, frames_per_depth frames at a time.
+    """
+    def __init__(self, upstream, **kwargs):
+        super().__init__(upstream, **kwargs)
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Rollover")
+        self._next_file: Optional[Future] = None
+        self._pending_closes: list[Future] = []
+        self._file_index = 0
+        self._new_file = True # next page written needs the extra tags
+        self.frame_index: Optional[FrameIndexWriter] = None
+        self.metadata_source: Optional[Callable[[], dict]] = None
+        self.metadata_stream: Optional[MetadataStreamWriter] = None
+        self._frames_received = 0
+        self.tiles: Optional[list] = None # MosaicTile per tile, in acquisition order
+        self.frames_per_tile = 1
+        self.decimation = 1 # upstream frames per frame received
+        self._tile_records: list[dict] = []
+        self.frames_per_depth = 1 # z-stack mode: frames saved per depth
+
+        self.rollover_latencies: list[float] = [] # seconds, one per file switch
+
+    @property
+    def _bounded(self) -> bool:
+        return self.frames_per_file != float('inf')
+
+    def _path_for(self, file_index: int) -> Path:
+        if self._bounded:
+            return self.save_path / f"{self.basename}_{file_index}.tif"
+        return self.save_path / f"{self.basename}.tif"
+
+    def _open_file(self, file_index: int) -> tuple[Path, tifffile.TiffWriter]:
+        path = self._path_for(file_index)
+        return path, tifffile.TiffWriter(path, bigtiff=self._use_big_tiff)
+
+    def _prepare_next_file(self) -> None:
+        if self._bounded:
+            self._next_file = self._background.submit(self._open_file, self._file_index + 1)
+
+    def save_data(self, frame: AcquisitionProduct | ProcessorProduct):
+        file_index = self._file_index # before a possible rollover
+        super().save_data(frame)
+        if self.metadata_source is not None:
+            self._record_metadata(frame)
+        if self.tiles is not None:
+            self._record_tile(frame, file_index)
+        self._frames_received += 1
+
+    def _record_tile(self, frame: AcquisitionProduct | ProcessorProduct, file_index: int) -> None:
+        tile_number = (self._frames_received * self.decimation) // self.frames_per_tile
+        if tile_number >= len(self.tiles): # type: ignore
+            return
+        tile = self.tiles[tile_number] # type: ignore
+        positions = getattr(frame, 'positions', None)
+        self._tile_records.append({
+            "tile":         tile_number,
+            "row":          tile.row,
+            "col":          tile.col,
+            "x":            tile.x,
+            "y":            tile.y,
+            "measured_x":   _first_value(positions, column=0),
+            "measured_y":   _first_value(positions, column=1),
+            "frame":        self._frames_received,
+            "file":         file_index,
+        })
+
+    def _write_tile_index(self) -> None:
+        path = self.save_path / f"{self.basename}_tiles.json"
+        rows = 1 + max(r["row"] for r in self._tile_records)
+        cols = 1 + max(r["col"] for r in self._tile_records)
+        with open(path, "w") as file:
+            json.dump({
+                "rows":             rows,
+                "cols":             cols,
+                "frames_per_tile":  self.frames_per_tile,
+                "tiles":            self._tile_records,
+            }, file, indent=2, allow_nan=True)
+
+    def _record_metadata(self, frame: AcquisitionProduct | ProcessorProduct) -> None:
+        state = self.metadata_source() # type: ignore
+        if self.metadata_stream is None:
+            self.metadata_stream = MetadataStreamWriter(
+                metadata_path(self.save_path, self.basename),
+                n_detectors=len(state.get("detector_gains") or ()),
+            )
+        if state.get("z") is None:
+            # fall back to the z reported with the frame, if any
+            state = dict(state, z=_first_value(getattr(frame, 'positions', None), column=2))
+        self.metadata_stream.append(
+            frame       = self._frames_received,
+            timestamp   = _first_value(getattr(frame, 'timestamps', None)),
+            state       = state,
+        )
+
+    def _close_sidecars(self) -> None:
+        if self.frame_index is not None:
+            self.frame_index.close()
+        if self.metadata_stream is not None:
+            self.metadata_stream.close()
+        if self._tile_records:
+            self._write_tile_index()
+            self._tile_records = []
+
+    def _order_volumes(self) -> None:
+        """Reverse the depth order of the volumes acquired upper to lower."""
+        spec = self._acquisition.spec
+        if not getattr(spec, 'alternate_direction', False):
+            return
+        per_volume = spec.depths_per_acquisition * self.frames_per_depth # type: ignore
+        ordered = []
+        for volume, start in enumerate(range(0, len(self._stack_data), per_volume)):
+            planes = self._stack_data[start:start + per_volume]
+            if volume_direction(volume, alternate=True) < 0:
+                groups = [planes[i:i + self.frames_per_depth]
+                          for i in range(0, len(planes), self.frames_per_depth)]
+                planes = [plane for group in reversed(groups) for plane in group]
+            ordered.extend(planes)
+        self._stack_data = ordered
+
+    def _write_stack(self):
+        try:
+            self._order_volumes()
+            super()._write_stack()
+        finally:
+            self._close_sidecars()
+
+    def _save_frame(self, frame: AcquisitionProduct | ProcessorProduct):
+        options = {
+            'photometric':  self._photometric,
+            'resolution':   (self._x_dpi, self._y_dpi),
+            'contiguous':   True,
+        }
+
+        if self._writer is None: # first file of the series
+            self._fn, self._writer = self._open_file(self._file_index)
+            self._new_file = True
+            self._prepare_next_file()
+
+        if self._new_file:
+            options['extratags'] = self._extra_tags
+            self._new_file = False
+
+        if isinstance(self._acquisition.spec, SampleAcquisitionSpec):
+            if sum(c.enabled for c in self._acquisition.digitizer_profile.channels) > 1:
+                options['planarconfig'] = 'contig'
+
+        location = self._writer.write(
+            data        = frame.data,
+            metadata    = {'axes': 'TYXC'},
+            returnoffset= True,
+            **options
+        )
+        self.frames_saved += 1
+        if location is not None: # (offset, bytecount) of contiguous data
+            self._index_frame(frame, offset=location[0])
+
+        # Accumulate timestamps & positions
+        if hasattr(frame, 'timestamps') and frame.timestamps is not None:
+            self._timestamps.append(frame.timestamps)
+        if hasattr(frame, 'positions') and frame.positions is not None:
+            self._positions.append(frame.positions)
+
+        if self._bounded and self.frames_saved % self.frames_per_file == 0:
+            self._rollover()
+
+    def _index_frame(self, frame: AcquisitionProduct | ProcessorProduct, offset: int) -> None:
+        if self.frame_index is None:
+            self.frame_index = FrameIndexWriter(
+                index_path(self.save_path, self.basename),
+                frame_dtype=frame.data.dtype,
+                frame_shape=frame.data.shape,
+            )
+        self.frame_index.append(
+            file_index  = self._file_index,
+            offset      = offset,
+            nbytes      = frame.data.nbytes,
+            channels    = frame.data.shape[2] if frame.data.ndim > 2 else 1,
+            z           = _first_value(getattr(frame, 'positions', None), column=2),
+            timestamp   = _first_value(getattr(frame, 'timestamps', None)),
+        )
+
+    def _rollover(self) -> None:
+        """Hand the full file off for closing and swap in the pre-created one."""
+        t0 = time.perf_counter()
+        self._close_in_background()
+
+        if self._next_file is None: # should not happen, but fall back to opening here
+            self._prepare_next_file()
+        self._fn, self._writer = self._next_file.result() # type: ignore
+        self._file_index += 1
+        self._new_file = True
+        self._prepare_next_file()
+
+        self.rollover_latencies.append(time.perf_counter() - t0)
+
+    def _close_in_background(self) -> None:
+        if self._writer is None:
+            return
+        self._pending_closes.append(self._background.submit(
+            self._finalize_file, self._writer, self._fn, self._timestamps, self._positions
+        ))
+        self._writer = None
+        self._timestamps = []
+        self._positions = []
+
+    def _finalize_file(self,
+                       writer: tifffile.TiffWriter,
+                       path: Path,
+                       timestamps: list,
+                       positions: list) -> None:
+        writer.close()
+
+        if timestamps or positions:
+            # Patch the per-frame metadata placeholders (see TiffWriter)
+            with tifffile.TiffFile(path, mode='r+b') as tif: # type: ignore
+                if len(timestamps) > 0:
+                    data = serialize_float64_list(timestamps)
+                    tif.pages[0].tags[self.TIMESTAMPS_TAG].overwrite(data) # type: ignore
+                if len(positions) > 0:
+                    data = serialize_float64_list(positions)
+                    tif.pages[0].tags[self.POSITIONS_TAG].overwrite(data) # type: ignore
+
+        self.last_saved_file_path = path
+        self.files_saved += 1
+
+    def _close_and_write_metadata(self):
+        """Called at end of stream: finish all files, discard the unused next file."""
+        self._close_in_background()
+
+        if self._next_file is not None:
+            next_path, next_writer = self._next_file.result()
+            next_writer.close()
+            next_path.unlink(missing_ok=True) # was pre-created but never written
+            self._next_file = None
+
+        for pending in self._pending_closes:
+            pending.result() # re-raises any error from the background thread
+        self._pending_closes = []
+        self._background.shutdown(wait=True)
+
+        self._close_sidecars()
+
+    @property
+    def statistics(self) -> dict:
+        """Summary of the writer's progress, including file rollover latency."""
+        latencies = np.array(self.rollover_latencies)
+        return {
+            "frames_saved":             self.frames_saved,
+            "files_saved":              self.files_saved,
+            "rollovers":                latencies.size,
+            "rollover_latency_mean_ms": 1000 * float(latencies.mean()) if latencies.size else None,
+            "rollover_latency_max_ms":  1000 * float(latencies.max()) if latencies.size else None,
+        }
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from dirigo_gui.routines.autofocus import fit_peak
+
+
+def test_parabola_peak_between_samples():
+    z = np.linspace(-10e-6, 10e-6, 11)
+    z_peak, at_edge = fit_peak(z, 5.0 - ((z - 1.3e-6) / 1e-6) ** 2)
+    assert z_peak == pytest.approx(1.3e-6, abs=1e-12)
+    assert not at_edge
+
+
+def test_gaussian_peak_within_a_fraction_of_a_step():
+    z = np.linspace(-10e-6, 10e-6, 11) # 2 um steps
+    z_peak, _ = fit_peak(z, np.exp(-((z + 0.7e-6) / 4e-6) ** 2))
+    assert z_peak == pytest.approx(-0.7e-6, abs=0.2e-6)
+
+
+def test_peak_at_the_edge():
+    z = np.linspace(0, 10e-6, 6)
+    z_peak, at_edge = fit_peak(z, z.copy()) # still rising at the end of the sweep
+    assert z_peak == z[-1]
+    assert at_edge
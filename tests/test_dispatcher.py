@@ -0,0 +1,51 @@
+import threading
+import time
+
+from dirigo_gui.hardware.dispatcher import LatestValueDispatcher
+
+
+def _wait_idle(dispatcher: LatestValueDispatcher, timeout: float = 5.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while dispatcher.busy:
+        assert time.perf_counter() < deadline, "dispatcher did not go idle"
+        time.sleep(0.005)
+
+
+def test_latest_value_wins():
+    sent = []
+    release = threading.Event()
+    def send(value):
+        sent.append(value)
+        release.wait(5.0) # the first value stays in flight while more arrive
+
+    dispatcher = LatestValueDispatcher("test", send)
+    try:
+        dispatcher.submit(1)
+        while not sent:
+            time.sleep(0.005)
+        for value in (2, 3, 4):
+            dispatcher.submit(value)
+        release.set()
+        _wait_idle(dispatcher)
+    finally:
+        dispatcher.close()
+
+    assert sent == [1, 4]
+    assert dispatcher.superseded == 2
+    assert dispatcher.applied == 4
+    assert dispatcher.status == "applied"
+
+
+def test_send_waits_for_the_device_lock():
+    sent = []
+    lock = threading.RLock()
+    dispatcher = LatestValueDispatcher("test", sent.append, lock=lock)
+    try:
+        with lock: # e.g. the hardware mirror reading the same device
+            dispatcher.submit(1)
+            time.sleep(0.05)
+            assert sent == []
+        _wait_idle(dispatcher)
+    finally:
+        dispatcher.close()
+    assert sent == [1]
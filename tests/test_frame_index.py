@@ -0,0 +1,47 @@
+import numpy as np
+
+from dirigo_gui.workers.frame_index import (
+    HEADER_DTYPE, RECORD_DTYPE, FrameIndex, FrameIndexWriter, index_path
+)
+
+
+def test_record_layout():
+    assert HEADER_DTYPE.itemsize == 64
+    assert RECORD_DTYPE.itemsize == 48
+    assert [RECORD_DTYPE.fields[name][1] for name in
+            ("frame", "file", "channels", "offset", "nbytes", "z", "timestamp")] \
+        == [0, 8, 12, 16, 24, 32, 40]
+
+
+def test_write_and_read(tmp_path):
+    path = index_path(tmp_path, "series")
+    writer = FrameIndexWriter(path, np.uint16, (512, 256, 2), flush_every=4)
+    for i in range(10):
+        writer.append(file_index=i // 4, offset=1000 + i * 524288, nbytes=524288,
+                      channels=2, z=i * 1e-6, timestamp=0.1 * i)
+    writer.close()
+
+    assert path.stat().st_size == HEADER_DTYPE.itemsize + 10 * RECORD_DTYPE.itemsize
+    index = FrameIndex(path)
+    assert len(index) == 10
+    assert index.frame_dtype == np.dtype(np.uint16)
+    assert index.frame_shape == (512, 256, 2)
+    record = index[7]
+    assert (record["frame"], record["file"], record["channels"]) == (7, 1, 2)
+    assert (record["offset"], record["nbytes"]) == (1000 + 7 * 524288, 524288)
+
+    # Record i is at a fixed byte offset
+    raw = path.read_bytes()
+    start = HEADER_DTYPE.itemsize + 7 * RECORD_DTYPE.itemsize
+    assert np.frombuffer(raw[start:start + RECORD_DTYPE.itemsize], RECORD_DTYPE)[0] == record
+
+
+def test_partial_trailing_record_is_ignored(tmp_path):
+    path = index_path(tmp_path, "series")
+    writer = FrameIndexWriter(path, np.uint8, (64, 64))
+    for i in range(3):
+        writer.append(file_index=0, offset=i * 4096, nbytes=4096, channels=1)
+    writer.close()
+    with open(path, "ab") as file:
+        file.write(b"\0" * (RECORD_DTYPE.itemsize // 2)) # as if a crash cut a write short
+    assert len(FrameIndex(path)) == 3
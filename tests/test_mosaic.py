@@ -0,0 +1,29 @@
+import pytest
+
+from dirigo_gui.routines.mosaic import serpentine_tiles
+
+
+def test_serpentine_count_and_order():
+    tiles = serpentine_tiles((0, 2.5e-3), (0, 1.5e-3), 1e-3, 1e-3, overlap=0.0)
+    assert len(tiles) == 6 # 3 columns x 2 rows
+    assert [(t.row, t.col) for t in tiles] == [(0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (1, 0)]
+    for a, b in zip(tiles, tiles[1:]): # consecutive tiles are neighbours
+        assert abs(a.row - b.row) + abs(a.col - b.col) == 1
+
+
+def test_serpentine_covers_the_box():
+    tiles = serpentine_tiles((1e-3, 0), (0, 1e-3), 0.3e-3, 0.4e-3, overlap=0.1)
+    assert len({(t.row, t.col) for t in tiles}) == len(tiles)
+    assert min(t.x for t in tiles) - 0.15e-3 == pytest.approx(0)
+    assert max(t.x for t in tiles) + 0.15e-3 >= 1e-3
+    assert max(t.y for t in tiles) + 0.2e-3 >= 1e-3
+
+
+def test_serpentine_single_tile():
+    tiles = serpentine_tiles((0, 0.5e-3), (0, 0.5e-3), 1e-3, 1e-3, overlap=0.1)
+    assert len(tiles) == 1
+
+
+def test_serpentine_rejects_full_overlap():
+    with pytest.raises(ValueError):
+        serpentine_tiles((0, 1e-3), (0, 1e-3), 1e-4, 1e-4, overlap=1.0)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from dirigo_gui.workers.reduction import ReductionSpec, pack_12bit, unpack_12bit
+
+
+def test_12bit_round_trip():
+    values = np.random.default_rng(0).integers(0, 0x1000, size=(16, 10), dtype=np.uint16)
+    packed = pack_12bit(values, np.empty(values.size * 3 // 2, dtype=np.uint8))
+    np.testing.assert_array_equal(unpack_12bit(packed), values.reshape(-1))
+
+
+def test_12bit_round_trip_from_int32():
+    # The reduction processor packs from its int32 accumulator
+    values = np.array([0, 0xFFF, 0x800, 0x7FF, 1, 0xFFE], dtype=np.int32)
+    packed = pack_12bit(values, np.empty(9, dtype=np.uint8))
+    np.testing.assert_array_equal(unpack_12bit(packed), values)
+
+
+def test_12bit_byte_layout():
+    packed = pack_12bit(np.array([0xABC, 0x123], dtype=np.uint16), np.empty(3, dtype=np.uint8))
+    assert packed.tolist() == [0xBC, 0x3A, 0x12]
+
+
+def test_value_range_must_increase():
+    with pytest.raises(ValueError):
+        ReductionSpec(bit_depth="8-bit", value_range=(100, 100))
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from dirigo_gui.routines.timelapse import plan_route, route_length
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("start", [None, (0.0, 0.0)])
+def test_route_visits_every_position_once(seed, start):
+    points = [tuple(p) for p in np.random.default_rng(seed).uniform(-5e-3, 5e-3, (25, 2))]
+    order = plan_route(points, start)
+    assert sorted(order) == list(range(len(points)))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_two_opt_does_not_lengthen_route(seed):
+    points = [tuple(p) for p in np.random.default_rng(seed).uniform(-5e-3, 5e-3, (25, 2))]
+    start = (0.0, 0.0)
+    nearest_neighbour = plan_route(points, start, max_passes=0)
+    two_opt = plan_route(points, start)
+    assert (route_length(points, two_opt, start)
+            <= route_length(points, nearest_neighbour, start) + 1e-12)
+
+
+def test_route_along_a_line():
+    points = [(3.0, 0.0), (1.0, 0.0), (4.0, 0.0), (2.0, 0.0)]
+    order = plan_route(points, start=(0.0, 0.0))
+    assert [points[i][0] for i in order] == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_route_small_cases():
+    assert plan_route([]) == []
+    assert plan_route([(1.0, 1.0)]) == [0]
+    assert plan_route([(5.0, 0.0), (1.0, 0.0)], start=(0.0, 0.0)) == [1, 0]
@@ -0,0 +1,38 @@
+import pytest
+
+from dirigo_gui.routines.zstack import (
+    RepeatedStackAcquisitionSpec, max_depth_spacing, stack_times, sweep_velocity
+)
+
+
+def _spec(**kwargs) -> RepeatedStackAcquisitionSpec:
+    return RepeatedStackAcquisitionSpec(
+        bidirectional_scanning=False, line_width="100 um", frame_height="100 um",
+        pixel_time="1 us", pixel_size="1 um", pixel_height="1 um", line_duty_cycle=0.8,
+        frames_per_acquisition=1, lower_limit="-10 um", upper_limit="10 um",
+        depth_spacing="5 um", **kwargs
+    )
+
+
+def test_stack_times():
+    spec = _spec(saved_frames_per_step=2, sacrificial_frames_per_step=1, volumes=2)
+    assert spec.depths_per_acquisition == 4
+    step, sweep = stack_times(spec, frame_period=0.1)
+    assert step == pytest.approx(2 * 0.1 * 4 * (2 + 1))
+    assert sweep == pytest.approx(2 * 0.1 * 4 * 2)
+
+
+def test_stack_times_with_acceleration():
+    spec = _spec(saved_frames_per_step=2, sacrificial_frames_per_step=1)
+    _, sweep = stack_times(spec, frame_period=0.1)
+    _, ramped = stack_times(spec, frame_period=0.1, acceleration=1e-3)
+    velocity = 5e-6 / (2 * 0.1) # one depth spacing per saved-frame group
+    assert ramped - sweep == pytest.approx(velocity / 1e-3)
+
+
+def test_max_depth_spacing():
+    spec = _spec(saved_frames_per_step=2, sacrificial_frames_per_step=1)
+    spacing = max_depth_spacing(spec, frame_period=0.1, max_velocity=10e-6)
+    assert spacing == pytest.approx(2e-6)
+    assert spacing < float(spec.depth_spacing) # 5 um: the sweep would be too fast
+    assert sweep_velocity(spec, frame_period=0.1) > 10e-6